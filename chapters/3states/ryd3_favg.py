@@ -7,9 +7,9 @@ Script for generating a plot of gate error (data included in file)
 import os
 import sys
 import numpy as np
+from disstools.tail import read_tail
 import matplotlib
 matplotlib.use('PDF')
-from StringIO import StringIO
 from mgplottools.mpl import get_color, set_axis, new_figure, ls, \
                             set_color_cycle, new_ls_cycle
 
@@ -95,7 +95,7 @@ def read_data(datfolder):
         data.append([])
         for file in set:
             filename = os.path.join(datfolder, file)
-            iter, favg = np.genfromtxt(filename, usecols=(0,1), unpack=True)
+            iter, favg = read_tail(filename, usecols=(0,1), unpack=True)
             data[-1].append( (iter, favg) )
     return tuple(data)
 
@@ -10,9 +10,39 @@
 # executable set up in the 'venv' virtual environment
 PYTHON ?= $(shell [ -f ../../venv/bin/python ] && echo ../../venv/bin/python || echo python)
 
+# The figure scripts use the helper routines in the `disstools` package in the
+# top-level `scripts` folder
+export PYTHONPATH := $(abspath ../../scripts)$(if $(PYTHONPATH),:$(PYTHONPATH))
+
+# With `make FIGSERVER=1`, matplotlib figures are rendered by a running render
+# server (see scripts/figserver.py), instead of starting a new Python process
+# for every figure
+ifdef FIGSERVER
+RUNFIG = $(PYTHON) ../../scripts/figserver.py render
+else
+RUNFIG = $(PYTHON)
+endif
+
 .DEFAULT_GOAL = all
 all: $(IMG)
 
+# All files (up to two levels deep) in the given data folder. By convention,
+# the script foo.py reads its data from the folder foo, so these files are
+# prerequisites of foo.pdf. Chapter Makefiles can use this to add other data
+# folders as prerequisites.
+datafiles = $(filter-out $(patsubst %/,%,$(wildcard $(1)/*/ $(1)/*/*/)), \
+                         $(wildcard $(1)/* $(1)/*/*))
+
+# The modules of the `disstools` package. Much of the figure logic (e.g. the
+# frequency band of spectra, or the scaffold of Weyl chamber plots) lives
+# there, so they are prerequisites of every matplotlib figure.
+DISSTOOLS = $(wildcard ../../scripts/disstools/*.py)
+
+# Run the command given as the argument only if the content of the
+# prerequisites changed since the target was last generated (see
+# scripts/figcache.py). Otherwise, just touch the target.
+figcache = $(PYTHON) ../../scripts/figcache.py --target=$@ $^ -- $(1)
+
 diss.cls: ../../diss.cls
 	@cp ../../diss.cls diss.cls
 
@@ -40,15 +70,16 @@ matplotlibrc: ../../matplotlibrc
 
 
 # Rule for matplotlib py -> pdf
-%.pdf: %.py matplotlibrc
+.SECONDEXPANSION:
+%.pdf: %.py matplotlibrc $(DISSTOOLS) $$(call datafiles,$$*)
 	@echo "\n** generate figure: $< -> $@"
-	@$(PYTHON) $<
+	@$(call figcache,$(RUNFIG) $<)
 
 
 # Rule for matplotlib py -> png
-%.png: %.py matplotlibrc
+%.png: %.py matplotlibrc $(DISSTOOLS) $$(call datafiles,$$*)
 	@echo "** generate figure: $< -> $@"
-	@$(PYTHON) $<
+	@$(call figcache,$(RUNFIG) $<)
 
 
 clean-auto:
@@ -70,3 +101,5 @@ clean-auto:
 	rm -f $(IMG)
 	@rm -f diss.cls mymacros.sty
 	@rm -f matplotlibrc
+	@rm -f .figcache
+	@find . -type d -name .npycache -prune -exec rm -rf {} \;
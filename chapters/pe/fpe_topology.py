@@ -1,26 +1,67 @@
 #!/usr/bin/env python
 import os
 import sys
-import QDYN.weyl as LI
 import numpy as np
+from disstools import weyl
 
 import matplotlib
 from matplotlib.pyplot import figure
 
 from mgplottools.mpl import write_pdf
 
+from disstools.weylchamber import WeylChamber
+
 BLUE   = '#377EB8'
 
-FPE_MIN = 10.0
-FPE_MAX = -10.0
+
+def _scaffold(inside):
+    """Return the WeylChamber scaffold for the panel showing the points inside
+    or outside the PE polyhedron. The chamber and the polyhedron are drawn as
+    lines only, with the hidden lines behind the data points"""
+    lines = [
+        # background lines
+        #   Weyl chamber
+        ('O', 'A_2', '--', True),
+        #   PE
+        ('P', 'Q', '--', True), ('P', 'A_2', '--', True),
+        # foreground lines
+        #   Weyl chamber
+        ('O', 'A_1', '-', False), ('A_1', 'A_2', '-', False),
+        ('A_2', 'A_3', '-', False), ('A_3', 'A_1', '-', False),
+        ('A_3', 'O', '-', False),
+        #   PE
+        ('L', 'N', '-', False), ('L', 'P', '-', False),
+        ('N', 'P', '-', False), ('N', 'A_2', '-', False),
+        ('N', 'M', '-', False)]
+    if inside:
+        lines.append(('M', 'L', '--', False))
+    else:
+        lines.append(('M', 'L', '--', True))
+        lines.append(('Q', 'L', '--', False))
+    labels = {
+        'A_1' : (-0.03, 0.04 , 0.00),
+        'A_2' : (0.01, 0, -0.01),
+        'A_3' : (-0.01, 0, 0),
+        'O'   : (-0.025,  0.0, 0.02),
+        'L'   : (-0.075, 0, 0.01),
+        'M'   : (0.05, -0.01, 0),
+        'N'   : (-0.075, 0, 0.009),
+        'P'   : (-0.05, 0, 0.008),
+        'Q'   : (0, 0.01, 0.03),
+        }
+    if inside:
+        del labels['Q']
+    return WeylChamber(weyl_faces=[], PE_faces=[], lines=lines,
+                       labels=labels, azim=-55.0, compact=True)
+
+SCAFFOLD_INSIDE = _scaffold(inside=True)
+SCAFFOLD_OUTSIDE = _scaffold(inside=False)
 
 
 def create_figure():
     """
     Return a completed Figure instance
     """
-    global FPE_MIN, FPE_MAX
-
     ### Layout ###
 
     font = {'family'    : "serif",
@@ -46,9 +87,6 @@ def create_figure():
     cm2inch = 0.39370079 # conversion factor cm to inch
     fig = figure(figsize=(fig_width*cm2inch, fig_height*cm2inch), dpi=dpi)
 
-    FPE_MIN = 10.0
-    FPE_MAX = -10.0
-
     # left
     pos = [left_margin1/fig_width, bottom_margin/fig_height,
            w/fig_width, h/fig_height]
@@ -65,13 +103,10 @@ def create_figure():
     cbar.ax.tick_params(labelsize=7)
 
     print "== Outside =="
-    print "Minimum value: ", FPE_MIN
-    print "Maximum value: ", FPE_MAX
+    print "Minimum value: ", s1.get_array().min()
+    print "Maximum value: ", s1.get_array().max()
     print ""
 
-    FPE_MIN = 10.0
-    FPE_MAX = -10.0
-
     # right
     pos = [left_margin2/fig_width, bottom_margin/fig_height,
            w/fig_width, h/fig_height]
@@ -88,8 +123,8 @@ def create_figure():
     cbar.ax.tick_params(labelsize=7)
 
     print "== INSIDE =="
-    print "Minimum value: ", FPE_MIN
-    print "Maximum value: ", FPE_MAX
+    print "Minimum value: ", s2.get_array().min()
+    print "Maximum value: ", s2.get_array().max()
     print ""
 
     return fig
@@ -98,44 +133,34 @@ def create_figure():
 def fpe(c1, c2, c3):
     """
     Return value of perfect entanglers functional for Weyl chamber coordinates
-    c1, c2, c3
+    c1, c2, c3 (scalars or numpy arrays of equal shape)
     """
-    global FPE_MIN, FPE_MAX
-    g1, g2, g3 = LI.g1g2g3_from_c1c2c3(c1, c2, c3)
-    f = LI.F_PE(g1, g2, g3)
-    if f < FPE_MIN:
-        FPE_MIN = f
-    if f > FPE_MAX:
-        FPE_MAX = f
-    return f
+    return weyl.F_PE_from_c1c2c3(c1, c2, c3)
 
 
 def fpe_topology(inside, n=25):
     """
     Return four arrays, c1, c2, c3, f
-    """
 
-    c1s = []
-    c2s = []
-    c3s = []
-    fs  = []
-
-    c1_candidates = np.linspace(0, 1.0, n)
-    c2_candidates = np.linspace(0, 0.5, n)
-    c3_candidates = np.linspace(0, 0.5, n)
-
-    for c1 in c1_candidates:
-        for c2 in c2_candidates:
-            for c3 in c3_candidates:
-                if LI.point_in_weyl_chamber(c1, c2, c3):
-                    if ((inside and LI.point_in_PE(c1, c2, c3))
-                    or  (not inside and not LI.point_in_PE(c1, c2, c3))):
-                        f = fpe(c1, c2, c3)
-                        c1s.append(c1)
-                        c2s.append(c2)
-                        c3s.append(c3)
-                        fs.append(f)
-    return np.array(c1s), np.array(c2s), np.array(c3s), np.array(fs)
+    The points are taken from a regular n x n x n grid spanning the bounding
+    box of the Weyl chamber, keeping only those that are inside the Weyl
+    chamber and inside (or outside, if `inside` is False) the perfect
+    entanglers polyhedron. The entire grid is evaluated in one pass, so large
+    values of `n` (a few hundred) are feasible.
+    """
+    c1, c2, c3 = np.meshgrid(np.linspace(0, 1.0, n),
+                             np.linspace(0, 0.5, n),
+                             np.linspace(0, 0.5, n), indexing='ij')
+    c1 = c1.ravel()
+    c2 = c2.ravel()
+    c3 = c3.ravel()
+    mask = weyl.point_in_weyl_chamber(c1, c2, c3)
+    if inside:
+        mask &= weyl.point_in_PE(c1, c2, c3)
+    else:
+        mask &= ~weyl.point_in_PE(c1, c2, c3)
+    c1, c2, c3 = c1[mask], c2[mask], c3[mask]
+    return c1, c2, c3, fpe(c1, c2, c3)
 
 
 def plot_weyl_chamber(ax, inside, show_c3_label=True):
@@ -145,61 +170,13 @@ def plot_weyl_chamber(ax, inside, show_c3_label=True):
     """
     ### Style ###
 
-    azim = -55.0 # degrees
-    #azim = 60.0 # degrees
-    # azimuth angle of zero looks directly onto the c2-c3 plane
-
-    elev = 20.0 # degrees
-    # elevation angle of 90 looks onto the c1-c2 plane
-
-    weyl_alpha = 0.0   # transparency of Weyl chamber
-    PE_alpha   = 0.0   # transparency of PE polyhedron
-    linecolor  = 'black'
-    bgcolor    = None  # None -> default
     pointsize  = 5.0
-    linewidth  = 0.5
-
-    ax.view_init(elev=elev, azim=azim)
-    ax.patch.set_facecolor('None')
-    ax.w_xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-    ax.w_yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-    ax.w_zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-    # move z-axis to the left
-    tmp_planes = ax.zaxis._PLANES
-    ax.zaxis._PLANES = (tmp_planes[2], tmp_planes[3],
-                        tmp_planes[0], tmp_planes[1],
-                        tmp_planes[4], tmp_planes[5])
-    ax.zaxis.set_rotate_label(False)
-    ax.zaxis.label.set_rotation(90)
-    ax.grid(False)
-    #ax._axis3don = False # hide axis
-
-    A1 = (1, 0, 0)
-    A2 = (0.5, 0.5, 0)
-    A3 = (0.5, 0.5, 0.5)
-    O  = (0, 0, 0)
-    L  = (0.5, 0, 0)
-    M  = (0.75, 0.25, 0)
-    N  = (0.75, 0.25, 0.25)
-    P  = (0.25, 0.25, 0.25)
-    Q  = (0.25, 0.25, 0)
-    weyl_points = {'A_1' : A1, 'A_2' : A2, 'A_3' : A3, 'O' : O, 'L' : L,
-                   'M' : M, 'N' : N, 'P' : P, 'Q': Q}
-
-    def draw_line(origin, end, **kwargs):
-        o1, o2, o3 = origin
-        c1, c2, c3 = end
-        ax.plot([o1, c1], [o2, c2] , [o3, c3], **kwargs)
-        #draw_line(O, PR, color='black', linestyle='-', lw=linewidth)
-
-    # background lines
-    #   Weyl chamber
-    draw_line(O, A2, color='black', linestyle='--', lw=linewidth, zorder=-1)
-    #   PE
-    draw_line(P, Q, color='black',  linestyle='--', lw=linewidth, zorder=-1)
-    draw_line(P, A2, color='black', linestyle='--', lw=linewidth, zorder=-1)
-    if not inside:
-        draw_line(M, L, color='black', linestyle='--', lw=linewidth, zorder=-1)
+
+    if inside:
+        scaffold = SCAFFOLD_INSIDE
+    else:
+        scaffold = SCAFFOLD_OUTSIDE
+    scaffold.draw_background(ax, show_c3_label=show_c3_label)
 
     ### Create and plot actual data ###
     c1, c2, c3, f = fpe_topology(inside)
@@ -209,62 +186,7 @@ def plot_weyl_chamber(ax, inside, show_c3_label=True):
     # depth
     s.set_edgecolors = s.set_facecolors = lambda *args:None
 
-    # foreground lines
-    #   Weyl chamber
-    draw_line(O, A1, color='black', linestyle='-', lw=linewidth)
-    draw_line(A1, A2, color='black', linestyle='-', lw=linewidth)
-    draw_line(A2, A3, color='black', linestyle='-', lw=linewidth)
-    draw_line(A3, A1, color='black', linestyle='-', lw=linewidth)
-    draw_line(A3, O, color='black', linestyle='-', lw=linewidth)
-    #   PE
-    draw_line(L, N, color='black', linestyle='-', lw=linewidth)
-    draw_line(L, P, color='black', linestyle='-', lw=linewidth)
-    draw_line(N, P, color='black', linestyle='-', lw=linewidth)
-    draw_line(N, A2, color='black', linestyle='-', lw=linewidth)
-    draw_line(N, M, color='black', linestyle='-', lw=linewidth)
-    if inside:
-        draw_line(M, L, color='black', linestyle='--', lw=linewidth)
-    else:
-        draw_line(Q, L, color='black', linestyle='--',lw=linewidth)
-
-        #'A_1' : (-0.10, 0.00 , 0.00),
-    label_offsets = {
-        'A_1' : (-0.03, 0.04 , 0.00),
-        'A_2' : (0.01, 0, -0.01),
-        'A_3' : (-0.01, 0, 0),
-        'O'   : (-0.025,  0.0, 0.02),
-        'L'   : (-0.075, 0, 0.01),
-        'M'   : (0.05, -0.01, 0),
-        'N'   : (-0.075, 0, 0.009),
-        'P'   : (-0.05, 0, 0.008),
-        'Q'   : (0, 0.01, 0.03),
-        }
-    for label in ['O', 'A_1', 'A_2', 'A_3', 'M', 'N', 'P', 'L', 'Q']:
-        if inside and label == 'Q':
-            continue
-        coords = weyl_points[label]
-        coords = np.array(coords) + np.array(label_offsets[label])
-        c = linecolor
-        ax.text(coords[0], coords[1], coords[2], "$%s$" % label, color=c,
-                fontsize='small')
-    ax.set_xlabel(r'$c_1/\pi$')
-    ax.set_ylabel(r'$c_2/\pi$')
-    if show_c3_label:
-        ax.set_zlabel(r'$c_3/\pi$')
-    ax.set_xlim(0,1)
-    ax.set_ylim(0,0.5)
-    ax.set_zlim(0,0.5)
-    ax.tick_params(axis='both', which='major', labelsize=7)
-    ax.xaxis._axinfo['ticklabel']['space_factor'] = 0.5
-    ax.yaxis._axinfo['ticklabel']['space_factor'] = 0.5
-    ax.xaxis._axinfo['label']['space_factor'] = 1.8
-    ax.yaxis._axinfo['label']['space_factor'] = 1.8
-    [t.set_va('center') for t in ax.get_yticklabels()]
-    [t.set_ha('left') for t in ax.get_yticklabels()]
-    [t.set_va('center') for t in ax.get_xticklabels()]
-    [t.set_ha('right') for t in ax.get_xticklabels()]
-    [t.set_va('center') for t in ax.get_zticklabels()]
-    [t.set_ha('center') for t in ax.get_zticklabels()]
+    scaffold.draw_foreground(ax)
     return s
 
 
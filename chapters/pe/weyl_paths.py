@@ -6,19 +6,27 @@ import sys
 # https://www.enthought.com/products/canopy/
 
 import numpy as np
+from disstools.tail import read_tail
+from disstools import weyl
 
 import matplotlib
 #matplotlib.use("PDF") # backend selection (must be done before other imports)
 matplotlib.use("Agg") # backend selection (must be done before other imports)
 from matplotlib.pyplot import figure
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 from mpl_toolkits.mplot3d import proj3d
 from matplotlib.patches import FancyArrowPatch
 
+from disstools.weylchamber import WeylChamber, LABEL_OFFSETS
+
 PURPLE = '#984EA3'
 BLUE   = '#91c4e9'
 RED    = '#E41A1C'
 
+SCAFFOLD = WeylChamber(
+    PE_alpha=0.1, label_colors={'Q': 'DarkSlateGray'},
+    labels=dict([(label, offset) for (label, offset)
+                 in LABEL_OFFSETS.items() if label != 'B']))
+
 class Arrow3D(FancyArrowPatch):
     def __init__(self, xs, ys, zs, *args, **kwargs):
         FancyArrowPatch.__init__(self, (0,0), (0,0), *args, **kwargs)
@@ -32,68 +40,67 @@ class Arrow3D(FancyArrowPatch):
 
 def weyl_path(datfile):
     """
-    Extract the Weyl chamber coordinates c1, c2, c3 as numpy arrays over
-    iteration number the local_invariants_oct_iter.dat file written during
-    optimization.
+    Extract the Weyl chamber coordinates c1, c2, c3 over iteration number from
+    the local_invariants_oct_iter.dat file written during optimization, as a
+    numpy array of shape (N, 3). For an optimization that is still running,
+    the path up to the last finished iteration is returned.
     """
-    c1, c2, c3 = np.genfromtxt(datfile, usecols=(8,9,10), unpack=True)
-    return zip(c1, c2, c3)
+    return read_tail(datfile, usecols=(8,9,10))
 
 
-def PE_dist(c1, c2, c3):
+def dist(p1, p2):
     """
-    Return distance of (c1, c3, c3) to PE polyhedron, zero if inside
+    Return Eucledian distance between points p1, p2 in the Weyl chamber. If p1
+    and/or p2 are arrays of shape (N, 3), return an array of N distances
     """
-    if (c1 + c2 <= 0.5):
-        F = np.cos(np.pi*(c1 + c2 - 0.5) / 4.0)**2
-    elif (c2 + c3 >= 0.5):
-        F = np.cos(np.pi*(c2 + c3 - 0.5) / 4.0)**2
-    elif (c1 - c2 >= 0.5):
-        F = np.cos(np.pi*(c1 - c2 - 0.5) / 4.0)**2
-    else:
-        F = 1.0
-    return 1.0-F
+    d = np.asarray(p1) - np.asarray(p2)
+    return np.sqrt(np.sum(d**2, axis=-1))
 
 
-def dist(p1, p2):
+def first_in_PE(path):
     """
-    Return Eucledian distance between points p1, p2 in the Weyl chamber
+    Given an array of Weyl chamber points of shape (N, 3), return the index of
+    the first point that is inside the PE polyhedron, or None if the path
+    never enters the polyhedron
     """
-    c1, c2, c3 = p1
-    s1, s2, s3 = p2
-    d1 = (c1 - s1)**2
-    d2 = (c2 - s2)**2
-    d3 = (c3 - s3)**2
-    return np.sqrt(d1 + d2 + d3)
+    inside = weyl.point_in_PE(path)
+    if inside.any():
+        return int(np.argmax(inside))
+    return None
 
 
-def filter_path(path):
+def filter_path(path, limit=0.005):
     """
-    Given an array of Weyl chamber points, return a filtered array:
-    * drop points that are extremely close to the previous point
+    Given an array of Weyl chamber points of shape (N, 3), return a filtered
+    array:
+    * thin out the points so that consecutive points are approximately `limit`
+      apart (measured by the distance traveled along the path)
     * stop as soon as the points enter the PE polyhedron
+    An empty path (optimization that has just started) is returned unchanged.
     """
-    LIMIT = 0.005
-    result = []
-    for point in path:
-        if len(result) == 0:
-            result.append(point)
-        elif dist(point, result[-1]) > LIMIT:
-            result.append(point)
-        if PE_dist(*point) == 0.0:
-            return result
-    return result
+    if len(path) == 0:
+        return path
+    i_end = first_in_PE(path)
+    if i_end is not None:
+        path = path[:i_end+1]
+    traveled = np.concatenate(([0.0], np.cumsum(dist(path[1:], path[:-1]))))
+    section = np.floor(traveled / limit)
+    keep = np.concatenate(([True], section[1:] > section[:-1]))
+    return path[keep]
 
 
 def end_point(path):
     """
-    Given an array of Weyl chamber points, return either the last element of
-    the array or the first element that is inside the PE polyhedron
+    Given an array of Weyl chamber points of shape (N, 3), return either the
+    last element of the array or the first element that is inside the PE
+    polyhedron. Return None for an empty path.
     """
-    for point in path:
-        if PE_dist(*point) == 0.0:
-            return point
-    return path[-1]
+    if len(path) == 0:
+        return None
+    i_end = first_in_PE(path)
+    if i_end is None:
+        return path[-1]
+    return path[i_end]
 
 
 def plot_weyl_chamber(outfile):
@@ -119,14 +126,6 @@ def plot_weyl_chamber(outfile):
 
     ### Style ###
 
-    azim = -50.0 # degrees
-    # azimuth angle of zero looks directly onto the c2-c3 plane
-
-    elev = 20.0 # degrees
-    # elevation angle of 90 looks onto the c1-c2 plane
-
-    weyl_alpha = 0.0   # transparency of Weyl chamber
-    PE_alpha   = 0.1   # transparency of PE polyhedron
     linecolor  = 'black'
     pointsize  = 15
 
@@ -140,79 +139,10 @@ def plot_weyl_chamber(outfile):
     pos = [left_margin/fig_width, bottom_margin/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos, projection='3d')
-    ax.view_init(elev=elev, azim=azim)
 
     ### Plot Weyl Chamber / PE polyhedron ###
 
-    A1 = (1, 0, 0)
-    A2 = (0.5, 0.5, 0)
-    A3 = (0.5, 0.5, 0.5)
-    O  = (0, 0, 0)
-    L  = (0.5, 0, 0)
-    M  = (0.75, 0.25, 0)
-    N  = (0.75, 0.25, 0.25)
-    P  = (0.25, 0.25, 0.25)
-    Q  = (0.25, 0.25, 0)
-    weyl_points = {'A_1' : A1, 'A_2' : A2, 'A_3' : A3, 'O' : O, 'L' : L,
-                   'M' : M, 'N' : N, 'P' : P, 'Q': Q}
-    weyl_faces = []
-    #weyl_faces.append((True, [[A1, A2, O]]))
-    weyl_faces.append((True, [[A2, O, A3]]))
-    weyl_faces.append((False, [[A1, A2, A3]]))
-    weyl_faces.append((False, [[A1, O, A3]]))
-    for hidden, face in weyl_faces:
-        pol = Poly3DCollection(face)
-        pol.set_facecolor((1, 1, 1, weyl_alpha))
-        pol.set_edgecolor(linecolor)
-        pol.set_linewidth(0.5)
-        if hidden:
-            pol.set_linestyle('--')
-        ax.add_collection3d(pol)
-    PE_faces = []
-    #PE_faces.append((True,  [[L, M, A2, Q]]))
-    PE_faces.append((True,  [[A2, P, Q]]))
-    #PE_faces.append((True,  [[N, P, A2]]))
-    PE_faces.append((True,  [[L, P, Q]]))
-    PE_faces.append((True, [[L, M, N]]))
-    PE_faces.append((False, [[M, A2, N]]))
-    PE_faces.append((False, [[N, L, P]]))
-    for hidden, face in PE_faces:
-        pol = Poly3DCollection(face)
-        pol.set_facecolor((0.5, 0.5, 0.5, PE_alpha))
-        pol.set_edgecolor(linecolor)
-        pol.set_linewidth(0.5)
-        if hidden:
-            pol.set_linestyle('--')
-        ax.add_collection3d(pol)
-    #ax.scatter(*zip(*weyl_points.values()), edgecolors='None', s=1.0)
-    label_offsets = {
-        'A_1' : (-0.1, 0.0, 0.0),
-        'A_2' : (0, 0, 0),
-        'A_3' : (0, 0, 0),
-        'O'   : (0, -0.03, 0.01),
-        'L'   : (-0.05, 0, 0.01),
-        'M'   : (0.05, -0.01, 0),
-        'N'   : (-0.055, 0, 0.008),
-        'P'   : (-0.05, 0, 0.008),
-        'Q'   : (0, 0.01, 0.01)}
-    for label, coords in weyl_points.items():
-        coords = np.array(coords) + np.array(label_offsets[label])
-        c = linecolor
-        if label == 'Q':
-            c = 'DarkSlateGray'
-        ax.text(coords[0], coords[1], coords[2], "$%s$" % label, color=c,
-                fontsize='small')
-    ax.set_xlabel('$c_1/\\pi$')
-    ax.set_ylabel('$c_2/\\pi$')
-    ax.set_zlabel('$c_3/\\pi$')
-    ax.set_xlim(0,1)
-    ax.set_ylim(0,0.5)
-    ax.set_zlim(0,0.5)
-    ax.patch.set_facecolor('None')
-    ax.w_xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-    ax.w_yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-    ax.w_zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-    ax.grid(False)
+    SCAFFOLD.draw(ax)
 
     ### Create and plot actual data ###
 
@@ -235,7 +165,7 @@ def plot_weyl_chamber(outfile):
         ax.add_artist(a)
 
     path_50 = filter_path(weyl_paths[50])
-    s = ax.scatter(*zip(*path_50), c=BLUE, edgecolors='None', s=pointsize)
+    s = ax.scatter(*path_50.T, c=BLUE, edgecolors='None', s=pointsize)
     jump50_1 = (0.876398, 0.082, 0.0)
     jump50_2 = (0.126301, 0.082, 0.0)
     draw_arrow(jump50_1, jump50_2, color=BLUE)
@@ -243,12 +173,14 @@ def plot_weyl_chamber(outfile):
     #s.set_edgecolors = s.set_facecolors = lambda *args:None
 
     path_400 = filter_path(weyl_paths[400])
-    s = ax.scatter(*zip(*path_400), c=PURPLE, edgecolors='None', s=pointsize)
+    s = ax.scatter(*path_400.T, c=PURPLE, edgecolors='None', s=pointsize)
     # remove the "transparency fog" that matplotlib adds as to indicate depth
     #s.set_edgecolors = s.set_facecolors = lambda *args:None
 
     end_points = []
     for label in weyl_paths.keys():
+        if len(weyl_paths[label]) == 0:
+            continue # optimization has just started
         end_points.append(end_point(weyl_paths[label]))
         c1, c2, c3 = end_points[-1]
         label_origin = {
@@ -278,10 +210,10 @@ def plot_weyl_chamber(outfile):
                     color='black', linestyle='-', linewidth=0.2)
             ax.text(o1, o2, o3, "400$^*$", color=linecolor,
                     horizontalalignment='right', fontsize='small')
-    s = ax.scatter(*zip(*end_points), c='black', edgecolors='None', s=pointsize)
-    # remove the "transparency fog" that matplotlib adds as to indicate depth
-    s.set_edgecolors = s.set_facecolors = lambda *args:None
-    ax.tick_params(direction='out', pad=20)
+    if len(end_points) > 0:
+        s = ax.scatter(*np.array(end_points).T, c='black', edgecolors='None', s=pointsize)
+        # remove the "transparency fog" that matplotlib adds as to indicate depth
+        s.set_edgecolors = s.set_facecolors = lambda *args:None
 
 
     ### Write out ###
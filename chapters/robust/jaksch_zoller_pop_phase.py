@@ -2,10 +2,11 @@
 import os
 import sys
 import numpy as np
+from disstools.cache import genfromtxt
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import get_color, set_axis, new_figure, ls
-from QDYN.pulse import Pulse
+from disstools.downsample import downsample
 
 def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1,
     pop_r1, pop_00, pop_i0, pop_r0, phase_10, phase_1r, phase_01, phase_r1,
@@ -34,10 +35,10 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1,
     pos = [left_margin/fig_width, p1_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, pop_00, label='$00$', color=blue)
-    ax.plot(tgrid, pop_i0, label='$i0$', color=red,
+    ax.plot(*downsample(tgrid, pop_00, w), label='$00$', color=blue)
+    ax.plot(*downsample(tgrid, pop_i0, w), label='$i0$', color=red,
             dashes=ls['long-dashed'])
-    ax.plot(tgrid, pop_r0, label='$r0$', color=orange,
+    ax.plot(*downsample(tgrid, pop_r0, w), label='$r0$', color=orange,
             dashes=ls['dashed'])
     set_axis(ax, 'x', 0, 800, 100, minor=4, label='time (ns)')
     set_axis(ax, 'y', 0, 1,  0.2, minor=2)
@@ -47,10 +48,10 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1,
     pos = [left_margin/fig_width, p2_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, pop_01, label='$01$', color=blue)
-    ax.plot(tgrid, pop_i1, label='$i1$', color=red,
+    ax.plot(*downsample(tgrid, pop_01, w), label='$01$', color=blue)
+    ax.plot(*downsample(tgrid, pop_i1, w), label='$i1$', color=red,
             dashes=ls['long-dashed'])
-    ax.plot(tgrid, pop_r1, label='$r1$', color=orange,
+    ax.plot(*downsample(tgrid, pop_r1, w), label='$r1$', color=orange,
             dashes=ls['dashed'])
     set_axis(ax, 'x', 0, 800, 100, minor=4)
     set_axis(ax, 'y', 0, 1,  0.2, minor=2)
@@ -61,10 +62,10 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1,
     pos = [left_margin/fig_width, p3_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, pop_10, label='$10$', color=blue)
-    ax.plot(tgrid, pop_1i, label='$1i$', color=red,
+    ax.plot(*downsample(tgrid, pop_10, w), label='$10$', color=blue)
+    ax.plot(*downsample(tgrid, pop_1i, w), label='$1i$', color=red,
             dashes=ls['long-dashed'])
-    ax.plot(tgrid, pop_1r, label='$1r$', color=orange,
+    ax.plot(*downsample(tgrid, pop_1r, w), label='$1r$', color=orange,
             dashes=ls['dashed'])
     set_axis(ax, 'x', 0, 800, 100, minor=4)
     set_axis(ax, 'y', 0, 1,  0.2, minor=2)
@@ -76,8 +77,8 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1,
     pos = [(left_margin+w+hgap)/fig_width, p1_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, phase_00, label=r'$00$', color=blue)
-    ax.plot(tgrid, phase_r0, label=r'$r0$', color=orange,
+    ax.plot(*downsample(tgrid, phase_00, w), label=r'$00$', color=blue)
+    ax.plot(*downsample(tgrid, phase_r0, w), label=r'$r0$', color=orange,
             dashes=ls['dashed'])
     set_axis(ax, 'x', 0, 800, 100, minor=4, label='time (ns)')
     set_axis(ax, 'y', -1, 1,  0.5, minor=2)
@@ -87,8 +88,8 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1,
     pos = [(left_margin+w+hgap)/fig_width, p2_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, phase_01, label=r'$01$', color=blue)
-    ax.plot(tgrid, phase_r1, label=r'$r1$', color=orange,
+    ax.plot(*downsample(tgrid, phase_01, w), label=r'$01$', color=blue)
+    ax.plot(*downsample(tgrid, phase_r1, w), label=r'$r1$', color=orange,
             dashes=ls['dashed'])
     set_axis(ax, 'x', 0, 800, 100, minor=4)
     set_axis(ax, 'y', -1, 1,  0.5, minor=2)
@@ -99,8 +100,8 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1,
     pos = [(left_margin+w+hgap)/fig_width, p3_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, phase_00, label=r'$10$', color=blue)
-    ax.plot(tgrid, phase_r0, label=r'$1r$', color=orange,
+    ax.plot(*downsample(tgrid, phase_00, w), label=r'$10$', color=blue)
+    ax.plot(*downsample(tgrid, phase_r0, w), label=r'$1r$', color=orange,
             dashes=ls['dashed'])
     set_axis(ax, 'x', 0, 800, 100, minor=4)
     set_axis(ax, 'y', -1, 1,  0.5, minor=2)
@@ -128,9 +129,9 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1,
 
 def read_data(data_folder):
     tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1, pop_r1, pop_00, pop_i0, \
-    pop_r0 = np.genfromtxt(os.path.join(data_folder, 'pop.dat'), unpack=True)
+    pop_r0 = genfromtxt(os.path.join(data_folder, 'pop.dat'), unpack=True)
     tgrid, phase_10, phase_1r, phase_01, phase_r1, phase_00, phase_r0 \
-    = np.genfromtxt(os.path.join(data_folder, 'phase.dat'), unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'phase.dat'), unpack=True)
     return tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1, pop_r1, pop_00,     \
            pop_i0, pop_r0, phase_10, phase_1r, phase_01, phase_r1, phase_00,  \
            phase_r0
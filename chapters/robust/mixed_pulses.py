@@ -5,7 +5,7 @@ import numpy as np
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import get_color, set_axis, new_figure
-from QDYN.pulse import Pulse
+from disstools.pulsefile import load_pulse
 
 def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
     pulse_red_right):
@@ -70,10 +70,10 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
 
 
 def read_data(data_folder):
-    pulse_blue_left  = Pulse(filename=os.path.join(data_folder, 'mixed_pulse1.dat'))
-    pulse_red_left   = Pulse(filename=os.path.join(data_folder, 'mixed_pulse2.dat'))
-    pulse_blue_right = Pulse(filename=os.path.join(data_folder, 'mixed_pulse3.dat'))
-    pulse_red_right  = Pulse(filename=os.path.join(data_folder, 'mixed_pulse4.dat'))
+    pulse_blue_left  = load_pulse(os.path.join(data_folder, 'mixed_pulse1.dat'))
+    pulse_red_left   = load_pulse(os.path.join(data_folder, 'mixed_pulse2.dat'))
+    pulse_blue_right = load_pulse(os.path.join(data_folder, 'mixed_pulse3.dat'))
+    pulse_red_right  = load_pulse(os.path.join(data_folder, 'mixed_pulse4.dat'))
     return pulse_blue_left, pulse_red_left, pulse_blue_right, pulse_red_right
 
 
@@ -2,10 +2,12 @@
 import os
 import sys
 import numpy as np
+from disstools.cache import genfromtxt
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import get_color, set_axis, new_figure, ls, \
                             set_color_cycle
+from disstools.downsample import downsample
 
 def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, \
     pop_i1, pop_r1, pop_00, pop_int, pop_r0, pop_0r, pop_rr):
@@ -31,11 +33,14 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, \
     pos = [left_margin/fig_width, p1_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, pop_00,  label='00')
-    ax.plot(tgrid, pop_int, label='int', dashes=ls['dashed'])
-    ax.plot(tgrid, pop_r0,  label='r0',  dashes=ls['long-dashed'])
-    ax.plot(tgrid, pop_0r,  label='0r',  dashes=ls['dash-dotted'])
-    ax.plot(tgrid, pop_rr,  label='rr',  dashes=ls['dash-dash-dotted'])
+    ax.plot(*downsample(tgrid, pop_00, w), label='00')
+    ax.plot(*downsample(tgrid, pop_int, w), label='int', dashes=ls['dashed'])
+    ax.plot(*downsample(tgrid, pop_r0, w), label='r0',
+            dashes=ls['long-dashed'])
+    ax.plot(*downsample(tgrid, pop_0r, w), label='0r',
+            dashes=ls['dash-dotted'])
+    ax.plot(*downsample(tgrid, pop_rr, w), label='rr',
+            dashes=ls['dash-dash-dotted'])
     set_axis(ax, 'x', 0, 800, 100, minor=4, label='time (ns)')
     set_axis(ax, 'y', 0, 1.05,  0.2, minor=2)
     ax.legend(loc='center left',
@@ -47,9 +52,10 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, \
     pos = [left_margin/fig_width, p2_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, pop_01,  label='01')
-    ax.plot(tgrid, pop_i1 , label='i1',  dashes=ls['dashed'])
-    ax.plot(tgrid, pop_r1,  label='r1',  dashes=ls['long-dashed'])
+    ax.plot(*downsample(tgrid, pop_01, w), label='01')
+    ax.plot(*downsample(tgrid, pop_i1, w), label='i1', dashes=ls['dashed'])
+    ax.plot(*downsample(tgrid, pop_r1, w), label='r1',
+            dashes=ls['long-dashed'])
     set_axis(ax, 'x', 0, 800, 100, minor=4)
     set_axis(ax, 'y', 0, 1.05,  0.2, minor=2, label='population')
     ax.set_xticklabels([])
@@ -62,9 +68,10 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, \
     pos = [left_margin/fig_width, p3_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(tgrid, pop_10,  label='10')
-    ax.plot(tgrid, pop_1i , label='1i',  dashes=ls['dashed'])
-    ax.plot(tgrid, pop_1r,  label='1r',  dashes=ls['long-dashed'])
+    ax.plot(*downsample(tgrid, pop_10, w), label='10')
+    ax.plot(*downsample(tgrid, pop_1i, w), label='1i', dashes=ls['dashed'])
+    ax.plot(*downsample(tgrid, pop_1r, w), label='1r',
+            dashes=ls['long-dashed'])
     set_axis(ax, 'x', 0, 800, 100, minor=4)
     set_axis(ax, 'y', 0, 1.05,  0.2, minor=2)
     ax.set_xticklabels([])
@@ -80,17 +87,17 @@ def create_figure(outfile, tgrid, pop_10, pop_1i, pop_1r, pop_01, \
 def read_data(data_folder):
 
     tgrid, pop_10, pop_1i, pop_1r \
-    = np.genfromtxt(os.path.join(data_folder, 'psi10_pops.dat'),
-                    usecols=(0,5,7,8), unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'psi10_pops.dat'),
+                 usecols=(0,5,7,8), unpack=True)
 
     tgrid, pop_01, pop_i1, pop_r1 \
-    = np.genfromtxt(os.path.join(data_folder, 'psi01_pops.dat'),
-                    usecols=(0,2,10,14), unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'psi01_pops.dat'),
+                 usecols=(0,2,10,14), unpack=True)
 
     tgrid, pop_00, pop_0i, pop_i0, pop_ii, pop_ir, \
     pop_ri, pop_r0, pop_0r, pop_rr \
-    = np.genfromtxt(os.path.join(data_folder, 'psi00_pops.dat'),
-                    usecols=(0,1,3,9,11,12,15,13,4,16), unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'psi00_pops.dat'),
+                 usecols=(0,1,3,9,11,12,15,13,4,16), unpack=True)
     pop_int = pop_0i + pop_i0 + pop_ii + pop_ir + pop_ri
 
     return tgrid, pop_10, pop_1i, pop_1r, pop_01, pop_i1, pop_r1, pop_00, \
@@ -5,10 +5,17 @@ import numpy as np
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import get_color, set_axis, new_figure
-from QDYN.pulse import Pulse
+from disstools.downsample import downsample
+from disstools.pulsefile import load_pulse
+from disstools.spectra import pulse_spectra
+
+# The spectra are scaled such that the spectrum of this pulse (red pulse on
+# the right atom in robust_oct_pulses.py) has a maximum of 1.393
+SCALE_REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'robust_oct_pulses', 'pulse4.dat')
 
 def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
-    pulse_red_right, guess_left, guess_right):
+    pulse_red_right, guess_left, guess_right, spectra, scale):
 
     # Layout
     fig_width       = 12.5              # Total canvas (cv) width
@@ -35,18 +42,12 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
     pos = [left_margin/fig_width, p1_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    freq, spec_red_right = pulse_red_right.spectrum(freq_unit='MHz',
-                                                    mode='abs')
-    spec_red_right *= 1.0 / len(spec_red_right)
-    freq, spec_blue_right = pulse_blue_right.spectrum(freq_unit='MHz',
-                                                      mode='abs')
-    spec_blue_right *= 1.0 / len(spec_red_right)
+    freq, spec_red_right = spectra[3]
+    freq, spec_blue_right = spectra[2]
     # rescale
-    #scale = 1.393 / np.max(spec_red_right)
-    scale = 0.0462353850637 # taken from robust_oct_pulses.py
     print "scale = ", scale
-    spec_red_right *= scale
-    spec_blue_right *= scale
+    spec_red_right = scale * spec_red_right
+    spec_blue_right = scale * spec_blue_right
     print "max(red)  [right] = ", np.max(spec_red_right)
     print "max(blue) [right] = ", np.max(spec_blue_right)
 
@@ -78,15 +79,11 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
     pos = [left_margin/fig_width, p2_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    freq, spec_red_left = pulse_red_left.spectrum(freq_unit='MHz',
-                                                    mode='abs')
-    spec_red_left *= 1.0 / len(spec_red_left)
-    freq, spec_blue_left = pulse_blue_left.spectrum(freq_unit='MHz',
-                                                      mode='abs')
-    spec_blue_left *= 1.0 / len(spec_blue_left)
-    # rescale (scaling factor from above)
-    spec_red_left *= scale
-    spec_blue_left *= scale
+    freq, spec_red_left = spectra[1]
+    freq, spec_blue_left = spectra[0]
+    # rescale (same scaling factor as for right atom)
+    spec_red_left = scale * spec_red_left
+    spec_blue_left = scale * spec_blue_left
     print "max(red)  [left] = ", np.max(spec_red_left)
     print "max(blue) [left] = ", np.max(spec_blue_left)
 
@@ -115,11 +112,13 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
     pos = [left_margin/fig_width, p3_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(pulse_red_right.tgrid, np.abs(pulse_red_right.amplitude),
+    ax.plot(*downsample(pulse_red_right.tgrid,
+                        np.abs(pulse_red_right.amplitude), w),
             color=red, rasterized=True)
-    ax.plot(pulse_blue_right.tgrid, np.abs(pulse_blue_right.amplitude),
+    ax.plot(*downsample(pulse_blue_right.tgrid,
+                        np.abs(pulse_blue_right.amplitude), w),
             color=lightblue, rasterized=True)
-    ax.plot(pulse_red_right.tgrid, guess_right, color=orange)
+    ax.plot(*downsample(pulse_red_right.tgrid, guess_right, w), color=orange)
     set_axis(ax, 'x', 0, 100, 20, minor=4, labelpad=1, label='time (ns)')
     set_axis(ax, 'y', 0,  220, 50,  minor=2, label='amplitude (MHz)')
     # move y axis label to cover both panels
@@ -147,11 +146,13 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
     set_axis(ax, 'x', 0, 100, 20, minor=4)
     set_axis(ax, 'y', 0, 220, 50,  minor=2)
     ax.set_xticklabels([])
-    ax.plot(pulse_red_left.tgrid, np.abs(pulse_red_left.amplitude),
+    ax.plot(*downsample(pulse_red_left.tgrid,
+                        np.abs(pulse_red_left.amplitude), w),
             color=red, rasterized=True)
-    ax.plot(pulse_blue_left.tgrid, np.abs(pulse_blue_left.amplitude),
+    ax.plot(*downsample(pulse_blue_left.tgrid,
+                        np.abs(pulse_blue_left.amplitude), w),
             color=lightblue, rasterized=True)
-    ax.plot(pulse_red_left.tgrid, guess_left, color=orange)
+    ax.plot(*downsample(pulse_red_left.tgrid, guess_left, w), color=orange)
     ax.text(0.25/w, (h-0.2)/h, "a)", transform=ax.transAxes,
             verticalalignment='top', horizontalalignment='left')
 
@@ -171,20 +172,32 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
 
 
 def read_data(data_folder):
-    pulse_blue_left  = Pulse(filename=os.path.join(data_folder, 'pulse1.dat'))
-    pulse_red_left   = Pulse(filename=os.path.join(data_folder, 'pulse2.dat'))
-    pulse_blue_right = Pulse(filename=os.path.join(data_folder, 'pulse3.dat'))
-    pulse_red_right  = Pulse(filename=os.path.join(data_folder, 'pulse4.dat'))
+    pulse_blue_left  = load_pulse(os.path.join(data_folder, 'pulse1.dat'))
+    pulse_red_left   = load_pulse(os.path.join(data_folder, 'pulse2.dat'))
+    pulse_blue_right = load_pulse(os.path.join(data_folder, 'pulse3.dat'))
+    pulse_red_right  = load_pulse(os.path.join(data_folder, 'pulse4.dat'))
+    # spectra in the plotted frequency band, normalized to the number of
+    # points in the pulse, so that robust_oct_pulses and robust_oct_pulses100
+    # can share the same scale
+    spectra = pulse_spectra([os.path.join(data_folder, 'pulse%d.dat' % i)
+                             for i in (1, 2, 3, 4)], freq_unit='MHz',
+                            mode='abs', band=(-1500.0, 1500.0), n_freq=3001,
+                            normalize=True)
     for pulse in [pulse_blue_left, pulse_red_left, pulse_blue_right,
     pulse_red_right]:
         pulse.amplitude *= 100.0
         pulse.ampl_unit = 'MHz'
-    guess_left  = Pulse(filename=os.path.join(data_folder, 'pulse1.guess'))
-    guess_right = Pulse(filename=os.path.join(data_folder, 'pulse3.guess'))
+    guess_left  = load_pulse(os.path.join(data_folder, 'pulse1.guess'))
+    guess_right = load_pulse(os.path.join(data_folder, 'pulse3.guess'))
     guess_left  = np.abs(guess_left.amplitude)
     guess_right = np.abs(guess_right.amplitude)
+    # use the same scaling as in robust_oct_pulses.py
+    ref_freq, ref_spec = pulse_spectra(
+        [SCALE_REFERENCE, ], freq_unit='MHz', mode='abs',
+        band=(-1500.0, 1500.0), n_freq=3001, normalize=True)[0]
+    scale = 1.393 / np.max(ref_spec)
     return pulse_blue_left, pulse_red_left, pulse_blue_right, \
-           pulse_red_right, guess_left, guess_right
+           pulse_red_right, guess_left, guess_right, spectra, scale
 
 
 def main(argv=None):
@@ -2,6 +2,7 @@
 import os
 import sys
 import numpy as np
+from disstools.cache import genfromtxt
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import get_color, set_axis, new_figure, ls, \
@@ -68,13 +69,13 @@ def create_figure(outfile, sig_time, rob_jz_time, rob_stirap_time,
 def read_data(data_folder):
 
     sig_time, rob_jz_time, rob_stirap_time, rob_mixed_time \
-    = np.genfromtxt(os.path.join(data_folder, 'robust_time.dat'), unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'robust_time.dat'), unpack=True)
 
     sig_ampl, rob_jz_ampl, rob_stirap_ampl, rob_mixed_ampl \
-    = np.genfromtxt(os.path.join(data_folder, 'robust_ampl.dat'), unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'robust_ampl.dat'), unpack=True)
 
     sig_det, rob_jz_det, rob_stirap_det, rob_mixed_det \
-    = np.genfromtxt(os.path.join(data_folder, 'robust_det.dat'), unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'robust_det.dat'), unpack=True)
 
     return sig_time, rob_jz_time, rob_stirap_time, rob_mixed_time, sig_ampl, \
     rob_jz_ampl, rob_stirap_ampl, rob_mixed_ampl, sig_det, rob_jz_det, \
@@ -2,6 +2,7 @@
 import os
 import sys
 import numpy as np
+from disstools.cache import genfromtxt
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import get_color, set_axis, new_figure, ls, \
@@ -77,13 +78,13 @@ def read_data(data_folder):
 
     sig_mixed_ampl, rob_mixed_ampl, rob_800oct_ampl, \
     rob_800oct2_ampl, rob_100oct_ampl \
-    = np.genfromtxt(os.path.join(data_folder, 'robust_oct_ampl.dat'),
-                    unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'robust_oct_ampl.dat'),
+                 unpack=True)
 
     sig_mixed_det, rob_mixed_det, rob_800oct_det, \
     rob_800oct2_det, rob_100oct_det \
-    = np.genfromtxt(os.path.join(data_folder, 'robust_oct_det.dat'),
-                    unpack=True)
+    = genfromtxt(os.path.join(data_folder, 'robust_oct_det.dat'),
+                 unpack=True)
 
     return sig_mixed_ampl, rob_mixed_ampl, rob_800oct_ampl, rob_800oct2_ampl, \
            rob_100oct_ampl, sig_mixed_det, rob_mixed_det, rob_800oct_det,     \
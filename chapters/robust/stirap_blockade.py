@@ -2,6 +2,7 @@
 import os
 import sys
 import numpy as np
+from disstools.cache import genfromtxt
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import get_color, set_axis, new_figure, ls
@@ -80,11 +81,11 @@ def read_data(data_folder):
 
     ampl, final_1r_1200, final_rr_1200, \
     max_1r_1200, max_rr_1200, blockeff_1200  \
-    = np.genfromtxt(os.path.join(data_folder, '1200.dat'), unpack=True)
+    = genfromtxt(os.path.join(data_folder, '1200.dat'), unpack=True)
 
     ampl, final_1r_4200, final_rr_4200, \
     max_1r_4200, max_rr_4200, blockeff_4200 \
-    = np.genfromtxt(os.path.join(data_folder, '4200.dat'), unpack=True)
+    = genfromtxt(os.path.join(data_folder, '4200.dat'), unpack=True)
 
     return ampl, final_1r_1200, final_rr_1200, max_1r_1200, max_rr_1200,    \
            blockeff_1200, final_1r_4200, final_rr_4200, max_1r_4200,  \
@@ -5,7 +5,8 @@ import numpy as np
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import get_color, set_axis, new_figure
-from QDYN.pulse import Pulse
+from disstools.downsample import downsample
+from disstools.pulsefile import load_pulse
 
 def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
     pulse_red_right):
@@ -30,9 +31,11 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
     pos = [left_margin/fig_width, p1_offset/fig_height,
            w/fig_width, h/fig_height]
     ax = fig.add_axes(pos)
-    ax.plot(pulse_blue_right.tgrid, np.abs(pulse_blue_right.amplitude),
+    ax.plot(*downsample(pulse_blue_right.tgrid,
+                        np.abs(pulse_blue_right.amplitude), w),
             color=lightblue)
-    line, = ax.plot(pulse_red_right.tgrid, np.abs(pulse_red_right.amplitude),
+    line, = ax.plot(*downsample(pulse_red_right.tgrid,
+                                np.abs(pulse_red_right.amplitude), w),
                     color=red)
     #line.set_dashes([8,8])
     set_axis(ax, 'x', 0, 4500, 1000, minor=4,
@@ -52,9 +55,12 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
     set_axis(ax, 'x', 0, 4500, 1000, minor=4)
     set_axis(ax, 'y', 0, 1050, 200,  minor=2)
     ax.set_xticklabels([])
-    ax.plot(pulse_blue_left.tgrid, np.abs(pulse_blue_left.amplitude),
+    ax.plot(*downsample(pulse_blue_left.tgrid,
+                        np.abs(pulse_blue_left.amplitude), w),
             color=lightblue)
-    line, = ax.plot(pulse_red_left.tgrid, np.abs(pulse_red_left.amplitude), color=red)
+    line, = ax.plot(*downsample(pulse_red_left.tgrid,
+                                np.abs(pulse_red_left.amplitude), w),
+                    color=red)
     #line.set_dashes([8,8])
     ax.text(0.5, 0.7, 'left atom',  horizontalalignment='center',
             transform=ax.transAxes)
@@ -71,10 +77,10 @@ def create_figure(outfile, pulse_blue_left, pulse_red_left, pulse_blue_right,
 
 
 def read_data(data_folder):
-    pulse_blue_left  = Pulse(filename=os.path.join(data_folder, 'stirap_pulse1.dat'))
-    pulse_red_left   = Pulse(filename=os.path.join(data_folder, 'stirap_pulse2.dat'))
-    pulse_blue_right = Pulse(filename=os.path.join(data_folder, 'stirap_pulse3.dat'))
-    pulse_red_right  = Pulse(filename=os.path.join(data_folder, 'stirap_pulse4.dat'))
+    pulse_blue_left  = load_pulse(os.path.join(data_folder, 'stirap_pulse1.dat'))
+    pulse_red_left   = load_pulse(os.path.join(data_folder, 'stirap_pulse2.dat'))
+    pulse_blue_right = load_pulse(os.path.join(data_folder, 'stirap_pulse3.dat'))
+    pulse_red_right  = load_pulse(os.path.join(data_folder, 'stirap_pulse4.dat'))
     return pulse_blue_left, pulse_red_left, pulse_blue_right, pulse_red_right
 
 
@@ -4,7 +4,7 @@ import sys
 import re
 import numpy as np
 from glob import glob
-from QDYN.pulse import Pulse
+from disstools.spectra import pulse_spectra
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import set_axis, new_figure, get_color
@@ -68,10 +68,10 @@ def read_data(data_folder):
     """
     Return E (array), entanglement (dict), nc (dict), nq (dict)
     """
-    pulse1000 = Pulse(os.path.join(data_folder, 'pulse.CPH0009.dat'))
-    pulse400 = Pulse(os.path.join(data_folder, 'pulse.CPH0012.dat'))
-    freq1000, spec1000 = pulse1000.spectrum(freq_unit='GHz', mode='abs')
-    freq400, spec400 = pulse400.spectrum(freq_unit='GHz', mode='abs')
+    (freq1000, spec1000), (freq400, spec400) = pulse_spectra(
+        [os.path.join(data_folder, 'pulse.CPH0009.dat'),
+         os.path.join(data_folder, 'pulse.CPH0012.dat')],
+        freq_unit='GHz', mode='abs', band=(6.0, 10.9))
     return freq400, spec400, freq1000, spec1000
 
 
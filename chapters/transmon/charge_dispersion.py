@@ -4,6 +4,7 @@ import sys
 import re
 import numpy as np
 from glob import glob
+from scipy.linalg import eigvalsh_tridiagonal
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import set_axis, new_figure, set_color_cycle
@@ -76,39 +77,50 @@ def plot_charge_dispersion(ax, EJ, EC, chargevals=None, n_levels=None,
     ngs = np.linspace(ng_min, ng_max, samples)
     if title is not None:
         ax.set_title(title)
+    E = charge_energies(EJ, EC, ngs, chargevals, n_levels) / EC
+    offset = E[0,0]
+    for n in xrange(E.shape[1]):
+        ax.plot(ngs, E[:,n]-offset)
+
+
+def get_ham_bands(EJ, EC, ngs, chargevals=None):
+    """
+    Return the charge qubit Hamiltonian for all the values in the array `ngs`,
+    as a tuple (diag, offdiag) of the tridiagonal bands: `diag` has one row
+    of diagonal elements for each value of ng, `offdiag` are the (constant)
+    off-diagonal elements
+    """
     if chargevals is None:
         chargevals = CHARGEVALS
+    chargevals = np.asarray(chargevals, dtype=np.float64)
+    ngs = np.asarray(ngs, dtype=np.float64).reshape(-1, 1)
+    diag = 4*EC * (chargevals[np.newaxis,:] - ngs)**2
+    offdiag = np.full(len(chargevals)-1, -0.5*EJ)
+    return diag, offdiag
+
+
+def charge_energies(EJ, EC, ngs, chargevals=None, n_levels=None):
+    """
+    Return an array of the lowest `n_levels` eigenvalues of the charge qubit
+    Hamiltonian, with one row for each value in the array `ngs`
+
+    Only the requested eigenvalues are calculated by a symmetric tridiagonal
+    solver, so that large charge bases and a dense sampling of ng are cheap.
+    """
     if n_levels is None:
         n_levels = N_LEVELS
-    E = []
-    for __ in xrange(n_levels):
-        E.append(np.zeros(samples))
-    for i, ng in enumerate(ngs):
-        H = get_ham(EJ, EC, ng, chargevals)
-        evals, evecs = np.linalg.eig(H)
-        order = evals.argsort()
-        evals = evals[order]
-        evecs = evecs[order]
-        for n in xrange(n_levels):
-            E[n][i] = evals[n] / EC
-    offset = E[0][0]
-    for n in xrange(n_levels):
-        ax.plot(ngs, E[n]-offset)
+    diag, offdiag = get_ham_bands(EJ, EC, ngs, chargevals)
+    E = np.empty((diag.shape[0], n_levels))
+    for i in xrange(diag.shape[0]):
+        E[i] = eigvalsh_tridiagonal(diag[i], offdiag, select='i',
+                                    select_range=(0, n_levels-1))
+    return E
 
 
 def get_ham(EJ, EC, ng, chargevals=None):
     """Construct the charge qubit Hamiltonian"""
-    if chargevals is None:
-        chargevals = CHARGEVALS
-    n_levels = len(chargevals)
-    H = np.zeros((n_levels,n_levels))
-    for i, n in enumerate(chargevals):
-        for j in xrange(n_levels):
-            if i == j:
-                H[i,j] = 4*EC * (n-ng)**2
-            elif i == j+1 or i == j-1:
-                H[i,j] = -0.5*EJ
-    return H
+    diag, offdiag = get_ham_bands(EJ, EC, [ng, ], chargevals)
+    return np.diag(diag[0]) + np.diag(offdiag, 1) + np.diag(offdiag, -1)
 
 
 def print_eigensystem(EJ, EC, ng, chargevals=None, n_levels=None):
@@ -122,14 +134,11 @@ def print_eigensystem(EJ, EC, ng, chargevals=None, n_levels=None):
     print "H = "
     import QDYN
     QDYN.io.print_matrix(H)
-    evals, evecs = np.linalg.eig(H)
-    order = evals.argsort()
-    evals = evals[order]
-    evecs = evecs[order]
+    evals, evecs = np.linalg.eigh(H) # sorted, eigenvectors in columns
     for n in xrange(n_levels):
         print ""
         print "eval %d: %f" % (n, evals[n] / EC)
-        print "evec %d: %s" % (n, charge_state_str(evecs[n], chargevals))
+        print "evec %d: %s" % (n, charge_state_str(evecs[:,n], chargevals))
     print ""
 
 
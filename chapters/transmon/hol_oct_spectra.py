@@ -2,7 +2,7 @@
 import os
 import sys
 import numpy as np
-from QDYN.pulse import Pulse
+from disstools.spectra import pulse_spectra
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import set_axis, new_figure, get_color
@@ -78,11 +78,10 @@ def create_figure(outfile, freq_left, spec_left, freq_right, spec_right):
 
 def read_data(folder_left, folder_right):
 
-    pulse_left = Pulse(os.path.join(folder_left, 'pulse.dat'))
-    freq_left, spec_left = pulse_left.spectrum(freq_unit='MHz', mode='abs')
-
-    pulse_right = Pulse(os.path.join(folder_right, 'pulse.dat'))
-    freq_right, spec_right = pulse_right.spectrum(freq_unit='MHz', mode='abs')
+    (freq_left, spec_left), (freq_right, spec_right) = pulse_spectra(
+        [os.path.join(folder_left, 'pulse.dat'),
+         os.path.join(folder_right, 'pulse.dat')],
+        freq_unit='MHz', mode='abs', band=(-1500.0, 1500.0), n_freq=3001)
 
     return freq_left, spec_left, freq_right, spec_right
 
@@ -2,6 +2,7 @@
 import os
 import sys
 import numpy as np
+from disstools.tail import read_tail
 from glob import glob
 import matplotlib
 matplotlib.use('PDF')
@@ -36,7 +37,12 @@ def create_figure(outfile, data):
     fig_height = bottom_margin + n_panels*h + (n_panels-1)*gap + top_margin
     fig = new_figure(fig_width, fig_height)
 
-    E = data[data.keys()[0]]['E'] # pulse amplitude, for all axes
+    # range of pulse amplitudes, for all axes: the full range of the scans,
+    # also while runs are still in progress (or none have started yet)
+    E_min, E_max = 0.0, 500.0
+    for run in data.values():
+        E_min = min(E_min, run['E'][0])
+        E_max = max(E_max, run['E'][-1])
 
     axes = [] # panels
     # create axes from top to bottom
@@ -46,10 +52,10 @@ def create_figure(outfile, data):
                w/fig_width, h/fig_height]
         ax = fig.add_axes(pos)
         if i == n_panels-1:
-            set_axis(ax, 'x', E[0], E[-1], 50, minor=5,
+            set_axis(ax, 'x', E_min, E_max, 50, minor=5,
                      label=r'peak pulse amplitude $\epsilon_0$ (MHz)')
         else:
-            set_axis(ax, 'x', E[0], E[-1], 50, minor=5, ticklabels=False)
+            set_axis(ax, 'x', E_min, E_max, 50, minor=5, ticklabels=False)
         set_axis(ax, 'y', 0, 1, 0.5, minor=5)
         if i == 0: # top panel
             ax.set_yticklabels(['0', '0.5', '1.0'])
@@ -144,22 +150,20 @@ def read_data(data_folder):
     for folder in subdirs:
         foldername = os.path.split(folder)[-1]
         datfile = glob(os.path.join(folder, 'entanglement*.dat'))[0]
-        try:
-            E, concurrence, pop_loss = np.genfromtxt(datfile, usecols=(0,1,2),
-                                                    unpack=True)
-            nq_vals, nc_vals = np.genfromtxt(datfile, usecols=(3,4),
-                                            dtype=np.int, unpack=True)
-
-            result[foldername] = {
-                'E':  E,
-                'concurrence':  concurrence,
-                'pop_loss':  pop_loss,
-                'nq_vals':  nq_vals,
-                'nc_vals':  nc_vals
-            }
-        except ValueError:
-            # skip if the data file is empty (run has not finished yet)
-            pass
+        # runs that have not finished yet are shown up to their last line
+        data = read_tail(datfile, usecols=(0,1,2,3,4))
+        E, concurrence, pop_loss = data[:,0:3].T
+        nq_vals, nc_vals = data[:,3:5].T.astype(np.int)
+        if len(E) == 0:
+            continue # run has just started
+
+        result[foldername] = {
+            'E':  E,
+            'concurrence':  concurrence,
+            'pop_loss':  pop_loss,
+            'nq_vals':  nq_vals,
+            'nc_vals':  nc_vals
+        }
     return result
 
 
@@ -4,7 +4,7 @@ import sys
 import re
 import numpy as np
 from glob import glob
-from QDYN.pulse import Pulse
+from disstools.spectra import pulse_spectra
 import matplotlib
 matplotlib.use('PDF')
 from mgplottools.mpl import set_axis, new_figure, get_color
@@ -106,14 +106,15 @@ def read_data(data_folder):
     """
     Return E (array), entanglement (dict), nc (dict), nq (dict)
     """
-    pulseCPH1000 = Pulse(os.path.join(data_folder, 'pulse.CPH0009.dat'))
-    pulseCPH200 = Pulse(os.path.join(data_folder, 'pulse.CPH0010.dat'))
-    freqCPH1000, specCPH1000 = pulseCPH1000.spectrum(freq_unit='GHz', mode='abs')
-    freqCPH200, specCPH200 = pulseCPH200.spectrum(freq_unit='GHz', mode='abs')
-    pulseCNT1000 = Pulse(os.path.join(data_folder, 'pulse.CNT0020.dat'))
-    pulseCNT200 = Pulse(os.path.join(data_folder, 'pulse.CNT0010.dat'))
-    freqCNT1000, specCNT1000 = pulseCNT1000.spectrum(freq_unit='GHz', mode='abs')
-    freqCNT200, specCNT200 = pulseCNT200.spectrum(freq_unit='GHz', mode='abs')
+    files = [os.path.join(data_folder, filename) for filename in
+             ['pulse.CPH0010.dat', 'pulse.CPH0009.dat', 'pulse.CNT0010.dat',
+              'pulse.CNT0020.dat']]
+    spectra = pulse_spectra(files, freq_unit='GHz', mode='abs',
+                            band=(6.0, 10.9))
+    freqCPH200, specCPH200 = spectra[0]
+    freqCPH1000, specCPH1000 = spectra[1]
+    freqCNT200, specCNT200 = spectra[2]
+    freqCNT1000, specCNT1000 = spectra[3]
     return freqCPH200, specCPH200, freqCPH1000, specCPH1000, \
            freqCNT200, specCNT200, freqCNT1000, specCNT1000
 
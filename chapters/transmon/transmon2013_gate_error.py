@@ -2,14 +2,14 @@
 # -*- coding: utf-8 -*-
 
 """
-Script for generating a plot of gate error (data included in file)
+Script for generating a plot of gate error (data from disstools.datasets)
 """
 import os
 import sys
 import numpy as np
+from disstools import datasets
 import matplotlib
 matplotlib.use('PDF')
-from StringIO import StringIO
 from mgplottools.mpl import get_color, set_axis, new_figure, \
                             set_color_cycle
 
@@ -106,34 +106,8 @@ def create_figure(outfile, T, E_max, pop_loss, peak_qubit, peak_cavity,
 
 
 def read_data(gate):
-    #uk006169@katamon:~/jobs/DissertationTM> cat transmon2013_cphase.dat
-    data = {}
-    data['CPHASE'] = """
-# T [ns] E_max [MHz]                 pop_loss    peak qubit   peak_cavity         1-F_avg(no_diss)   1-F_avg(tau=100micros)    1-F_avg(tau=25micros)
-     100      1436.6   7.9805631317856118E-02        1.1744        7.3342   2.8625775910490842E-01   2.8781693601806418E-01   2.9247230359156129E-01
-     200      1177.1   2.7089049199828801E-03        2.0116       11.6775   2.7637640092690319E-03   9.9031983717954297E-03   3.1001157091772761E-02
-     250       987.3   2.2072854070904761E-03        1.4504       11.7758   2.2389699247071788E-03   8.5763986485041244E-03   2.7326725629151841E-02
-#     300       846.7   1.6789961906125361E-02        1.0448       11.7100   2.0586740322626640E-02   2.8413890460260220E-02   5.1473431348428078E-02
-# T=300 is outlier: pulse was complex when it should be real -> discard
-     400       490.0   9.9447729773305404E-04        1.9717        5.7139   9.9888962386684987E-04   6.4325305178105641E-03   2.2516643077624909E-02
-     500       585.9   7.6298879400100716E-03        1.7707       10.0698   7.7305403511620518E-03   1.5275989771788789E-02   3.7481213055643670E-02
-     600       550.6   9.7633599027213691E-04        2.0004        4.6567   9.9504849618770042E-04   7.7246971293474243E-03   2.7527990823043580E-02
-     700       269.8   2.2841639976982631E-03        1.7414        4.0625   2.3039495447242380E-03   8.5840778585709598E-03   2.7119349368115438E-02
-     800       225.1   1.4601331116479430E-03        1.0110        4.0472   1.4726207446995601E-03   8.7539440609741836E-03   3.0188273069494339E-02
-     900       346.6   3.7753648150939960E-03        1.6683        7.3124   3.8030142690033131E-03   1.8005026268796520E-02   5.8958380320235482E-02
-    1000       176.6   6.8654144226409919E-04        1.0132        3.4877   6.9717037075456290E-04   1.0985217359672511E-02   4.1045586236366782E-02
-"""
-    data['CNOT'] = """
-# T [ns] E_max [MHz]                 pop_loss    peak qubit   peak_cavity         1-F_avg(no_diss)   1-F_avg(tau=100micros)    1-F_avg(tau=25micros)
-     100      1101.0   9.2121534170207853E-02        1.6945        7.8345   3.0089369295104118E-01   3.0262608595354462E-01   3.0779604927180648E-01
-     200      1082.2   4.3515152435913307E-02        1.8680       26.7518   5.0510782650375903E-02   5.8524348740774390E-02   8.2136978746138789E-02
-#    250      1091.7   3.9074667095453366E-03        2.0158       17.8839   4.1639909666575381E-03   1.0489540439466699E-02   2.9209782254739910E-02
-# T=250 is outlier: pulse was complex when it should be real -> discard
-     300       661.2   1.4304038743124799E-02        1.2475       20.0054   1.5218756650273280E-02   2.5099194653358081E-02   5.4115039073117210E-02
-     500       548.7   1.1122135888285149E-03        2.0031        5.0610   1.1557990112959220E-03   6.7827003468948774E-03   2.3422912765435840E-02
-    1000       124.3   1.4698286566885430E-03        1.1707        2.9240   1.4960446463501140E-03   1.3148485944880490E-02   4.7226337831756997E-02
-"""
-    return np.genfromtxt(StringIO(data[gate]), unpack=True)
+    table = datasets.load('transmon2013_%s' % gate.lower())
+    return [table[field] for field in table.dtype.names]
 
 
 def main(argv=None):
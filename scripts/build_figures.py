@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+Build the figures of all chapters in parallel
+
+Reads the IMG lists (and the explicit dependencies between images) from the
+chapter Makefiles, and runs `make <image>` for all independent images
+concurrently, on a pool of worker processes. Prints the wall time for each
+figure.
+"""
+import os
+import re
+import sys
+import time
+import tempfile
+import subprocess
+from glob import glob
+from multiprocessing import cpu_count
+from optparse import OptionParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files that the figure rules in chapters/figures.mk copy from the root folder.
+# They are created before starting the parallel build, so that concurrent
+# make processes in the same chapter folder don't race to create them
+SHARED_PREREQS = ['matplotlibrc', 'diss.cls', 'mymacros.sty']
+
+
+class Figure(object):
+    """A single image in the IMG list of a chapter Makefile"""
+
+    def __init__(self, chapter, target, deps):
+        self.chapter = chapter # chapter folder, relative to ROOT
+        self.target = target   # name of image, relative to chapter folder
+        self.deps = deps       # list of other Figure instances
+        self.returncode = None
+        self.wall_time = None
+        self.output = ''
+
+    @property
+    def name(self):
+        return os.path.join(self.chapter, self.target)
+
+    def __repr__(self):
+        return "Figure(%r, %r)" % (self.chapter, self.target)
+
+
+def read_makefile(makefile):
+    """
+    Return a tuple (images, rules), where `images` is the list of images in
+    the IMG variable of the given Makefile, and `rules` is a dict that maps
+    each explicit target in the Makefile to its list of prerequisites
+    """
+    with open(makefile) as in_fh:
+        text = in_fh.read()
+    text = re.sub(r'\\\n', ' ', text) # join continuation lines
+    images = []
+    rules = {}
+    for line in text.splitlines():
+        match = re.match(r'^IMG\s*=(.*)$', line)
+        if match:
+            images = match.group(1).split()
+            continue
+        match = re.match(r'^([^\s:=#][^:=]*):(?!=)(.*)$', line)
+        if match:
+            for target in match.group(1).split():
+                rules.setdefault(target, []).extend(match.group(2).split())
+    return images, rules
+
+
+def collect_figures(chapters):
+    """Return a list of Figure instances for all images in the given chapters"""
+    figures = []
+    for chapter in chapters:
+        images, rules = read_makefile(os.path.join(ROOT, chapter, 'Makefile'))
+        by_target = {}
+        for image in images:
+            by_target[image] = Figure(chapter, image, [])
+        for image in images:
+            by_target[image].deps = [by_target[prereq] for prereq
+                                     in rules.get(image, [])
+                                     if prereq in by_target]
+        figures.extend([by_target[image] for image in images])
+    return figures
+
+
+def make_cmd(python, chapter, targets):
+    """Return the command line for building targets in the given chapter"""
+    return ['make', '--no-print-directory', 'PYTHON=%s' % python,
+            '-C', os.path.join(ROOT, chapter)] + list(targets)
+
+
+def build(figures, python, jobs, verbose=False):
+    """
+    Build all figures, running up to `jobs` make processes at the same time.
+    An image is only started once all the images it depends on have finished
+    successfully. Return True if all figures were built successfully.
+    """
+    pending = list(figures)
+    running = {} # Figure => (Popen, output file, start time)
+    done = set()
+    while pending or running:
+        for fig in list(pending):
+            if len(running) >= jobs:
+                break
+            if any(dep.returncode not in (None, 0) for dep in fig.deps):
+                # skip figures whose dependencies failed
+                pending.remove(fig)
+                fig.returncode = -1
+                fig.output = "Not built: a prerequisite failed\n"
+                report(fig, verbose)
+            elif all(dep in done for dep in fig.deps):
+                pending.remove(fig)
+                # the output goes to a temporary file (not a pipe, which could
+                # fill up), and is shown in one piece when the figure is done
+                out_fh = tempfile.TemporaryFile()
+                proc = subprocess.Popen(
+                    make_cmd(python, fig.chapter, [fig.target]),
+                    stdout=out_fh, stderr=subprocess.STDOUT)
+                running[fig] = (proc, out_fh, time.time())
+        for fig, (proc, out_fh, start) in list(running.items()):
+            if proc.poll() is not None:
+                fig.wall_time = time.time() - start
+                fig.returncode = proc.returncode
+                out_fh.seek(0)
+                fig.output = out_fh.read().decode('utf-8', 'replace')
+                out_fh.close()
+                del running[fig]
+                done.add(fig)
+                report(fig, verbose)
+        time.sleep(0.05)
+    return all(fig.returncode == 0 for fig in figures)
+
+
+def report(fig, verbose=False):
+    """Print the wall time (and the output, if verbose or failed) of a finished
+    figure"""
+    if fig.returncode == 0:
+        print("** %-55s %8.2f s" % (fig.name, fig.wall_time))
+    else:
+        print("** %-55s FAILED" % fig.name)
+    if fig.output.strip() != '' and (fig.returncode != 0 or verbose):
+        for line in fig.output.rstrip().splitlines():
+            print("   " + line)
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog [options] [CHAPTER_FOLDER ...]",
+    description = __doc__)
+    arg_parser.add_option(
+        '-j', '--jobs', action='store', dest='jobs', type=int,
+        default=cpu_count(), help="Number of figures to build in parallel "
+        "[default: number of CPUs]")
+    arg_parser.add_option(
+        '--python', action='store', dest='python', default=None,
+        help="Python executable to be used by the chapter Makefiles "
+        "[default: venv/bin/python, if it exists]")
+    arg_parser.add_option(
+        '-v', '--verbose', action='store_true', dest='verbose',
+        default=False, help="Show the output of all figure builds, not just "
+        "of the failed ones")
+    options, args = arg_parser.parse_args(argv)
+    python = options.python
+    if python is None:
+        python = os.path.join(ROOT, 'venv', 'bin', 'python')
+        if not os.path.isfile(python):
+            python = 'python'
+    chapters = [os.path.relpath(os.path.abspath(folder), ROOT)
+                for folder in args[1:]]
+    if len(chapters) == 0:
+        chapters = sorted([os.path.relpath(os.path.dirname(makefile), ROOT)
+                           for makefile in glob(os.path.join(ROOT, 'chapters',
+                                                             '*', 'Makefile'))])
+    for chapter in chapters:
+        subprocess.check_call(make_cmd(python, chapter, SHARED_PREREQS))
+    figures = collect_figures(chapters)
+    start = time.time()
+    success = build(figures, python, max(1, options.jobs), options.verbose)
+    print("")
+    print("Built %d figures in %.2f s (wall time) on %d workers"
+          % (len(figures), time.time() - start, options.jobs))
+    built = [fig for fig in figures if fig.returncode == 0]
+    if len(built) > 0:
+        print("Total time spent in individual figures: %.2f s"
+              % sum([fig.wall_time for fig in built]))
+        slowest = max(built, key=lambda fig: fig.wall_time)
+        print("Slowest figure: %s (%.2f s)" % (slowest.name, slowest.wall_time))
+    if success:
+        return 0
+    else:
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Sample the cloud of Weyl chamber points reachable by a two-qubit Hamiltonian
+
+The model is given with --model, as MODULE:FUNCTION (the current working
+directory is searched for MODULE), where FUNCTION() returns a tuple (H0, H1,
+basis), cf. disstools.controllability. The gates for random piecewise-constant
+controls are written to OUTFILE in the format of the `*_cloud.dat` files in
+`chapters/pe/controllability` (columns t, c1, c2, c3), and can be shown with
+`controllability.py --density`.
+
+If OUTFILE already exists, the sampling is resumed after the last finished
+batch.
+"""
+import sys
+from multiprocessing import cpu_count
+from optparse import OptionParser
+
+from disstools.controllability import sample_cloud
+from robustness_sweep import load_function
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog [options] --model MODULE:FUNCTION OUTFILE",
+    description = __doc__)
+    arg_parser.add_option(
+        '--model', action='store', dest='model', default=None,
+        help="Function that returns the tuple (H0, H1, basis), as "
+        "MODULE:FUNCTION")
+    arg_parser.add_option(
+        '--u-max', action='store', dest='u_max', default='1.0',
+        help="Maximum amplitude of the controls, as a comma-separated list "
+        "with one value for each control Hamiltonian, or a single value for "
+        "all controls [default: %default]")
+    arg_parser.add_option(
+        '--dt', action='store', dest='dt', type=float, default=1.0,
+        help="Length of the intervals of constant controls "
+        "[default: %default]")
+    arg_parser.add_option(
+        '--steps', action='store', dest='n_steps', type=int, default=100,
+        help="Number of intervals for each sample [default: %default]")
+    arg_parser.add_option(
+        '--samples', action='store', dest='n_samples', type=int,
+        default=10000, help="Number of random controls [default: %default]")
+    arg_parser.add_option(
+        '--batch', action='store', dest='batch_size', type=int,
+        default=1000, help="Number of samples that are propagated together "
+        "[default: %default]")
+    arg_parser.add_option(
+        '--seed', action='store', dest='seed', type=int, default=0,
+        help="Seed for the random number generator [default: %default]")
+    arg_parser.add_option(
+        '-j', '--jobs', action='store', dest='jobs', type=int,
+        default=cpu_count(), help="Number of worker processes "
+        "[default: number of CPUs]")
+    options, args = arg_parser.parse_args(argv)
+    if options.model is None:
+        arg_parser.error("The --model option is required")
+    if len(args) != 2:
+        arg_parser.error("OUTFILE is required")
+    try:
+        model = load_function(options.model)
+        u_max = [float(val) for val in options.u_max.split(',')]
+    except ValueError as exc_info:
+        arg_parser.error(str(exc_info))
+    H1 = model()[1]
+    if len(u_max) == 1:
+        u_max = u_max * len(H1)
+    if len(u_max) != len(H1):
+        arg_parser.error("--u-max must have one value for each of the %d "
+                         "control Hamiltonians" % len(H1))
+    sample_cloud(args[1], model, u_max, options.n_samples, options.n_steps,
+                 options.dt, seed=options.seed,
+                 batch_size=max(1, options.batch_size),
+                 processes=max(1, options.jobs))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+List, show, or (re-)create the tables registered in disstools.datasets
+
+Commands:
+
+    list                 List all registered tables, with their columns
+    show NAME            Print the table as text
+    import NAME TEXTFILE Store the data in TEXTFILE (one column for each field
+                         of the table, in order) as the table NAME
+"""
+import sys
+from optparse import OptionParser
+
+from disstools import datasets
+
+
+def list_datasets():
+    """Print the name, description, and columns of all registered tables"""
+    for name in sorted(datasets.DATASETS.keys()):
+        dataset = datasets.DATASETS[name]
+        print("%s (%s)" % (name, dataset.path))
+        print("    %s" % dataset.description)
+        for field, type_, description in dataset.columns:
+            print("    %-12s %-4s %s" % (field, type_, description))
+        print("")
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog list\n"
+            "       %prog show NAME\n"
+            "       %prog import NAME TEXTFILE",
+    description = __doc__.strip().split("\n")[0])
+    options, args = arg_parser.parse_args(argv)
+    if len(args) < 2:
+        arg_parser.error("Must give a command (list, show, import)")
+    command = args[1]
+    if command == 'list':
+        list_datasets()
+        return 0
+    if len(args) < 3 or args[2] not in datasets.DATASETS:
+        arg_parser.error("Must give the NAME of a registered table")
+    name = args[2]
+    if command == 'show':
+        sys.stdout.write(datasets.to_text(name))
+    elif command == 'import':
+        if len(args) != 4:
+            arg_parser.error("Must give NAME and TEXTFILE")
+        table = datasets.from_text(name, args[3])
+        datasets.save(name, table)
+        print("Stored %d rows in %s" % (len(table),
+                                        datasets.DATASETS[name].path))
+    else:
+        arg_parser.error("Unknown command %s" % command)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Shared helper routines for the figure scripts in the chapter subfolders
+
+The `scripts` folder is added to the PYTHONPATH by `chapters/figures.mk`, so
+that the figure scripts can simply ``import disstools``.
+"""
@@ -0,0 +1,111 @@
+"""
+Transparent on-disk cache for data files that are parsed with np.genfromtxt
+
+The parsed array is stored as a `.npy` file in a `.npycache` subfolder next to
+the data file. The cache is keyed by the modification time and size of the data
+file, and by the arguments passed to the parser, so that it is invalidated
+automatically whenever the data file changes. Cached arrays are memory-mapped
+(copy-on-write), i.e. only the columns that are actually used are read from
+disk.
+"""
+import os
+import hashlib
+import numbers
+from glob import glob
+
+import numpy as np
+
+CACHE_FOLDER = '.npycache'
+
+try:
+    STRING_TYPES = (basestring, )
+except NameError: # Python 3
+    STRING_TYPES = (str, )
+
+
+def _hash(*args):
+    """Return a short hex digest of the repr of the given arguments"""
+    return hashlib.sha1(repr(args).encode('utf-8')).hexdigest()[:12]
+
+
+def _is_plain(value):
+    """Return True if `value` is plain data, i.e. its repr is the same in
+    every process (unlike e.g. the repr of a function passed as a converter)"""
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(v) for v in value)
+    if isinstance(value, dict):
+        return all(_is_plain(k) and _is_plain(v) for (k, v) in value.items())
+    return (value is None
+            or isinstance(value, STRING_TYPES + (bytes, numbers.Number,
+                                                 np.dtype, type)))
+
+
+def _is_structured(kwargs):
+    """Return True if np.genfromtxt with the given keyword arguments returns
+    a structured array (with named fields)"""
+    if kwargs.get('names', None) is not None:
+        return True
+    dtype = kwargs.get('dtype', float)
+    return dtype is None or np.dtype(dtype).names is not None
+
+
+def cache_file(fname, **kwargs):
+    """
+    Return the name of the cache file for the data file `fname` parsed with
+    the given keyword arguments
+    """
+    st = os.stat(fname)
+    folder, basename = os.path.split(os.path.abspath(fname))
+    return os.path.join(folder, CACHE_FOLDER, "%s.%s.%s.npy" % (
+        basename, _hash(sorted(kwargs.items())),
+        _hash(st.st_mtime, st.st_size)))
+
+
+def genfromtxt(fname, unpack=False, **kwargs):
+    """
+    Drop-in replacement for np.genfromtxt with a transparent on-disk cache
+
+    If `fname` is not the name of an existing file (e.g. a file object), if
+    any of the arguments is not plain data (e.g. `converters`), if the result
+    is a structured array (`names`, or a structured or None `dtype`), or if
+    the parsed array cannot be cached, np.genfromtxt is called directly.
+    """
+    if not (isinstance(fname, STRING_TYPES) and os.path.isfile(fname)
+            and _is_plain(kwargs) and not _is_structured(kwargs)):
+        return np.genfromtxt(fname, unpack=unpack, **kwargs)
+    npy_file = cache_file(fname, **kwargs)
+    try:
+        data = np.load(npy_file, mmap_mode='c')
+    except (IOError, ValueError):
+        data = np.genfromtxt(fname, **kwargs)
+        if data.ndim > 0 and data.size > 0 and not data.dtype.hasobject:
+            _write_cache(npy_file, data)
+    if unpack:
+        return data.T
+    return data
+
+
+def _write_cache(npy_file, data):
+    """
+    Write `data` to `npy_file`, replacing any outdated cache files for the
+    same data file and arguments. Failure to write the cache (e.g. for a
+    read-only data folder) is not an error.
+    """
+    folder = os.path.dirname(npy_file)
+    stem = os.path.basename(npy_file).rsplit('.', 2)[0]
+    try:
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        for outdated in glob(os.path.join(folder, stem + '.*.npy')):
+            try:
+                os.unlink(outdated)
+            except OSError:
+                pass # already removed by a concurrent process
+        # write to a temporary file first, so that concurrent figure builds
+        # never see an incomplete cache file
+        tmp_file = "%s.%d.tmp" % (npy_file, os.getpid())
+        with open(tmp_file, 'wb') as out_fh:
+            np.save(out_fh, data)
+        os.rename(tmp_file, npy_file)
+    except (IOError, OSError):
+        pass
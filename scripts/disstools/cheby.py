@@ -0,0 +1,177 @@
+"""
+Chebychev propagator for piecewise-constant Hamiltonians
+
+Implementation of the Chebychev propagator described in
+`chapters/appendixAlgos.tex`, for dense (numpy) or sparse (scipy.sparse)
+Hermitian operators. The expansion coefficients for
+f(x) = exp(-i x dt) on the spectral range [E_min, E_max] are calculated via the
+cosine transform (DCT-I, evaluated by an FFT) as in Algorithm "ChebyCoeffs" of
+`chapters/appendixFFT.tex`. They depend only on the spectral range and the time
+step, and are re-used for all time steps for which both are the same. To make
+this happen for a time-dependent Hamiltonian, the spectral range is widened to
+a coarse grid (which costs a few more terms in the expansion, but avoids
+re-calculating the coefficients in every time step), or may be given
+explicitly as a bound that is valid for the entire propagation.
+
+All quantities are in units with hbar = 1, i.e. the Hamiltonian must be given
+in units of angular frequency (or energy/hbar) in the inverse units of the time
+grid.
+
+Example:
+
+>>> propagator = ChebyPropagator()
+>>> states = propagator.propagate(psi0, H, tgrid) # H(t) => matrix
+>>> pops = np.abs(states)**2
+"""
+import numpy as np
+
+# Spectral ranges are widened to multiples of RANGE_GRID * Delta, with Delta
+# rounded up to the next power of RANGE_BASE
+RANGE_GRID = 1.0 / 16.0
+RANGE_BASE = 2.0**0.25
+
+
+def cheby_coeffs(f, xmin, xmax, limit=1e-12, nmax=64):
+    """
+    Return the array of complex Chebychev coefficients [a_0 ... a_n] for the
+    expansion of the function `f` (which must take a numpy array as argument)
+    on the interval [xmin, xmax]. The function is sampled on the
+    Gauss-Lobatto-Chebychev grid, and the coefficients are calculated as a
+    cosine transform (DCT-I) via the FFT. The expansion is truncated after the
+    last coefficient whose absolute value is larger than `limit`; if the
+    coefficients have not dropped below `limit` at `nmax`, `nmax` is doubled
+    """
+    alpha = 0.5 * (xmax - xmin)
+    beta = alpha + xmin
+    while True:
+        xi = np.cos(np.arange(nmax) * np.pi / (nmax - 1)) # +1, ..., -1
+        F = np.empty(2*(nmax-1), dtype=np.complex128)
+        F[:nmax] = f(alpha * xi + beta)
+        F[nmax:] = F[nmax-2:0:-1] # mirror, without endpoints
+        F = np.fft.fft(F)[:nmax] / (nmax - 1)
+        F[0] *= 0.5
+        F[nmax-1] *= 0.5
+        above = np.nonzero(np.abs(F) >= limit)[0]
+        if len(above) == 0:
+            return F[:1]
+        n = above[-1] + 1
+        if n < nmax - nmax//4:
+            return F[:n]
+        nmax = 2 * nmax
+
+
+def exp_cheby_coeffs(emin, emax, dt, limit=1e-12):
+    """
+    Return the Chebychev coefficients for the propagator exp(-i H dt), for a
+    Hamiltonian H with the spectral range [emin, emax]
+    """
+    alpha = 0.5 * (emax - emin) * abs(dt)
+    nmax = 64
+    while nmax < 2 * alpha + 40:
+        nmax *= 2
+    return cheby_coeffs(lambda x: np.exp(-1j * x * dt), emin, emax, limit,
+                        nmax)
+
+
+def spectral_bounds(A):
+    """
+    Return a tuple (emin, emax) that encloses the spectrum of the Hermitian
+    operator `A` (numpy array or scipy sparse matrix), from the Gershgorin
+    circle theorem
+    """
+    diag = np.real(A.diagonal())
+    radii = np.asarray(abs(A).sum(axis=1)).ravel() - np.abs(diag)
+    return np.min(diag - radii), np.max(diag + radii)
+
+
+def widen_range(emin, emax):
+    """
+    Return a tuple (emin, emax) on a coarse grid that encloses the given
+    spectral range
+    """
+    delta = max(emax - emin, 1e-12)
+    delta = RANGE_BASE**np.ceil(np.log(delta) / np.log(RANGE_BASE))
+    step = RANGE_GRID * delta
+    emin = step * np.floor(emin / step)
+    emax = step * np.ceil(emax / step)
+    if emax - emin < delta:
+        emax = emin + delta
+    return emin, emax
+
+
+class ChebyPropagator(object):
+    """
+    Chebychev propagator, with a cache of expansion coefficients
+
+    Attributes:
+        limit (float): Precision of the expansion
+        coeffs (dict): (emin, emax, dt) => array of coefficients
+        spectral_range (tuple or None): If given, (emin, emax) used for all
+            propagation steps (must enclose the spectrum of all Hamiltonians).
+            Otherwise, the spectral range of each Hamiltonian is estimated and
+            widened (see `widen_range`)
+    """
+
+    def __init__(self, limit=1e-12, spectral_range=None):
+        self.limit = limit
+        self.spectral_range = spectral_range
+        self.coeffs = {}
+
+    def get_coeffs(self, emin, emax, dt):
+        """Return the (cached) coefficients for the given spectral range and
+        time step"""
+        # round, so that time steps from a time grid read from file all map to
+        # the same key
+        dt = float("%.12e" % dt)
+        key = (emin, emax, dt)
+        if key not in self.coeffs:
+            self.coeffs[key] = exp_cheby_coeffs(emin, emax, dt, self.limit)
+        return self.coeffs[key]
+
+    def step(self, v, H, dt):
+        """
+        Return exp(-i H dt) v. The state `v` may be a single vector, or an
+        array with one state in each column (propagated simultaneously)
+        """
+        if self.spectral_range is None:
+            emin, emax = widen_range(*spectral_bounds(H))
+        else:
+            emin, emax = self.spectral_range
+        a = self.get_coeffs(emin, emax, dt)
+        d = 0.5 * (emax - emin)
+        beta = d + emin
+        v = np.asarray(v, dtype=np.complex128)
+        # the normalized operator (H - beta) / d has a spectrum in [-1, 1]
+        v_prev = v
+        w = a[0] * v
+        if len(a) == 1:
+            return w
+        v_curr = (H.dot(v) - beta * v) / d
+        w += a[1] * v_curr
+        for a_n in a[2:]:
+            v_next = (2.0 / d) * (H.dot(v_curr) - beta * v_curr) - v_prev
+            w += a_n * v_next
+            v_prev, v_curr = v_curr, v_next
+        return w
+
+    def propagate(self, psi0, H, tgrid):
+        """
+        Propagate `psi0` over the time grid `tgrid`, for the piecewise-constant
+        Hamiltonian `H`. If `H` is callable, it is called with the midpoint of
+        each time interval, and must return the Hamiltonian for that interval.
+        Otherwise, `H` must be a sequence of Hamiltonians, one for each time
+        interval. Return an array of the propagated states at all points of
+        the time grid (first axis: time)
+        """
+        psi = np.asarray(psi0, dtype=np.complex128)
+        states = np.empty((len(tgrid), ) + psi.shape, dtype=np.complex128)
+        states[0] = psi
+        for i in range(len(tgrid) - 1):
+            dt = tgrid[i+1] - tgrid[i]
+            if callable(H):
+                H_i = H(tgrid[i] + 0.5 * dt)
+            else:
+                H_i = H[i]
+            psi = self.step(psi, H_i, dt)
+            states[i+1] = psi
+        return states
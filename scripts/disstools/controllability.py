@@ -0,0 +1,164 @@
+"""
+Monte-Carlo sampling of the two-qubit gates reachable by a Hamiltonian
+
+The controllability of a two-qubit system (section "Controllability" in
+`chapters/pe.tex`) is illustrated by the cloud of points in the Weyl chamber
+visited by the gate under random controls, cf. the `*_cloud.dat` files in
+`chapters/pe/controllability`. For the Hamiltonian
+
+    H(t) = H_0 + sum_l u_l(t) H_l
+
+each sample is a random piecewise-constant control: in each of `n_steps`
+intervals of length `dt`, every control u_l takes an independent value drawn
+uniformly from [-u_max_l, u_max_l]. The gate (the projection of the propagated
+logical basis states onto the logical subspace) is recorded after every
+interval, and written to the output file in the same format as the existing
+cloud files, as one row "t c1 c2 c3" for each recorded gate. Gates that are
+not unitary due to population loss from the logical subspace are mapped to
+the Weyl chamber via the closest unitary.
+
+The model is a user-supplied function without arguments that returns a tuple
+(H0, H1, basis), with the drift Hamiltonian H0 (numpy array), a list H1 of
+control Hamiltonians, and the logical basis states (array with one state per
+column, in the order 00, 01, 10, 11). It must be defined at module level, so
+that it can be sent to the worker processes.
+
+The samples are propagated in batches: for all samples in a batch, the
+Hamiltonians of an interval are diagonalized as one stack of matrices, and the
+states are propagated with the resulting stack of propagators. The Weyl
+chamber coordinates for all gates of a batch are calculated in a single call
+of `disstools.weyl.c1c2c3`. Batches are distributed over a pool of worker
+processes, and written to the output file as soon as they are finished. The
+controls of each batch are drawn from a random number generator seeded with
+the seed of the run and the index of the batch, so that an interrupted run
+that is resumed (by running it again with the same output file) gives the same
+result as an uninterrupted one, independent of the number of workers.
+"""
+import os
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from disstools import weyl
+
+# Model arrays in each worker process, set by `_init_worker`
+_WORKER = {}
+
+
+def random_controls(n_samples, n_steps, u_max, seed, i_batch):
+    """
+    Return an array of shape (n_samples, n_steps, len(u_max)) of uniformly
+    distributed control values, reproducibly for the given `seed` and index
+    `i_batch`
+    """
+    u_max = np.asarray(u_max, dtype=np.float64)
+    random_state = np.random.RandomState([seed, i_batch])
+    return u_max * random_state.uniform(-1.0, 1.0,
+                                        (n_samples, n_steps, len(u_max)))
+
+
+def propagate_batch(H0, H1, basis, controls, dt):
+    """
+    Propagate the `basis` states under the piecewise-constant `controls`
+    (array of shape (n_samples, n_steps, len(H1))) for all samples
+    simultaneously. Return an array of shape (n_samples, n_steps, 4, 4) with
+    the gate at the end of each interval.
+    """
+    n_samples, n_steps, __ = controls.shape
+    H1 = np.array(H1, dtype=np.complex128)
+    basis = np.asarray(basis, dtype=np.complex128)
+    states = np.tile(basis, (n_samples, 1, 1))
+    gates = np.empty((n_samples, n_steps, 4, 4), dtype=np.complex128)
+    for n in range(n_steps):
+        H = H0 + np.tensordot(controls[:, n, :], H1, axes=(1, 0))
+        E, V = np.linalg.eigh(H)
+        Vh = np.conj(np.swapaxes(V, -1, -2))
+        states = np.matmul(V, np.exp(-1j * E * dt)[:, :, np.newaxis]
+                              * np.matmul(Vh, states))
+        gates[:, n] = np.matmul(basis.conj().T, states)
+    return gates
+
+
+def _init_worker(model, u_max, n_steps, dt, seed):
+    """Store the data shared by all tasks in the worker process"""
+    H0, H1, basis = model()
+    _WORKER['model'] = (np.asarray(H0, dtype=np.complex128), H1, basis)
+    _WORKER['u_max'] = u_max
+    _WORKER['n_steps'] = n_steps
+    _WORKER['dt'] = dt
+    _WORKER['seed'] = seed
+
+
+def _sample(task):
+    """
+    Return an array of rows (t, c1, c2, c3) for the task (i_batch,
+    batch_size)
+    """
+    i_batch, batch_size = task
+    H0, H1, basis = _WORKER['model']
+    n_steps = _WORKER['n_steps']
+    dt = _WORKER['dt']
+    controls = random_controls(batch_size, n_steps, _WORKER['u_max'],
+                               _WORKER['seed'], i_batch)
+    gates = propagate_batch(H0, H1, basis, controls, dt)
+    c1, c2, c3 = weyl.c1c2c3(weyl.closest_unitary(gates))
+    t = np.tile(dt * np.arange(1, n_steps + 1), batch_size)
+    return np.column_stack((t, c1.ravel(), c2.ravel(), c3.ravel()))
+
+
+def read_finished(outfile, rows_per_batch):
+    """
+    Return the number of complete batches already present in `outfile` (0 if
+    the file does not exist). Rows from an incomplete batch (from an
+    interrupted run) are removed.
+    """
+    if not os.path.isfile(outfile):
+        return 0
+    with open(outfile) as in_fh:
+        lines = [line for line in in_fh
+                 if line.endswith("\n") and line.strip() != ''
+                 and not line.startswith('#')]
+    n_done = len(lines) // rows_per_batch
+    if n_done * rows_per_batch != len(lines) \
+    or os.path.getsize(outfile) != sum([len(line) for line in lines]):
+        with open(outfile, 'w') as out_fh:
+            out_fh.writelines(lines[:n_done*rows_per_batch])
+    return n_done
+
+
+def sample_cloud(outfile, model, u_max, n_samples, n_steps, dt, seed=0,
+    batch_size=1000, processes=None):
+    """
+    Write the cloud of Weyl chamber points for `n_samples` random controls
+    (with maximum amplitudes `u_max`, one value per control Hamiltonian) of
+    `n_steps` intervals of length `dt` to `outfile`. The samples are
+    propagated in batches of `batch_size` and distributed over a pool of
+    `processes` workers (default: number of CPUs). Batches already present in
+    `outfile` are not re-calculated. If `n_samples` is not a multiple of
+    `batch_size`, it is rounded up.
+    """
+    u_max = np.array(u_max, dtype=np.float64, ndmin=1)
+    n_batches = (n_samples + batch_size - 1) // batch_size
+    n_done = read_finished(outfile, batch_size * n_steps)
+    if n_done >= n_batches:
+        return
+    tasks = [(i_batch, batch_size) for i_batch in range(n_done, n_batches)]
+    if processes is None:
+        processes = cpu_count()
+    pool = None
+    if processes > 1:
+        pool = Pool(processes, _init_worker,
+                    (model, u_max, n_steps, dt, seed))
+        results = pool.imap(_sample, tasks)
+    else:
+        _init_worker(model, u_max, n_steps, dt, seed)
+        results = (_sample(task) for task in tasks)
+    try:
+        with open(outfile, 'a') as out_fh:
+            for rows in results:
+                np.savetxt(out_fh, rows, fmt='%25.16E', delimiter='')
+                out_fh.flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
@@ -0,0 +1,167 @@
+"""
+Registry of small data tables that are not the output of a single calculation
+
+Some figures show tables of numbers that were collected by hand from many
+runs (e.g. the gate error for a series of gate durations). Instead of keeping
+them as text inside the figure scripts, each table is registered here under a
+name, with named and typed columns, and stored as a numpy structured array in
+a `.npy` file in the data folder of the figure script that shows it. Any
+script (or notebook) can then load a table by name:
+
+>>> qsl = load('rydberg_qsl')
+>>> qsl['T'], qsl['gate_error']
+
+Tables are kept in memory after they have been loaded once. Use
+`scripts/datasets.py` to list or show the registered tables, or to (re-)create
+a table from a text file.
+"""
+import os
+
+import numpy as np
+
+# Root folder of the repository; the files of the datasets are relative to it
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+       os.path.abspath(__file__))))
+
+# name => Dataset
+DATASETS = {}
+
+# name => structured array, for all tables that have been loaded
+_LOADED = {}
+
+
+class Dataset(object):
+    """
+    A registered table
+
+    Attributes:
+        name (str): Name of the table
+        path (str): Name of the `.npy` file, relative to ROOT
+        description (str): Description of the content of the table
+        columns (list): Tuples (field name, numpy type, description)
+    """
+
+    def __init__(self, name, path, description, columns):
+        self.name = name
+        self.path = path
+        self.description = description
+        self.columns = columns
+
+    @property
+    def dtype(self):
+        """Numpy dtype of the structured array holding the table"""
+        return np.dtype([(field, type_) for (field, type_, __)
+                         in self.columns])
+
+    @property
+    def filename(self):
+        """Absolute name of the `.npy` file"""
+        return os.path.join(ROOT, self.path)
+
+
+def register(name, path, description, columns):
+    """Register a table (see `Dataset` for the arguments)"""
+    DATASETS[name] = Dataset(name, path, description, columns)
+
+
+def load(name):
+    """Return the table with the given name, as a structured array"""
+    if name not in _LOADED:
+        dataset = DATASETS[name]
+        table = np.load(dataset.filename)
+        if table.dtype != dataset.dtype:
+            raise ValueError("%s does not contain a table of type %s"
+                             % (dataset.path, dataset.dtype))
+        table.flags.writeable = False # shared by all callers
+        _LOADED[name] = table
+    return _LOADED[name]
+
+
+def save(name, table):
+    """Write the table (array with the fields of the dataset) for the dataset
+    with the given name"""
+    dataset = DATASETS[name]
+    table = np.asarray(table).astype(dataset.dtype)
+    folder = os.path.dirname(dataset.filename)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    tmp_file = "%s.%d.tmp" % (dataset.filename, os.getpid())
+    with open(tmp_file, 'wb') as out_fh:
+        np.save(out_fh, table)
+    os.rename(tmp_file, dataset.filename)
+    _LOADED.pop(name, None)
+
+
+def from_text(name, fname):
+    """Return the table for the dataset with the given name, parsed from the
+    text file `fname` (one column for each field, in order; lines starting
+    with '#' are ignored)"""
+    dataset = DATASETS[name]
+    return np.atleast_1d(np.genfromtxt(fname, dtype=dataset.dtype))
+
+
+def to_text(name):
+    """Return the table with the given name as text, with a header line"""
+    dataset = DATASETS[name]
+    table = load(name)
+    fields = [field for (field, __, __) in dataset.columns]
+    # repr gives the shortest string that reproduces a float exactly
+    rows = [[repr(val.item()) for val in row] for row in table]
+    width = [max([len(field) + 1] + [len(row[i]) for row in rows])
+             for (i, field) in enumerate(fields)]
+    lines = ["#" + " ".join(["%*s" % (w, field) for (w, field)
+                             in zip(width, fields)])[1:]]
+    for row in rows:
+        lines.append(" ".join(["%*s" % (w, val)
+                               for (w, val) in zip(width, row)]))
+    return "\n".join(lines) + "\n"
+
+
+register('rydberg_qsl', 'chapters/robust/rydberg_qsl/qsl.npy',
+    "Quantum speed limit for the Rydberg gate using simultaneous Blackman "
+    "pulse pairs: maximum population in the intermediate and double-Rydberg "
+    "states, and gate error, over the duration of the central 2 pi pulse",
+    [('T', 'i4', 'central pulse duration [ns]'),
+     ('pop_0i', 'f8', 'maximum population in |0i>'),
+     ('pop_rr', 'f8', 'maximum population in |rr>'),
+     ('gate_error', 'f8', 'gate error')])
+
+_TRANSMON2013_COLUMNS = [
+    ('T', 'i4', 'gate duration [ns]'),
+    ('E_max', 'f8', 'peak pulse amplitude [MHz]'),
+    ('pop_loss', 'f8', 'population loss from the logical subspace'),
+    ('peak_qubit', 'f8', 'peak qubit excitation'),
+    ('peak_cavity', 'f8', 'peak cavity excitation'),
+    ('err_avg_0', 'f8', '1-F_avg without dissipation'),
+    ('err_avg_100', 'f8', '1-F_avg for cavity lifetime 100 micros'),
+    ('err_avg_25', 'f8', '1-F_avg for cavity lifetime 25 micros')]
+
+register('transmon2013_cphase',
+    'chapters/transmon/transmon2013_gate_error/cphase.npy',
+    "Optimized CPHASE gate for two transmon qubits coupled via a cavity, "
+    "over the gate duration (T=300 ns discarded: the optimized pulse was "
+    "complex instead of real)", _TRANSMON2013_COLUMNS)
+
+register('transmon2013_cnot',
+    'chapters/transmon/transmon2013_gate_error/cnot.npy',
+    "Optimized CNOT gate for two transmon qubits coupled via a cavity, "
+    "over the gate duration (T=250 ns discarded: the optimized pulse was "
+    "complex instead of real)", _TRANSMON2013_COLUMNS)
+
+_HOL_OCT_COLUMNS = [
+    ('T', 'i4', 'pulse duration [ns]'),
+    ('E_max', 'f8', 'peak pulse amplitude [MHz]'),
+    ('pop_loss', 'f8', 'population loss from the logical subspace'),
+    ('conc_err', 'f8', '1-C (concurrence error)'),
+    ('peak_qubit', 'f8', 'peak qubit excitation'),
+    ('peak_cavity', 'f8', 'peak cavity excitation')]
+
+register('hol_oct_left', 'chapters/transmon/hol_oct_success/left.npy',
+    "Optimization of a holonomic phasegate for two transmon qubits, for the "
+    "parameter set with omega_c = 6.0 GHz, omega_d = omega_c - 40 MHz, over "
+    "the pulse duration", _HOL_OCT_COLUMNS)
+
+register('hol_oct_right', 'chapters/transmon/hol_oct_success/right.npy',
+    "Optimization of a holonomic phasegate for two transmon qubits, for the "
+    "parameter set with omega_c = 8.1 GHz, omega_d = omega_c + 40 MHz, over "
+    "the pulse duration", _HOL_OCT_COLUMNS)
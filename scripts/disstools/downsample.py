@@ -0,0 +1,73 @@
+"""
+Shape-preserving decimation of time series before plotting
+
+A curve that has many more points than there are pixel columns in the panel it
+is drawn in only makes the plot slow and the (vector) output file large. The
+routines in this module divide the data into one bucket per pixel column, and
+keep only the minimum and the maximum of each bucket (in their original
+order). The resulting curve is visually identical to the original one, but
+its size depends only on the width of the panel, not on the number of points
+in the data.
+"""
+import numpy as np
+
+
+def n_columns(width, dpi=None, xlim=None, x=None):
+    """
+    Return the number of pixel columns for a panel of the given `width` (in
+    cm, as in the layout of the figure scripts), at the given `dpi` (default:
+    the savefig.dpi setting of matplotlib). If the x-range `xlim` of the panel
+    and the data `x` are given, return the number of columns covered by the
+    data instead.
+    """
+    if dpi is None:
+        import matplotlib
+        dpi = matplotlib.rcParams['savefig.dpi']
+        if dpi == 'figure':
+            dpi = matplotlib.rcParams['figure.dpi']
+    columns = width / 2.54 * dpi
+    if xlim is not None and x is not None and len(x) > 1:
+        columns *= abs(float(x[-1] - x[0]) / (xlim[1] - xlim[0]))
+    return max(1, int(np.ceil(columns)))
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Return the sorted array of indices of `y` that are the minimum or maximum
+    in one of `n_buckets` buckets of (almost) equal size, together with the
+    first and last index
+    """
+    y = np.asarray(y)
+    n = len(y)
+    size = int(np.ceil(n / float(n_buckets)))
+    n_buckets = int(np.ceil(n / float(size)))
+    # pad with the last value, so that the buckets can be reshaped into rows
+    padded = np.empty(n_buckets * size, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    padded = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    i_min = np.minimum(offsets + padded.argmin(axis=1), n-1)
+    i_max = np.minimum(offsets + padded.argmax(axis=1), n-1)
+    return np.unique(np.concatenate(([0, n-1], i_min, i_max)))
+
+
+def downsample(x, y, width, dpi=None, xlim=None):
+    """
+    Return a tuple (x, y) of the given data reduced to the minimum and maximum
+    in each pixel column of a panel of the given `width` (in cm), cf.
+    `n_columns`. The data is returned unchanged if it does not have more than
+    two points per pixel column. The `x` values are assumed to be (roughly)
+    equidistant, e.g. a time grid.
+
+    Usage:
+
+    >>> ax.plot(*downsample(tgrid, pop, w), color=blue)
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n_buckets = n_columns(width, dpi, xlim, x)
+    if len(y) <= 2 * n_buckets:
+        return x, y
+    indices = minmax_indices(y, n_buckets)
+    return x[indices], y[indices]
@@ -0,0 +1,324 @@
+"""
+Krotov's method for gate optimization, with preallocated propagation buffers
+
+Implementation of the first-order Krotov update (section "Krotov's Method" in
+`chapters/numerics.tex`, with sigma(t) = 0) for the Hamiltonian
+
+    H(t) = H_0 + sum_l eps_l(t) H_l
+
+with real, piecewise-constant controls eps_l (one value per interval of the
+time grid). The logical basis states are propagated forward, and the co-states
+backward, with the Chebychev propagator (`disstools.cheby`). The backward
+propagated co-states for all points of the time grid, and the forward
+propagated states, are kept in arrays that are allocated once for each
+objective, not in every iteration.
+
+The optimization functional J_T is a function of the gate U (the projection of
+the propagated states onto the logical subspace, U_jk = <j|phi_k(T)>). The
+boundary condition for the co-states is obtained from the derivative of J_T
+with respect to U^*; it is calculated analytically for the gate functionals
+`J_T_sm` and `J_T_re`, and numerically (by finite differences) otherwise, e.g.
+for the perfect entanglers functional `J_T_PE` of `chapters/pe.tex`.
+
+Several independent optimizations (e.g. the same gate for different gate
+durations) can be iterated in lockstep on a pool of worker processes with
+`optimize`, which writes the same iteration logs as the optimizations in the
+data folders of the figure scripts: "1-F_avg" over the iteration number for
+gate optimizations (cf. `*_f_avg.dat` in `chapters/3states/rydberg`), and the
+local invariants and Weyl chamber coordinates (cf. `chapters/pe/weyl_paths`).
+"""
+import numpy as np
+from multiprocessing import Process, Pipe, cpu_count
+
+from disstools.cheby import ChebyPropagator
+from disstools import weyl
+
+
+def F_avg(U, O):
+    """
+    Return the average gate fidelity of the (not necessarily unitary) gate `U`
+    with respect to the target gate `O`
+    """
+    N = U.shape[0]
+    M = np.dot(O.conj().T, U)
+    return ((np.trace(np.dot(M, M.conj().T)).real + abs(np.trace(M))**2)
+            / (N * (N + 1)))
+
+
+def J_T_sm(U, O):
+    """Square-modulus functional 1 - |tr(O^+ U)|^2 / N^2"""
+    N = U.shape[0]
+    return 1.0 - abs(np.trace(np.dot(O.conj().T, U)))**2 / N**2
+
+
+def J_T_re(U, O):
+    """Real-part functional 1 - Re[tr(O^+ U)] / N"""
+    N = U.shape[0]
+    return 1.0 - np.trace(np.dot(O.conj().T, U)).real / N
+
+
+def J_T_PE(U, w=1.0):
+    """
+    Perfect entanglers functional w J_PE(U) + (1-w) (1 - tr(U^+ U)/4) for the
+    projected (non-unitary) two-qubit gate `U`
+    """
+    p_loss = 1.0 - np.trace(np.dot(U.conj().T, U)).real / 4.0
+    return w * weyl.F_PE(*weyl.g1g2g3(U)) + (1.0 - w) * p_loss
+
+
+def grad_J_T_sm(U, O):
+    """Return dJ_T_sm/dU^*"""
+    N = U.shape[0]
+    return -np.trace(np.dot(O.conj().T, U)) * O / N**2
+
+
+def grad_J_T_re(U, O):
+    """Return dJ_T_re/dU^*"""
+    N = U.shape[0]
+    return -0.5 * O / N
+
+
+def numerical_grad(J_T, U, h=1e-6):
+    """
+    Return the derivative dJ_T/dU^* = (dJ_T/dRe[U] + i dJ_T/dIm[U]) / 2 of the
+    real function J_T(U), from central finite differences
+    """
+    grad = np.zeros(U.shape, dtype=np.complex128)
+    U_h = np.array(U, dtype=np.complex128)
+    for index in np.ndindex(U.shape):
+        for step in (h, 1j * h):
+            U_h[index] = U[index] + step
+            J_plus = J_T(U_h)
+            U_h[index] = U[index] - step
+            J_minus = J_T(U_h)
+            U_h[index] = U[index]
+            grad[index] += 0.5 * (step / h) * (J_plus - J_minus) / (2.0 * h)
+    return grad
+
+
+class KrotovOptimizer(object):
+    """
+    Krotov optimization of a gate, for a single objective
+
+    Attributes:
+        H0 (matrix): Drift Hamiltonian (numpy array or scipy sparse matrix)
+        H1 (list): Control Hamiltonians H_l
+        basis (array): Logical basis states, one state in each column
+        tgrid (array): Time grid
+        pulses (array): Controls eps_l, shape (len(H1), len(tgrid)-1), on the
+            midpoints of the time grid
+        J_T (callable): Optimization functional, J_T(U) => float
+        grad_J_T (callable or None): dJ_T/dU^*, numerical if None
+        target (array or None): Target gate (for the "1-F_avg" log)
+        lambda_a (float): Inverse step width of the update
+        shape (array): Update shape S(t), on the midpoints of the time grid
+        iteration (int): Number of the last finished iteration
+        J_T_vals (list): Value of J_T in each iteration
+        U (array): Gate in the last iteration
+    """
+
+    def __init__(self, H0, H1, basis, tgrid, pulses, J_T, grad_J_T=None,
+        target=None, lambda_a=1.0, shape=None, propagator=None):
+        self.H0 = H0
+        self.H1 = list(H1)
+        self.basis = np.asarray(basis, dtype=np.complex128)
+        self.tgrid = np.asarray(tgrid, dtype=np.float64)
+        self.pulses = np.array(pulses, dtype=np.float64, ndmin=2)
+        if self.pulses.shape != (len(self.H1), len(self.tgrid) - 1):
+            raise ValueError("pulses must have shape (%d, %d)"
+                             % (len(self.H1), len(self.tgrid) - 1))
+        self.J_T = J_T
+        self.grad_J_T = grad_J_T
+        self.target = target
+        self.lambda_a = lambda_a
+        if shape is None:
+            shape = np.ones(len(self.tgrid) - 1)
+        self.shape = np.asarray(shape, dtype=np.float64)
+        if propagator is None:
+            propagator = ChebyPropagator()
+        self.propagator = propagator
+        self.iteration = -1
+        self.J_T_vals = []
+        self.U = None
+        # propagation buffers
+        nt = len(self.tgrid)
+        self._chi = np.empty((nt, ) + self.basis.shape, dtype=np.complex128)
+        self._phi = np.empty(self.basis.shape, dtype=np.complex128)
+        self._update = np.empty(len(self.H1))
+
+    def ham(self, n, pulses=None):
+        """Return the Hamiltonian for the n'th interval of the time grid"""
+        if pulses is None:
+            pulses = self.pulses
+        H = self.H0
+        for l, H_l in enumerate(self.H1):
+            H = H + pulses[l, n] * H_l
+        return H
+
+    def gate(self, states):
+        """Return the projection of the `states` onto the logical basis"""
+        return np.dot(self.basis.conj().T, states)
+
+    def _finish_iteration(self):
+        """Store the gate and value of J_T for the forward propagated states"""
+        self.iteration += 1
+        self.U = self.gate(self._phi)
+        self.J_T_vals.append(self.J_T(self.U))
+        return self.iteration, self.J_T_vals[-1], self.U
+
+    def iterate(self):
+        """
+        Perform a single iteration, and return a tuple (iteration, J_T, U).
+        The first call only propagates the guess pulses (iteration 0).
+        """
+        dt = np.diff(self.tgrid)
+        step = self.propagator.step
+        if self.iteration < 0:
+            self._phi[:] = self.basis
+            for n in range(len(dt)):
+                self._phi[:] = step(self._phi, self.ham(n), dt[n])
+            return self._finish_iteration()
+        # backward propagation of the co-states under the old pulses
+        if self.grad_J_T is None:
+            grad = numerical_grad(self.J_T, self.U)
+        else:
+            grad = self.grad_J_T(self.U)
+        self._chi[-1] = -np.dot(self.basis, grad)
+        for n in range(len(dt) - 1, -1, -1):
+            self._chi[n] = step(self._chi[n+1], self.ham(n), -dt[n])
+        # forward propagation with sequential update of the pulses
+        self._phi[:] = self.basis
+        for n in range(len(dt)):
+            chi = self._chi[n].conj()
+            for l, H_l in enumerate(self.H1):
+                self._update[l] = np.sum(chi * H_l.dot(self._phi)).imag
+            self.pulses[:, n] += self.shape[n] / self.lambda_a * self._update
+            self._phi[:] = step(self._phi, self.ham(n), dt[n])
+        return self._finish_iteration()
+
+
+def f_avg_header():
+    """Return the header line of the "1-F_avg" iteration log"""
+    return "#   iter         1-F_avg\n"
+
+
+def f_avg_line(iteration, U, O):
+    """Return a line of the "1-F_avg" iteration log"""
+    return "%8d    %.6E\n" % (iteration, 1.0 - F_avg(U, O))
+
+
+LI_COLUMNS = ['g1', 'g2', 'g3', 'bare J', 'deltaU', 'full J', 'deltaJ',
+              'c1', 'c2', 'c3', 'max_conc']
+
+
+def li_header():
+    """Return the header line of the local invariants iteration log"""
+    return "#%9s" % 'iter' + "".join([" %24s" % col for col in LI_COLUMNS]) \
+           + "\n"
+
+
+def li_line(iteration, U, w=1.0):
+    """
+    Return a line of the local invariants iteration log, for the projected
+    two-qubit gate `U`: the local invariants of U, the perfect entanglers
+    functional J_PE for U ("bare J"), the loss of population from the logical
+    subspace ("deltaU"), the total functional J_T_PE ("full J"), the difference
+    between J_PE for the closest unitary and for U ("deltaJ"), and the Weyl
+    chamber coordinates and maximum concurrence of the closest unitary
+    """
+    g = weyl.g1g2g3(U)
+    bare_J = weyl.F_PE(*g)
+    delta_U = 1.0 - np.trace(np.dot(U.conj().T, U)).real / 4.0
+    full_J = w * bare_J + (1.0 - w) * delta_U
+    c = weyl.c1c2c3(weyl.closest_unitary(U))
+    delta_J = weyl.F_PE_from_c1c2c3(*c) - bare_J
+    values = list(g) + [bare_J, delta_U, full_J, delta_J] + list(c) \
+             + [weyl.concurrence(*c)]
+    return "%10d" % iteration + "".join([" %24.16E" % val for val in values]) \
+           + "\n"
+
+
+def _worker(conn, optimizers):
+    """Iterate the given optimizers whenever requested through `conn`"""
+    while True:
+        command = conn.recv()
+        if command[0] == 'iterate':
+            active = command[1]
+            conn.send([opt.iterate() if active[i] else None
+                       for (i, opt) in enumerate(optimizers)])
+        elif command[0] == 'pulses':
+            conn.send([opt.pulses for opt in optimizers])
+        else:
+            conn.close()
+            return
+
+
+def optimize(optimizers, iter_stop, J_T_conv=1e-4, f_avg_logs=None,
+    li_logs=None, w=1.0, processes=None):
+    """
+    Optimize all `optimizers` (list of `KrotovOptimizer` instances) in
+    lockstep, distributed over `processes` worker processes (default: number
+    of CPUs). Each optimizer stays in the same worker process, so that its
+    propagation buffers are re-used in every iteration. An optimizer stops
+    when J_T drops below `J_T_conv`, all stop after `iter_stop` iterations.
+
+    The "1-F_avg" log is appended to the file `f_avg_logs[i]` for the i'th
+    optimizer (requires its target gate), the local invariants log to
+    `li_logs[i]` (only for two-qubit gates; the weight `w` is used for the
+    "full J" column). The logs are written after each iteration. Return the
+    list of optimized pulses.
+    """
+    n_opt = len(optimizers)
+    if f_avg_logs is None:
+        f_avg_logs = [None, ] * n_opt
+    if li_logs is None:
+        li_logs = [None, ] * n_opt
+    for (logs, header) in [(f_avg_logs, f_avg_header()),
+                           (li_logs, li_header())]:
+        for filename in logs:
+            if filename is not None:
+                with open(filename, 'w') as out_fh:
+                    out_fh.write(header)
+    if processes is None:
+        processes = cpu_count()
+    processes = max(1, min(processes, n_opt))
+    # optimizer i is in worker i % processes
+    workers = []
+    for i_worker in range(processes):
+        conn, child_conn = Pipe()
+        proc = Process(target=_worker,
+                       args=(child_conn, optimizers[i_worker::processes]))
+        proc.start()
+        workers.append((proc, conn))
+    active = [True, ] * n_opt
+    try:
+        for __ in range(iter_stop + 1):
+            for i_worker, (proc, conn) in enumerate(workers):
+                conn.send(('iterate', active[i_worker::processes]))
+            results = [None, ] * n_opt
+            for i_worker, (proc, conn) in enumerate(workers):
+                results[i_worker::processes] = conn.recv()
+            for i, result in enumerate(results):
+                if result is None: # converged in an earlier iteration
+                    continue
+                iteration, J_T, U = result
+                if f_avg_logs[i] is not None:
+                    with open(f_avg_logs[i], 'a') as out_fh:
+                        out_fh.write(f_avg_line(iteration, U,
+                                                optimizers[i].target))
+                if li_logs[i] is not None:
+                    with open(li_logs[i], 'a') as out_fh:
+                        out_fh.write(li_line(iteration, U, w))
+                if J_T < J_T_conv:
+                    active[i] = False
+            if not any(active):
+                break
+        pulses = [None, ] * n_opt
+        for i_worker, (proc, conn) in enumerate(workers):
+            conn.send(('pulses', ))
+            pulses[i_worker::processes] = conn.recv()
+        return pulses
+    finally:
+        for proc, conn in workers:
+            conn.send(('stop', ))
+            proc.join()
@@ -0,0 +1,215 @@
+"""
+Newton propagator with restarted Arnoldi, for dissipative dynamics
+
+Implementation of the algorithms in section "Newton Propagator with Restarted
+Arnoldi" of `chapters/appendixAlgos.tex`. The propagator evaluates
+w = f(A dt) v (by default, f = exp) for an operator A with complex eigenvalues,
+typically a dissipative Liouvillian. The operator may be given as a matrix
+(numpy array or scipy sparse matrix acting on vectors), or matrix-free, as a
+callable that returns A(v). In the matrix-free form, `v` may be a density
+matrix (a 2D array), see `liouvillian`. Only the m+1 Arnoldi vectors of the
+current restart cycle are stored, so memory use is bounded by the Krylov
+dimension m, not by the size of the Liouvillian.
+
+Example:
+
+>>> L = liouvillian(H, [np.sqrt(gamma) * a, ])
+>>> rho = newton(L, rho0, dt)
+"""
+import numpy as np
+
+
+def _apply(A, v):
+    """Return A(v) if A is callable, A.dot(v) otherwise"""
+    if callable(A):
+        return A(v)
+    return A.dot(v)
+
+
+def _dot_right(rho, X):
+    """Return rho.X for a dense array rho and a dense or sparse matrix X"""
+    return X.T.dot(rho.T).T
+
+
+def liouvillian(H, lindblad_ops=()):
+    """
+    Return a callable L so that L(rho) is the right-hand side of the master
+    equation in Lindblad form,
+
+        d/dt rho = -i [H, rho] + sum_k (L_k rho L_k^+ - 1/2 {L_k^+ L_k, rho})
+
+    for the Hamiltonian `H` and the list of Lindblad operators `lindblad_ops`
+    (dense or sparse matrices). The superoperator is never constructed.
+    """
+    lindblad_ops = list(lindblad_ops)
+    # -i H - 1/2 sum_k L_k^+ L_k, so that the non-Lindblad terms are
+    # H_eff rho + rho H_eff^+
+    H_eff = -1j * H
+    for L_k in lindblad_ops:
+        H_eff = H_eff - 0.5 * L_k.conj().T.dot(L_k)
+    H_eff_dag = H_eff.conj().T
+
+    def L(rho):
+        result = H_eff.dot(rho) + _dot_right(rho, H_eff_dag)
+        for L_k in lindblad_ops:
+            result += _dot_right(L_k.dot(rho), L_k.conj().T)
+        return result
+
+    return L
+
+
+def arnoldi(A, dt, v, m_max):
+    """
+    Return a tuple (U, Hess, Z, m) of the m+1 Arnoldi vectors spanning the
+    Krylov space of `A` starting from `v` (array with the vectors along the
+    first axis), the extended (m+1) x (m+1) Hessenberg matrix of A dt, the Ritz
+    values (eigenvalues of the m x m Hessenberg matrix), and the dimension m
+    of the Krylov space (smaller than `m_max` if the Krylov space is
+    invariant under A)
+    """
+    v = np.asarray(v, dtype=np.complex128)
+    U = np.zeros((m_max+1, ) + v.shape, dtype=np.complex128)
+    Hess = np.zeros((m_max+1, m_max+1), dtype=np.complex128)
+    U[0] = v / np.linalg.norm(v)
+    m = m_max
+    for j in range(m_max):
+        u_next = _apply(A, U[j])
+        norm_Au = np.linalg.norm(u_next)
+        for i in range(j+1): # Gram-Schmidt
+            Hess[i, j] = dt * np.vdot(U[i], u_next)
+            u_next = u_next - (Hess[i, j] / dt) * U[i]
+        h_next = np.linalg.norm(u_next)
+        if h_next <= 1e-14 * norm_Au:
+            m = j + 1 # Krylov space is invariant
+            break
+        U[j+1] = u_next / h_next
+        Hess[j+1, j] = h_next * dt
+    Z = np.linalg.eigvals(Hess[:m, :m])
+    return U[:m+1], Hess[:m+1, :m+1], Z, m
+
+
+def extend_leja(leja, Z, m):
+    """
+    Return the array `leja` of Leja points, extended by `m` points chosen from
+    the candidate points `Z`
+    """
+    leja = list(leja)
+    candidates = list(Z)
+    if len(leja) == 0:
+        i = int(np.argmax(np.abs(candidates)))
+        leja.append(candidates.pop(i))
+        m -= 1
+    for __ in range(min(m, len(candidates))):
+        # maximize the product of distances, as a sum of logarithms
+        with np.errstate(divide='ignore'):
+            dist = np.sum(np.log(np.abs(np.subtract.outer(candidates, leja))),
+                          axis=1)
+        i = int(np.argmax(dist))
+        leja.append(candidates.pop(i))
+    return np.array(leja, dtype=np.complex128)
+
+
+def extend_newton_coeffs(coeffs, leja, func, radius, center):
+    """
+    Return the array `coeffs` of Newton coefficients for the interpolation of
+    func(radius * z + center) at the normalized Leja points `leja`, extended to
+    the same length as `leja`
+    """
+    coeffs = list(coeffs)
+    f = func(radius * np.asarray(leja) + center)
+    if len(coeffs) == 0:
+        coeffs.append(f[0])
+    for k in range(len(coeffs), len(leja)):
+        numerator = f[k] - coeffs[0]
+        product = 1.0
+        for n in range(1, k):
+            product *= (leja[k] - leja[n-1])
+            numerator -= coeffs[n] * product
+        product *= (leja[k] - leja[k-1])
+        coeffs.append(numerator / product)
+    return np.array(coeffs, dtype=np.complex128)
+
+
+def newton(A, v, dt, func=np.exp, m_max=10, tol=1e-12, max_restarts=1000,
+    max_radius=3.0):
+    """
+    Return func(A dt) v, using the Newton propagator with restarted Arnoldi.
+    In each restart, the Newton series is extended by (up to) `m_max` terms,
+    until the norm of the contribution of the last restart relative to the
+    norm of the result is smaller than `tol`. Since the contributions cannot
+    drop below the round-off error in the Newton coefficients, the iteration
+    also stops (discarding the last contribution) if a small contribution
+    (relative norm below sqrt(tol)) is larger than the previous one.
+
+    If the spread of the Ritz values of A dt (the normalization radius of the
+    Leja points) in the first iteration is larger than `max_radius`, the
+    time step is split into smaller steps (only valid if func is exp), as the
+    Newton coefficients would otherwise be swamped by round-off errors
+    """
+    v = np.asarray(v, dtype=np.complex128)
+    w = np.zeros(v.shape, dtype=np.complex128)
+    beta = np.linalg.norm(v)
+    if beta == 0.0:
+        return w
+    v_s = v / beta
+    leja = np.zeros(0, dtype=np.complex128)
+    coeffs = np.zeros(0, dtype=np.complex128)
+    center = radius = None
+    prev_contrib = None
+    for s in range(max_restarts):
+        U, Hess, Z, m = arnoldi(A, dt, v_s, m_max)
+        if center is None:
+            # normalization of the Leja points, fixed in the first iteration
+            center = np.mean(Z)
+            radius = np.exp(np.mean(np.log(np.abs(center - Z) + 1e-300)))
+            if radius < 1e-12:
+                radius = 1.0
+            if radius > max_radius:
+                n_sub = int(np.ceil(radius / max_radius))
+                for __ in range(n_sub):
+                    v = newton(A, v, dt / n_sub, func, m_max, tol,
+                               max_restarts, max_radius)
+                return v
+        n_s = len(leja)
+        leja = extend_leja(leja, (Z - center) / radius, m)
+        coeffs = extend_newton_coeffs(coeffs, leja, func, radius, center)
+        m = len(leja) - n_s # may be smaller if Z has too few points
+        Hess_norm = (Hess - center * np.eye(len(Hess))) / radius
+        r = np.zeros(len(Hess), dtype=np.complex128)
+        r[0] = beta
+        p = coeffs[n_s] * r
+        for k in range(1, m):
+            r = Hess_norm.dot(r) - leja[n_s+k-1] * r
+            p += coeffs[n_s+k] * r
+        w_plus = np.tensordot(p, U, axes=1)
+        contrib = np.linalg.norm(w_plus) / np.linalg.norm(w + w_plus)
+        if prev_contrib is not None and np.sqrt(tol) > contrib > prev_contrib:
+            return w # round-off error dominates
+        w += w_plus
+        if contrib < tol:
+            return w
+        prev_contrib = contrib
+        r = Hess_norm.dot(r) - leja[n_s+m-1] * r
+        beta = np.linalg.norm(r)
+        if beta < 1e-300: # result is exact (invariant Krylov space)
+            return w
+        v_s = np.tensordot(r / beta, U, axes=1)
+    raise ValueError("Newton propagator did not converge after %d restarts"
+                     % max_restarts)
+
+
+def propagate(v0, A, tgrid, **kwargs):
+    """
+    Propagate `v0` over the time grid `tgrid`, for the piecewise-constant
+    operator `A`, which must be a sequence of operators (matrices or callables,
+    cf. `newton`), one for each time interval. Remaining keyword arguments are
+    passed to `newton`. Return an array of the propagated states at all points
+    of the time grid (first axis: time)
+    """
+    v = np.asarray(v0, dtype=np.complex128)
+    states = np.empty((len(tgrid), ) + v.shape, dtype=np.complex128)
+    states[0] = v
+    for i in range(len(tgrid) - 1):
+        v = newton(A[i], v, tgrid[i+1] - tgrid[i], **kwargs)
+        states[i+1] = v
+    return states
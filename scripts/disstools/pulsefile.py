@@ -0,0 +1,230 @@
+"""
+Binary, memory-mappable pulse files
+
+Parsing the multi-megabyte ASCII pulse files written by QDYN (e.g.
+`chapters/robust/robust_oct_pulses/pulse*.dat`) with `QDYN.pulse.Pulse`
+takes much longer than plotting them. A binary pulse file consists of a fixed
+64-byte header (see `HEADER`) followed by the amplitude as raw complex128
+values. The time grid must be equidistant and is stored in the header as its
+first point and time step only. The amplitude is memory-mapped
+(copy-on-write), so that loading a pulse does not read (or copy) any data
+until it is used.
+
+>>> pulse = load_pulse('pulse1.dat')
+>>> pulse.tgrid, pulse.amplitude, pulse.time_unit, pulse.ampl_unit
+
+`load_pulse` accepts binary pulse files as well as ASCII pulse files; the
+binary version of an ASCII pulse file is stored in the `.npycache` subfolder
+next to it (see `disstools.cache`) on first load. Use `scripts/pulse2bin.py`
+to convert ASCII pulse files to binary pulse files explicitly.
+"""
+import os
+import re
+from glob import glob
+
+import numpy as np
+
+from disstools.cache import CACHE_FOLDER, _hash
+
+MAGIC = b'DTPULSE1'
+
+HEADER = np.dtype([('magic', 'S8'), ('is_complex', '<u4'),
+                   ('reserved', '<u4'), ('nt', '<i8'), ('t0', '<f8'),
+                   ('dt', '<f8'), ('time_unit', 'S12'),
+                   ('ampl_unit', 'S12')])
+assert HEADER.itemsize == 64
+
+# Maximum deviation of the points of a time grid from an equidistant grid,
+# relative to the time step (ASCII pulse files may contain as few as 9
+# significant digits)
+GRID_RTOL = 1.0e-3
+
+# column headers of an ASCII pulse file, e.g.
+# "#    time [ns]    Re(ampl) [au]    Im(ampl) [au]" or "#  t [ns]   E [MHz]"
+RX_COLUMN_HEADER = re.compile(r'^#\s*(?:time|t)\s*\[(\w+)\]\s*\S*\s*\[(\w+)\]')
+RX_TIME_UNIT = re.compile(r'^#\s*(?:time|t)\s*\[(\w+)\]')
+
+
+class BinaryPulse(object):
+    """
+    Pulse returned by `load_pulse`, with the same attributes as
+    `QDYN.pulse.Pulse`
+
+    Attributes:
+        tgrid (array): Time grid
+        amplitude (array): Amplitude, complex if `is_complex`, real otherwise.
+            Usually a copy-on-write memory map of a binary pulse file
+            (in-place changes are not written back to the file)
+        time_unit (str): Unit of `tgrid`
+        ampl_unit (str or None): Unit of `amplitude`
+        is_complex (bool): Whether the pulse has an imaginary part
+    """
+
+    def __init__(self, tgrid, amplitude, time_unit, ampl_unit, is_complex):
+        self.tgrid = tgrid
+        self.amplitude = amplitude
+        self.time_unit = time_unit
+        self.ampl_unit = ampl_unit
+        self.is_complex = is_complex
+
+    @property
+    def dt(self):
+        """Time step"""
+        return self.tgrid[1] - self.tgrid[0]
+
+    def __repr__(self):
+        return "<BinaryPulse: %d points, dt = %g %s>" % (
+               len(self.tgrid), self.dt, self.time_unit)
+
+
+def is_binary_pulse(filename):
+    """Return True if `filename` is a binary pulse file"""
+    with open(filename, 'rb') as in_fh:
+        return in_fh.read(len(MAGIC)) == MAGIC
+
+
+def read_binary_pulse(filename):
+    """Return a `BinaryPulse` for the given binary pulse file"""
+    header = np.fromfile(filename, dtype=HEADER, count=1)
+    if len(header) != 1 or header['magic'][0] != MAGIC:
+        raise ValueError("%s is not a binary pulse file" % filename)
+    header = header[0]
+    nt = int(header['nt'])
+    if os.path.getsize(filename) != HEADER.itemsize + 16 * nt:
+        raise ValueError("%s is truncated" % filename)
+    amplitude = np.memmap(filename, dtype='<c16', mode='c',
+                          offset=HEADER.itemsize, shape=(nt, ))
+    is_complex = bool(header['is_complex'])
+    if not is_complex:
+        amplitude = amplitude.real
+    tgrid = header['t0'] + header['dt'] * np.arange(nt)
+    time_unit = str(header['time_unit'].decode('ascii'))
+    ampl_unit = str(header['ampl_unit'].decode('ascii')) or None
+    return BinaryPulse(tgrid, amplitude, time_unit, ampl_unit, is_complex)
+
+
+def write_binary_pulse(filename, tgrid, amplitude, time_unit, ampl_unit=None):
+    """
+    Write a binary pulse file. Raise a ValueError if `tgrid` is not
+    equidistant (within `GRID_RTOL`)
+    """
+    tgrid = np.asarray(tgrid, dtype=np.float64)
+    nt = len(tgrid)
+    if nt < 2 or len(amplitude) != nt:
+        raise ValueError("tgrid and amplitude must have the same length > 1")
+    dt = (tgrid[-1] - tgrid[0]) / (nt - 1)
+    if np.max(np.abs(tgrid - (tgrid[0] + dt * np.arange(nt)))) > GRID_RTOL*dt:
+        raise ValueError("tgrid is not equidistant")
+    header = np.zeros(1, dtype=HEADER)
+    header['magic'] = MAGIC
+    header['is_complex'] = int(np.iscomplexobj(amplitude)
+                               and np.any(np.imag(amplitude) != 0.0))
+    header['nt'] = nt
+    header['t0'] = tgrid[0]
+    header['dt'] = dt
+    header['time_unit'] = (time_unit or '').encode('ascii')
+    header['ampl_unit'] = (ampl_unit or '').encode('ascii')
+    # write to a temporary file first, so that concurrent figure builds never
+    # see an incomplete pulse file
+    tmp_file = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmp_file, 'wb') as out_fh:
+        header.tofile(out_fh)
+        np.asarray(amplitude, dtype='<c16').tofile(out_fh)
+    os.rename(tmp_file, filename)
+
+
+def read_units(filename):
+    """
+    Return (time_unit, ampl_unit) from the header of an ASCII pulse file.
+    Units that cannot be determined are returned as None.
+    """
+    with open(filename) as in_fh:
+        for line in in_fh:
+            if not line.startswith('#'):
+                break
+            match = RX_COLUMN_HEADER.match(line)
+            if match:
+                return match.group(1), match.group(2)
+            match = RX_TIME_UNIT.match(line)
+            if match:
+                return match.group(1), None
+    return None, None
+
+
+def read_ascii_pulse(filename):
+    """
+    Return (tgrid, amplitude, time_unit, ampl_unit) for the given ASCII pulse
+    file. The file must contain the time grid in the first column and the
+    real (and optionally the imaginary) part of the amplitude in the next
+    column(s).
+    """
+    time_unit, ampl_unit = read_units(filename)
+    data = np.genfromtxt(filename)
+    tgrid = np.array(data[:, 0])
+    if data.shape[1] > 2 and np.any(data[:, 2] != 0.0):
+        amplitude = data[:, 1] + 1j * data[:, 2]
+    else:
+        amplitude = np.array(data[:, 1])
+    return tgrid, amplitude, time_unit, ampl_unit
+
+
+def binary_cache_file(filename):
+    """Return the name of the binary pulse file in which the ASCII pulse file
+    `filename` is cached"""
+    st = os.stat(filename)
+    folder, basename = os.path.split(os.path.abspath(filename))
+    return os.path.join(folder, CACHE_FOLDER, "%s.%s.bin" % (
+                        basename, _hash(st.st_mtime, st.st_size)))
+
+
+def _write_binary_cache(bin_file, tgrid, amplitude, time_unit, ampl_unit):
+    """Write the binary pulse file `bin_file` in the cache folder, replacing
+    any outdated cache files for the same pulse file. Return True on success,
+    False if the pulse cannot be cached"""
+    try:
+        folder = os.path.dirname(bin_file)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        stem = os.path.basename(bin_file).rsplit('.', 2)[0]
+        for outdated in glob(os.path.join(folder, stem + '.*.bin')):
+            try:
+                os.unlink(outdated)
+            except OSError:
+                pass # already removed by a concurrent process
+        write_binary_pulse(bin_file, tgrid, amplitude, time_unit, ampl_unit)
+    except (IOError, OSError, ValueError):
+        return False
+    return True
+
+
+def load_pulse(filename, time_unit=None):
+    """
+    Return a `BinaryPulse` for the given binary or ASCII pulse file. If
+    `time_unit` is given, it overrides the time unit stored in the file.
+
+    ASCII pulse files are converted to binary pulse files in the cache folder
+    on first load. If that is not possible (e.g. for a pulse on a
+    non-equidistant time grid, or for a read-only data folder), the pulse
+    is returned with the parsed (in-memory) amplitude instead.
+    """
+    if is_binary_pulse(filename):
+        pulse = read_binary_pulse(filename)
+    else:
+        bin_file = binary_cache_file(filename)
+        try:
+            pulse = read_binary_pulse(bin_file)
+        except (IOError, ValueError):
+            tgrid, amplitude, file_time_unit, ampl_unit \
+            = read_ascii_pulse(filename)
+            if _write_binary_cache(bin_file, tgrid, amplitude,
+                                   file_time_unit, ampl_unit):
+                pulse = read_binary_pulse(bin_file)
+            else:
+                pulse = BinaryPulse(tgrid, amplitude, file_time_unit,
+                                    ampl_unit, np.iscomplexobj(amplitude))
+    if time_unit is not None:
+        pulse.time_unit = time_unit
+    if not pulse.time_unit:
+        raise ValueError("Cannot determine time unit of pulse file %s"
+                         % filename)
+    return pulse
@@ -0,0 +1,226 @@
+"""
+Parallel evaluation of the robustness of a gate with respect to noise
+
+For each value of the noise strength sigma, the average gate fidelity of a set
+of pulses is averaged over random noise samples drawn from a normal
+distribution with standard deviation sigma. The types of noise are those of
+`chapters/robust/robustness.py`:
+
+*   'time':  timing jitter; each pulse is shifted in time by an independent
+             random offset (sigma in the time unit of the pulses, i.e. ns)
+*   'ampl':  amplitude fluctuations; each pulse is scaled by an independent
+             random factor (sigma in percent)
+*   'det':   a random detuning of the Rydberg level, shared by all pulses
+             (sigma in kHz)
+
+The fidelity is evaluated by a user-supplied function
+``fidelity(pulses, detuning=0.0)``, which receives a list of tuples
+(tgrid, amplitude) with the (perturbed) pulses, and the detuning in kHz. It
+must be defined at module level, so that it can be sent to the worker
+processes.
+
+The samples are distributed over a pool of worker processes. The results are
+written to the output file row by row, as soon as all samples for a value of
+sigma are finished, in the same column layout as the `robust_*.dat` data files
+(sigma in the first column, followed by one column of average fidelities for
+each pulse set). An interrupted sweep is resumed by running it again with the
+same output file: rows that already exist are skipped. The noise samples are
+drawn from a random number generator seeded with the seed of the sweep and the
+index of sigma, so that a resumed sweep gives the same result as an
+uninterrupted one, independent of the number of workers.
+"""
+import os
+from glob import glob
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from disstools.cache import STRING_TYPES
+from disstools.spectra import read_pulse
+
+NOISE_TYPES = ['time', 'ampl', 'det']
+
+# label of the first column of the output file
+SIGMA_LABELS = {'time': 'sigma(time) [ns]', 'ampl': 'sigma(Omega) [%]',
+                'det': 'sigma(detuning) [kHz]'}
+
+# Pulses and fidelity function in each worker process, set by `_init_worker`
+_WORKER = {}
+
+
+def read_pulse_set(pattern):
+    """
+    Return a list of tuples (tgrid, amplitude) for all pulse files matching
+    the given glob pattern (e.g. 'schemes_pulses/jz_pulse*.dat'), sorted by
+    file name
+    """
+    files = sorted(glob(pattern))
+    if len(files) == 0:
+        raise ValueError("No pulse files match %s" % pattern)
+    return [read_pulse(filename)[:2] for filename in files]
+
+
+def shift_pulse(tgrid, amplitude, shift):
+    """
+    Return the amplitude of the pulse shifted by `shift` (positive: later), on
+    the original time grid. The pulse is zero outside of its time grid.
+    """
+    t = tgrid - shift
+    if np.iscomplexobj(amplitude):
+        return (np.interp(t, tgrid, amplitude.real, left=0.0, right=0.0)
+                + 1j * np.interp(t, tgrid, amplitude.imag, left=0.0,
+                                 right=0.0))
+    return np.interp(t, tgrid, amplitude, left=0.0, right=0.0)
+
+
+def perturb_pulses(pulses, noise, sample):
+    """
+    Return a tuple (pulses, detuning) for the given list of pulses (tuples
+    (tgrid, amplitude)) with the noise of the type `noise` applied. The
+    `sample` is an array with one random value per pulse.
+    """
+    if noise == 'time':
+        return ([(tgrid, shift_pulse(tgrid, amplitude, shift))
+                 for ((tgrid, amplitude), shift) in zip(pulses, sample)],
+                0.0)
+    elif noise == 'ampl':
+        return ([(tgrid, (1.0 + 0.01 * delta) * amplitude)
+                 for ((tgrid, amplitude), delta) in zip(pulses, sample)],
+                0.0)
+    elif noise == 'det':
+        return pulses, sample[0]
+    else:
+        raise ValueError("noise must be one of %s" % ", ".join(NOISE_TYPES))
+
+
+def noise_samples(sigma, n_samples, n_pulses, seed, i_sigma):
+    """
+    Return an array of shape (n_samples, n_pulses) of normally distributed
+    random values with standard deviation `sigma`, reproducibly for the given
+    `seed` and index `i_sigma`
+    """
+    random_state = np.random.RandomState([seed, i_sigma])
+    return sigma * random_state.standard_normal((n_samples, n_pulses))
+
+
+def _init_worker(fidelity, pulse_sets, noise):
+    """Store the data shared by all tasks in the worker process"""
+    _WORKER['fidelity'] = fidelity
+    _WORKER['pulse_sets'] = pulse_sets
+    _WORKER['noise'] = noise
+
+
+def _evaluate(task):
+    """
+    Return (i_sigma, i_set, sum of fidelities, number of samples) for the
+    task (i_sigma, i_set, samples)
+    """
+    i_sigma, i_set, samples = task
+    fidelity = _WORKER['fidelity']
+    pulses = _WORKER['pulse_sets'][i_set]
+    total = 0.0
+    for sample in samples:
+        perturbed, detuning = perturb_pulses(pulses, _WORKER['noise'],
+                                             sample[:len(pulses)])
+        total += fidelity(perturbed, detuning=detuning)
+    return i_sigma, i_set, total, len(samples)
+
+
+def read_finished(outfile, sigmas):
+    """
+    Return the number of rows already present in `outfile` (0 if the file does
+    not exist). An incomplete last line (from an interrupted write) is
+    removed. Raise a ValueError if the values of sigma in the file do not
+    match `sigmas`
+    """
+    if not os.path.isfile(outfile):
+        return 0
+    with open(outfile) as in_fh:
+        lines = in_fh.readlines()
+    if len(lines) > 0 and not lines[-1].endswith("\n"):
+        with open(outfile, 'w') as out_fh:
+            out_fh.writelines(lines[:-1])
+        lines = lines[:-1]
+    data = [float(line.split()[0]) for line in lines
+            if line.strip() != '' and not line.startswith('#')]
+    n_done = len(data)
+    if n_done > len(sigmas) or not np.allclose(data, sigmas[:n_done]):
+        raise ValueError("Values of sigma in existing %s do not match the "
+                         "sweep" % outfile)
+    return n_done
+
+
+def header_line(noise, labels):
+    """Return the header line of the output file"""
+    header = "#%23s" % SIGMA_LABELS[noise]
+    for label in labels:
+        header += " %24s" % ("avg fid (%s)" % label)
+    return header + "\n"
+
+
+def sweep(outfile, fidelity, pulse_sets, noise, sigmas, n_samples=100,
+    seed=0, processes=None, chunksize=10):
+    """
+    Evaluate the average gate fidelity of each pulse set for all `sigmas`, and
+    write the result to `outfile`. The `pulse_sets` are a list of tuples
+    (label, pulses), where `pulses` is a list of tuples (tgrid, amplitude) or a
+    glob pattern for the pulse files. The samples for each value of sigma are
+    split into tasks of `chunksize` samples, and distributed over a pool of
+    `processes` workers (default: number of CPUs). Rows already present in
+    `outfile` are not re-calculated.
+    """
+    if noise not in NOISE_TYPES:
+        raise ValueError("noise must be one of %s" % ", ".join(NOISE_TYPES))
+    sigmas = np.asarray(sigmas, dtype=np.float64)
+    labels = [label for (label, __) in pulse_sets]
+    pulse_sets = [read_pulse_set(pulses) if isinstance(pulses, STRING_TYPES)
+                  else pulses for (__, pulses) in pulse_sets]
+    n_pulses = max([len(pulses) for pulses in pulse_sets])
+    if noise == 'det':
+        n_pulses = 1
+    n_done = read_finished(outfile, sigmas)
+    new_file = (not os.path.isfile(outfile)
+                or os.path.getsize(outfile) == 0)
+    if n_done == len(sigmas):
+        return
+
+    def tasks():
+        for i_sigma in range(n_done, len(sigmas)):
+            samples = noise_samples(sigmas[i_sigma], n_samples, n_pulses,
+                                    seed, i_sigma)
+            for i_set in range(len(pulse_sets)):
+                for i in range(0, n_samples, chunksize):
+                    yield i_sigma, i_set, samples[i:i+chunksize]
+
+    if processes is None:
+        processes = cpu_count()
+    pool = None
+    if processes > 1:
+        pool = Pool(processes, _init_worker, (fidelity, pulse_sets, noise))
+        results = pool.imap(_evaluate, tasks())
+    else:
+        _init_worker(fidelity, pulse_sets, noise)
+        results = (_evaluate(task) for task in tasks())
+    try:
+        with open(outfile, 'a') as out_fh:
+            if new_file:
+                out_fh.write(header_line(noise, labels))
+            # the results arrive in the order of the tasks, i.e. all tasks for
+            # one value of sigma are finished before the next one
+            total = np.zeros(len(pulse_sets))
+            count = np.zeros(len(pulse_sets), dtype=int)
+            for i_sigma, i_set, fid_sum, n in results:
+                total[i_set] += fid_sum
+                count[i_set] += n
+                if np.all(count == n_samples):
+                    out_fh.write(" ".join(["%.18e" % val for val in
+                                           [sigmas[i_sigma], ]
+                                           + list(total / n_samples)])
+                                 + "\n")
+                    out_fh.flush()
+                    total[:] = 0.0
+                    count[:] = 0
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
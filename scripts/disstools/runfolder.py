@@ -0,0 +1,200 @@
+"""
+Columnar archive of the population dynamics in a QDYN runfolder
+
+A runfolder such as `chapters/transmon/HOL00302` or `chapters/3states/t3r20101`
+contains one ASCII file per basis state and observable (`psi00_q1.dat`,
+`psi00_cavity.dat`, `psi00_phases.dat`, `rho11_popdyn.dat`, ...), all on the
+same time grid. `pack_runfolder` collects them into a single (uncompressed)
+`.npz` archive inside the runfolder, with the shared time grid, one 2D array
+holding all data columns (each column contiguous in memory), and an index
+that maps each file to its columns. `Runfolder` reads the archive with a
+single read of the data array, and gives access to the data of each file, as
+it would be returned by np.genfromtxt without the time column:
+
+>>> rf = Runfolder('HOL00302')
+>>> rf.tgrid
+>>> rf['psi00_q1'][:, 1] # population in level 1 of the left qubit
+>>> rf.data('00', 'cavity')
+
+If a runfolder has not been packed (or the archive is older than any of the
+data files), the data files are parsed instead (using `disstools.cache`).
+Use `scripts/pack_runfolder.py` to pack runfolders.
+"""
+import os
+import re
+from glob import glob
+
+import numpy as np
+
+from disstools.cache import genfromtxt
+
+# name of the archive file inside the runfolder
+ARCHIVE = 'popdyn.npz'
+
+# data files that are included in the archive, e.g. 'psi00_q1.dat'
+RX_DATA_FILE = re.compile(r'^(psi|rho)(\d+)_(\w+)\.dat$')
+
+
+def data_files(runfolder):
+    """Return a sorted list of the names (without extension) of the data files
+    in the given runfolder that are included in the archive"""
+    names = []
+    for filename in glob(os.path.join(runfolder, '*.dat')):
+        basename = os.path.basename(filename)
+        if RX_DATA_FILE.match(basename):
+            names.append(os.path.splitext(basename)[0])
+    return sorted(names)
+
+
+def read_labels(filename, n_columns):
+    """Return the list of column labels from the last header line of the
+    given data file, or a list of empty labels if the header does not match
+    the `n_columns` columns of the file"""
+    header = ''
+    with open(filename) as in_fh:
+        for line in in_fh:
+            if not line.startswith('#'):
+                break
+            header = line
+    labels = re.split(r'\s{2,}', header.lstrip('#').strip())
+    if len(labels) != n_columns:
+        return ['' for i in range(n_columns)]
+    return labels
+
+
+def _read_data_files(runfolder, cache=True):
+    """
+    Parse the data files in the given runfolder, and return a tuple (tgrid,
+    names, tables, labels), where `tables` is a list of 2D arrays (data
+    without the time column) and `labels` a list of lists of column labels
+    (without the label of the time column), for each of the `names`. Raise a
+    ValueError if the files do not share the same time grid. If `cache` is
+    False, the files are parsed without `disstools.cache`, i.e. no `.npycache`
+    folder is created in the runfolder.
+    """
+    names = data_files(runfolder)
+    if len(names) == 0:
+        raise ValueError("No data files in runfolder %s" % runfolder)
+    tgrid = None
+    tables = []
+    labels = []
+    for name in names:
+        filename = os.path.join(runfolder, name + '.dat')
+        if cache:
+            table = np.atleast_2d(genfromtxt(filename))
+        else:
+            table = np.atleast_2d(np.genfromtxt(filename))
+        if tgrid is None:
+            tgrid = np.array(table[:, 0])
+        elif (len(table) != len(tgrid)) or np.any(table[:, 0] != tgrid):
+            raise ValueError("%s does not have the same time grid as %s.dat"
+                             % (filename, names[0]))
+        tables.append(table[:, 1:])
+        labels.append(read_labels(filename, table.shape[1])[1:])
+    return tgrid, names, tables, labels
+
+
+def pack_runfolder(runfolder):
+    """
+    Pack the data files in the given runfolder into the archive file
+    `ARCHIVE` inside the runfolder, and return the name of the archive file.
+    The data files are not removed.
+    """
+    tgrid, names, tables, labels = _read_data_files(runfolder, cache=False)
+    offsets = np.cumsum([0, ] + [table.shape[1] for table in tables])
+    data = np.empty((offsets[-1], len(tgrid)))
+    for i, table in enumerate(tables):
+        data[offsets[i]:offsets[i+1], :] = table.T
+    archive = os.path.join(runfolder, ARCHIVE)
+    # write to a temporary file first, so that concurrent figure builds never
+    # see an incomplete archive
+    tmp_file = "%s.%d.tmp" % (archive, os.getpid())
+    with open(tmp_file, 'wb') as out_fh:
+        np.savez(out_fh, tgrid=tgrid, data=data, offsets=offsets,
+                 names=np.array(names, dtype='S'),
+                 labels=np.array(sum(labels, []), dtype='S'))
+    os.rename(tmp_file, archive)
+    return archive
+
+
+def is_packed(runfolder):
+    """Return True if the runfolder has an archive that is not older than any
+    of its data files"""
+    archive = os.path.join(runfolder, ARCHIVE)
+    if not os.path.isfile(archive):
+        return False
+    mtime = os.path.getmtime(archive)
+    for name in data_files(runfolder):
+        if os.path.getmtime(os.path.join(runfolder, name + '.dat')) > mtime:
+            return False
+    return True
+
+
+class Runfolder(object):
+    """
+    Population dynamics in a runfolder
+
+    Attributes:
+        runfolder (str): Name of the runfolder
+        tgrid (array): Shared time grid of all data files
+        names (list): Names of all data files (without extension)
+        packed (bool): Whether the data was read from the archive
+    """
+
+    def __init__(self, runfolder):
+        self.runfolder = runfolder
+        self.packed = is_packed(runfolder)
+        if self.packed:
+            with np.load(os.path.join(runfolder, ARCHIVE)) as archive:
+                self.tgrid = archive['tgrid']
+                self._data = archive['data']
+                offsets = archive['offsets']
+                names = [str(name.decode('ascii'))
+                         for name in archive['names']]
+                labels = [str(label.decode('ascii'))
+                          for label in archive['labels']]
+            self.names = names
+            self._columns = {}
+            self._labels = {}
+            for i, name in enumerate(names):
+                self._columns[name] = (offsets[i], offsets[i+1])
+                self._labels[name] = labels[offsets[i]:offsets[i+1]]
+        else:
+            self.tgrid, self.names, tables, labels \
+            = _read_data_files(runfolder)
+            self._data = None
+            self._tables = dict(zip(self.names, tables))
+            self._labels = dict(zip(self.names, labels))
+
+    def __contains__(self, name):
+        return name in self._labels
+
+    def __getitem__(self, name):
+        """Return the data of the file `name` (e.g. 'psi00_q1') as a 2D array
+        with one row per time grid point, without the time column"""
+        if name not in self._labels:
+            raise KeyError("No data file %s.dat in runfolder %s"
+                           % (name, self.runfolder))
+        if self._data is None:
+            return self._tables[name]
+        start, stop = self._columns[name]
+        return self._data[start:stop].T
+
+    def labels(self, name):
+        """Return the list of column labels for the file `name` (without the
+        label of the time column)"""
+        return self._labels[name]
+
+    def data(self, basis_state, observable):
+        """Return the data for the given basis state (e.g. '00') and
+        observable (e.g. 'q1', 'cavity', 'phases', 'popdyn'), from either the
+        'psi' or the 'rho' data file"""
+        for prefix in ('psi', 'rho'):
+            name = "%s%s_%s" % (prefix, basis_state, observable)
+            if name in self:
+                return self[name]
+        raise KeyError("No data for %s, %s in runfolder %s"
+                       % (basis_state, observable, self.runfolder))
+
+    def __repr__(self):
+        return "Runfolder(%r)" % self.runfolder
@@ -0,0 +1,249 @@
+"""
+Batched and cached calculation of pulse spectra
+
+Pulses that share the same time grid are stacked into a single array and
+transformed with one multi-row FFT (a real FFT if all pulses in the batch are
+real). Spectra of pulse files are stored in the `.npycache` subfolder next to
+the pulse file (see `disstools.cache`), keyed by the sha1 hash of the content
+of the pulse file, so that scripts that show the same pulse (or that need the
+same normalization constant) share the result.
+
+The spectrum is the (unnormalized) discrete Fourier transform of the
+amplitude, as returned by the `spectrum` method of `QDYN.pulse.Pulse`. Unlike
+`Pulse.spectrum`, the frequencies are always sorted from negative to positive.
+
+Most figures only show a narrow frequency band. If a `band` is given, the
+spectrum is evaluated only at `n_freq` equidistant frequencies in that band,
+using the chirp-z transform ("zoom FFT", see `zoom_dft`). This gives an
+arbitrarily fine frequency resolution in the band, at the cost of a few FFTs
+of length ~(number of time points + n_freq), instead of zero-padding the
+pulse to a much longer FFT. By default, `n_freq` is chosen from the duration
+T of the pulse, such that the frequency step is at most 1/(2T), i.e. half the
+step of the FFT grid.
+"""
+import os
+import hashlib
+
+import numpy as np
+
+from disstools.cache import CACHE_FOLDER, STRING_TYPES, _hash, _write_cache
+from disstools.pulsefile import load_pulse
+
+# Conversion factors to seconds and Hz
+TIME_UNITS = {'s': 1.0, 'ms': 1.0e-3, 'us': 1.0e-6, 'microsec': 1.0e-6,
+              'ns': 1.0e-9, 'ps': 1.0e-12, 'fs': 1.0e-15}
+FREQ_UNITS = {'Hz': 1.0, 'kHz': 1.0e3, 'MHz': 1.0e6, 'GHz': 1.0e9}
+
+MODES = ['abs', 'real', 'imag', 'complex']
+
+
+def file_hash(filename):
+    """Return the sha1 hex digest of the content of the given file"""
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as in_fh:
+        for block in iter(lambda: in_fh.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def read_pulse(filename, time_unit=None):
+    """
+    Return (tgrid, amplitude, time_unit) for the given pulse file, which may
+    be a binary pulse file or an ASCII pulse file (see
+    `disstools.pulsefile.load_pulse`). If `time_unit` is not given, it is read
+    from the header of the file.
+    """
+    pulse = load_pulse(filename, time_unit)
+    return pulse.tgrid, pulse.amplitude, pulse.time_unit
+
+
+def fftfreq(n, dt, time_unit, freq_unit):
+    """
+    Return the sorted frequency grid for a time grid of `n` points with time
+    step `dt` (in `time_unit`), in `freq_unit`
+    """
+    time_factor, freq_factor = unit_factors(time_unit, freq_unit)
+    return np.fft.fftshift(np.fft.fftfreq(n, dt*time_factor)) / freq_factor
+
+
+def unit_factors(time_unit, freq_unit):
+    """
+    Return the conversion factors from `time_unit` to seconds and from
+    `freq_unit` to Hz
+    """
+    try:
+        time_factor = TIME_UNITS[time_unit]
+    except KeyError:
+        raise ValueError("Unknown time unit: %s" % time_unit)
+    try:
+        freq_factor = FREQ_UNITS[freq_unit]
+    except KeyError:
+        raise ValueError("Unknown frequency unit: %s" % freq_unit)
+    return time_factor, freq_factor
+
+
+def batch_fft(amplitudes):
+    """
+    Return the sorted (fftshift'ed) discrete Fourier transform of each row of
+    the 2D array `amplitudes`. For real amplitudes, a real FFT is used, and the
+    negative frequencies are filled in from the symmetry of the spectrum
+    """
+    amplitudes = np.asarray(amplitudes)
+    n = amplitudes.shape[1]
+    if np.iscomplexobj(amplitudes):
+        return np.fft.fftshift(np.fft.fft(amplitudes, axis=1), axes=1)
+    rspec = np.fft.rfft(amplitudes, axis=1)
+    return np.concatenate((np.conj(rspec[:, n//2:0:-1]),
+                           rspec[:, :(n+1)//2]), axis=1)
+
+
+def zoom_dft(amplitudes, f_start, df, n_freq):
+    """
+    Return the discrete Fourier transform of each row of the 2D array
+    `amplitudes`, evaluated at the `n_freq` frequencies f_start + k * df, with
+    `f_start` and `df` in units of the sampling rate (1/dt). For frequencies
+    on the FFT grid, the result is the same as for `np.fft.fft`.
+
+    The transform is calculated with the chirp-z transform (Bluestein's
+    algorithm), as a convolution with a chirp, via FFTs of length
+    >= n + n_freq - 1, for n time points.
+    """
+    amplitudes = np.asarray(amplitudes)
+    n = amplitudes.shape[1]
+    n_fft = 1 << int(np.ceil(np.log2(n + n_freq - 1)))
+    k = np.arange(max(n, n_freq))
+    # chirp W^(k^2/2), with W = exp(-2 pi i df); reduce the phase modulo 2 pi
+    # before exponentiation, as k^2 * df is large
+    chirp = np.exp(-1j * np.pi * np.mod(k * k * df, 2.0))
+    shift = np.exp(-2j * np.pi * np.mod(f_start * k[:n], 1.0))
+    y = np.zeros((amplitudes.shape[0], n_fft), dtype=np.complex128)
+    y[:, :n] = amplitudes * (shift * chirp[:n])
+    v = np.zeros(n_fft, dtype=np.complex128)
+    v[:n_freq] = np.conj(chirp[:n_freq])
+    v[n_fft-n+1:] = np.conj(chirp[1:n][::-1])
+    conv = np.fft.ifft(np.fft.fft(y, axis=1) * np.fft.fft(v), axis=1)
+    return conv[:, :n_freq] * chirp[:n_freq]
+
+
+def apply_mode(spectrum, mode):
+    """Return the given complex spectrum converted according to `mode`"""
+    if mode == 'abs':
+        return np.abs(spectrum)
+    elif mode == 'real':
+        return spectrum.real
+    elif mode == 'imag':
+        return spectrum.imag
+    elif mode == 'complex':
+        return spectrum
+    else:
+        raise ValueError("mode must be one of %s" % ", ".join(MODES))
+
+
+def band_points(band, n, rate):
+    """
+    Return the number of frequencies in the `band` (f_min, f_max) for which
+    the frequency step is at most half the step rate/n of the FFT grid of a
+    pulse with `n` points, sampled at `rate` (in the same unit as `band`)
+    """
+    n_steps = 2.0 * n * (band[1] - band[0]) / rate
+    # allow for rounding errors in rate, so that e.g. 9800.0000001 => 9800
+    return int(np.ceil(n_steps - 1.0e-6)) + 1
+
+
+def spectrum_cache_file(filename, freq_unit, mode, content_hash, band=None,
+                        n_freq=None, normalize=False):
+    """Return the name of the file in which the spectrum is cached"""
+    folder, basename = os.path.split(os.path.abspath(filename))
+    if band is None:
+        key = _hash(freq_unit, mode)
+    else:
+        key = _hash(freq_unit, mode, tuple(band), n_freq)
+    if normalize:
+        key = _hash(key, 'normalize')
+    return os.path.join(folder, CACHE_FOLDER, "%s.spectrum.%s.%s.npy" % (
+        basename, key, content_hash[:12]))
+
+
+def pulse_spectra(pulses, freq_unit='MHz', mode='abs', time_unit=None,
+                  band=None, n_freq=None, normalize=False):
+    """
+    Return a list of tuples (freq, spectrum) for each of the given pulses
+
+    Each pulse may be the name of a pulse file, or an object with attributes
+    `tgrid`, `amplitude`, and `time_unit` (e.g. an instance of
+    `QDYN.pulse.Pulse`). Spectra of pulse files are cached on disk. The time
+    unit of pulse files is read from their header, unless `time_unit` is
+    given.
+
+    If `band` is given as a tuple (f_min, f_max) in `freq_unit`, the spectrum
+    is evaluated only at `n_freq` equidistant frequencies from f_min to f_max
+    (inclusive), see `zoom_dft`. If `n_freq` is None, it is chosen for each
+    pulse such that the frequency step is at most half the step of the FFT
+    grid (see `band_points`). Without `band`, the full spectrum on the FFT
+    grid is returned.
+
+    If `normalize` is True, each spectrum is divided by the number of time
+    points of its pulse, so that the spectra of pulses of different duration
+    are on the same scale.
+    """
+    if mode not in MODES:
+        raise ValueError("mode must be one of %s" % ", ".join(MODES))
+    if freq_unit not in FREQ_UNITS:
+        raise ValueError("Unknown frequency unit: %s" % freq_unit)
+    if band is not None:
+        if not band[0] < band[1]:
+            raise ValueError("band must be given as (f_min, f_max)")
+        if n_freq is not None and n_freq < 2:
+            raise ValueError("n_freq must be at least 2")
+    result = [None for pulse in pulses]
+    batches = {} # (n, dt, time_unit) => list of (index, amplitude, cachefile)
+    for i, pulse in enumerate(pulses):
+        cache_file = None
+        if isinstance(pulse, STRING_TYPES):
+            cache_file = spectrum_cache_file(pulse, freq_unit, mode,
+                                             file_hash(pulse), band, n_freq,
+                                             normalize)
+            try:
+                data = np.load(cache_file)
+                result[i] = (data[0].real, data[1])
+                continue
+            except (IOError, ValueError):
+                tgrid, amplitude, unit = read_pulse(pulse, time_unit)
+        else:
+            tgrid, amplitude, unit = (pulse.tgrid, pulse.amplitude,
+                                      pulse.time_unit)
+        # QDYN writes the time grid with 17 significant digits; round so that
+        # pulses on the same grid end up in the same batch
+        dt = float("%.10e" % (tgrid[1] - tgrid[0]))
+        batches.setdefault((len(tgrid), dt, unit), []).append(
+                           (i, amplitude, cache_file))
+    for (n, dt, unit), batch in batches.items():
+        amplitudes = [amplitude for (i, amplitude, __) in batch]
+        if band is None:
+            freq = fftfreq(n, dt, unit, freq_unit)
+            spectra = batch_fft(amplitudes)
+        else:
+            time_factor, freq_factor = unit_factors(unit, freq_unit)
+            rate = 1.0 / (dt * time_factor * freq_factor) # in freq_unit
+            n_band = n_freq
+            if n_band is None:
+                n_band = band_points(band, n, rate)
+            freq = np.linspace(band[0], band[1], n_band)
+            spectra = zoom_dft(amplitudes, band[0] / rate,
+                               (freq[1] - freq[0]) / rate, n_band)
+        for (i, __, cache_file), spectrum in zip(batch, spectra):
+            if normalize:
+                spectrum = spectrum / n
+            spectrum = apply_mode(spectrum, mode)
+            result[i] = (freq, spectrum)
+            if cache_file is not None:
+                _write_cache(cache_file, np.array([freq, spectrum]))
+    return result
+
+
+def pulse_spectrum(pulse, freq_unit='MHz', mode='abs', time_unit=None,
+                   band=None, n_freq=None, normalize=False):
+    """Return a tuple (freq, spectrum) for a single pulse, cf. `pulse_spectra`
+    """
+    return pulse_spectra([pulse, ], freq_unit, mode, time_unit, band,
+                         n_freq, normalize)[0]
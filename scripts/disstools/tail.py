@@ -0,0 +1,211 @@
+"""
+Incremental reader for data files that are still being written
+
+Optimizations and parameter scans append one line per iteration (or per
+parameter value) to their log files. A figure that shows these logs while the
+runs are still in progress would have to re-parse the entire file every time
+it is re-rendered. The `TailReader` instead remembers the byte offset up to
+which it has parsed the file, and on each update only parses the lines that
+have been appended since. Lines that are not complete yet (no final newline)
+are left for the next update. The data read so far is available at any time
+as a (partial) array.
+
+The readers are kept in a registry for the lifetime of the process, so that
+repeated calls to `read_tail` for the same file in a long-running process
+(e.g. a figure script in watch mode) only parse new lines. In addition, the
+parsed rows and the byte offset are stored in the `.npycache` subfolder next
+to the data file (cf. `disstools.cache`), so that a new process (each figure
+build, or each job of the render server in `scripts/figserver.py`) continues
+where the last one stopped:
+
+>>> iter, favg = read_tail('rydberg/diss/s2R0003_f_avg.dat', usecols=(0,1),
+...                        unpack=True)
+
+If a file is replaced, truncated, or rewritten in place (e.g. an optimization
+is restarted), it is read again from the beginning. A rewrite in place is
+detected by a fingerprint of the parsed part of the file (its first and last
+`FINGERPRINT_BYTES` bytes), which is checked before every update.
+"""
+import os
+import re
+import hashlib
+from glob import glob
+
+import numpy as np
+
+from disstools.cache import CACHE_FOLDER, _hash, _write_cache
+
+# (absolute file name, usecols, dtype) => TailReader
+_READERS = {}
+
+# number of bytes at the beginning and at the end of the parsed part of a file
+# that are included in its fingerprint
+FINGERPRINT_BYTES = 256
+
+
+def fingerprint(in_fh, offset):
+    """
+    Return a short hex digest of the first and last `FINGERPRINT_BYTES` bytes
+    of the first `offset` bytes of the open (binary) file `in_fh`
+    """
+    in_fh.seek(0)
+    head = in_fh.read(min(offset, FINGERPRINT_BYTES))
+    in_fh.seek(max(0, offset - FINGERPRINT_BYTES))
+    tail = in_fh.read(offset - max(0, offset - FINGERPRINT_BYTES))
+    return hashlib.sha1(head + b'|' + tail).hexdigest()[:12]
+
+
+class TailReader(object):
+    """
+    Reader for a whitespace-separated data file that is growing over time
+
+    Attributes:
+        fname (str): Name of the data file
+        usecols (tuple or None): Indices of the columns to read (all columns
+            if None)
+        offset (int): Number of bytes of the file that have been parsed
+        fingerprint (str or None): `fingerprint` of the first `offset` bytes
+        n_rows (int): Number of rows that have been parsed
+        cache (bool): Whether to store the parsed rows in the `.npycache`
+            folder
+    """
+
+    def __init__(self, fname, usecols=None, dtype=np.float64, cache=True):
+        self.fname = fname
+        self.usecols = usecols
+        self.dtype = dtype
+        self.cache = cache
+        self.offset = 0
+        self.fingerprint = None
+        self.n_rows = 0
+        self._inode = None
+        self._buffer = None
+        if cache:
+            self._load_cache()
+
+    def _cache_stem(self):
+        """Return the name of the cache file, up to the inode, offset, and
+        fingerprint"""
+        folder, basename = os.path.split(os.path.abspath(self.fname))
+        return os.path.join(folder, CACHE_FOLDER, "%s.tail.%s" % (
+            basename, _hash(self.usecols)))
+
+    def _load_cache(self):
+        """Restore the rows (and the offset up to which they were parsed) from
+        the cache file, if it exists. The fingerprint is checked against the
+        data file on the next `update`."""
+        stem = self._cache_stem()
+        for npy_file in glob(stem + '.*.npy'):
+            match = re.match(r'^(\d+)-(\d+)-([0-9a-f]+)$',
+                             npy_file[len(stem)+1:-4])
+            if match:
+                try:
+                    rows = np.load(npy_file)
+                except (IOError, ValueError):
+                    continue
+                self._inode = int(match.group(1))
+                self.offset = int(match.group(2))
+                self.fingerprint = match.group(3)
+                self._buffer = np.array(rows, dtype=np.float64)
+                self.n_rows = len(rows)
+                return
+
+    def _save_cache(self):
+        """Write the rows parsed so far to the cache file"""
+        _write_cache("%s.%d-%d-%s.npy" % (self._cache_stem(), self._inode,
+                                          self.offset, self.fingerprint),
+                     self._buffer[:self.n_rows])
+
+    def reset(self):
+        """Forget all data read so far"""
+        self.offset = 0
+        self.fingerprint = None
+        self.n_rows = 0
+        self._inode = None
+        self._buffer = None
+
+    def _append(self, rows):
+        """Append the list of rows (lists of strings) to the buffer"""
+        rows = np.array(rows, dtype=np.float64)
+        if self._buffer is None:
+            self._buffer = np.empty((max(64, len(rows)), rows.shape[1]))
+        elif rows.shape[1] != self._buffer.shape[1]:
+            raise ValueError("Inconsistent number of columns in %s"
+                             % self.fname)
+        capacity = len(self._buffer)
+        if self.n_rows + len(rows) > capacity:
+            while self.n_rows + len(rows) > capacity:
+                capacity *= 2
+            buffer = np.empty((capacity, self._buffer.shape[1]))
+            buffer[:self.n_rows] = self._buffer[:self.n_rows]
+            self._buffer = buffer
+        self._buffer[self.n_rows:self.n_rows+len(rows)] = rows
+        self.n_rows += len(rows)
+
+    def update(self):
+        """
+        Parse all complete lines that have been appended to the file since the
+        last update, and return the number of new rows
+        """
+        try:
+            st = os.stat(self.fname)
+        except OSError:
+            self.reset() # file does not exist (yet)
+            return 0
+        if st.st_ino != self._inode or st.st_size < self.offset:
+            self.reset() # file was replaced or truncated
+            self._inode = st.st_ino
+        with open(self.fname, 'rb') as in_fh:
+            if (self.offset > 0
+            and fingerprint(in_fh, self.offset) != self.fingerprint):
+                self.reset() # file was rewritten in place
+                self._inode = st.st_ino
+            if st.st_size == self.offset:
+                return 0
+            in_fh.seek(self.offset)
+            chunk = in_fh.read(st.st_size - self.offset)
+            end = chunk.rfind(b'\n') + 1 # only parse complete lines
+            if end == 0:
+                return 0
+            self.offset += end
+            self.fingerprint = fingerprint(in_fh, self.offset)
+        rows = []
+        for line in chunk[:end].decode('ascii', 'replace').splitlines():
+            fields = line.split()
+            if len(fields) == 0 or fields[0].startswith('#'):
+                continue
+            if self.usecols is not None:
+                fields = [fields[i] for i in self.usecols]
+            rows.append(fields)
+        if len(rows) > 0:
+            self._append(rows)
+            if self.cache:
+                self._save_cache()
+        return len(rows)
+
+    @property
+    def data(self):
+        """Array of all rows parsed so far (one row for each line)"""
+        if self._buffer is None:
+            n_cols = 0 if self.usecols is None else len(self.usecols)
+            return np.empty((0, n_cols), dtype=self.dtype)
+        return self._buffer[:self.n_rows].astype(self.dtype)
+
+
+def read_tail(fname, usecols=None, dtype=np.float64, unpack=False):
+    """
+    Return the data in the file `fname` as a 2D array (one row for each
+    complete line; possibly zero rows for a run that has just started),
+    parsing only the lines appended since the last call for the same file.
+    The arguments are as for np.genfromtxt.
+    """
+    if usecols is not None:
+        usecols = tuple(usecols)
+    key = (os.path.abspath(fname), usecols, np.dtype(dtype).str)
+    if key not in _READERS:
+        _READERS[key] = TailReader(fname, usecols, dtype)
+    reader = _READERS[key]
+    reader.update()
+    if unpack:
+        return reader.data.T
+    return reader.data
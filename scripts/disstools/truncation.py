@@ -0,0 +1,199 @@
+"""
+Adaptive truncation of the Hilbert space of two transmons and a cavity
+
+The entanglement scans in `chapters/transmon/holonomic_entanglement` calculate
+the concurrence and the population loss of the gate for a series of pulse
+amplitudes E. Strong driving populates higher transmon and cavity levels, so
+the number of qubit levels (n_q, for each transmon) and of cavity levels (n_c)
+must grow with E; in the existing data they were chosen by hand for each
+point. Here, they are chosen automatically: each point is first propagated in
+a small basis, and the basis is grown until the maximum population (over time
+and over the four logical basis states) in the top level of either transmon
+and in the top level of the cavity is below a tolerance. Only the truncation
+(qubit or cavity) whose top level is populated is grown.
+
+A propagation is stopped as soon as the population in a top level exceeds the
+tolerance, so that a basis that turns out to be too small costs only part of
+a full propagation. In a scan, each point starts from the basis in which the
+previous point converged (as the required basis grows with E), so that the
+small bases are only tried for the first point.
+
+The model is a user-supplied function ``model(E, nq, nc)`` that returns a
+tuple (H, tgrid), where `H` is the Hamiltonian as accepted by
+`disstools.cheby.ChebyPropagator.propagate` (a function of time, or a list of
+matrices for each interval of `tgrid`), on the Hilbert space of dimension
+nq * nq * nc, with the basis states ordered as |q1, q2, c> (q1 slowest, c
+fastest). The output file has the same format as the `entanglement_*.dat`
+files (E, concurrence, population loss, n_q, n_c). An interrupted scan is
+resumed by running it again with the same output file.
+"""
+import os
+
+import numpy as np
+
+from disstools import weyl
+from disstools.cheby import ChebyPropagator
+
+
+def logical_states(nq, nc):
+    """Return the logical basis states |000>, |010>, |100>, |110> (qubit
+    levels 0 and 1, cavity ground state) as columns of an array"""
+    states = np.zeros((nq * nq * nc, 4), dtype=np.complex128)
+    for i, (q1, q2) in enumerate([(0, 0), (0, 1), (1, 0), (1, 1)]):
+        states[(q1 * nq + q2) * nc, i] = 1.0
+    return states
+
+
+def top_populations(states, nq, nc):
+    """
+    Return the tuple (pop_q, pop_c) of the maximum population in the top level
+    of either qubit and in the top level of the cavity, over the given states
+    (one state per column)
+    """
+    pops = np.abs(states.reshape(nq, nq, nc, -1))**2
+    pop_q = max(np.max(np.sum(pops[-1], axis=(0, 1))),
+                np.max(np.sum(pops[:, -1], axis=(0, 1))))
+    pop_c = np.max(np.sum(pops[:, :, -1], axis=(0, 1)))
+    return pop_q, pop_c
+
+
+def propagate_gate(H, tgrid, nq, nc, limit_q=None, limit_c=None,
+    propagator=None):
+    """
+    Propagate the logical basis states and return a tuple (U, pop_q, pop_c),
+    with the gate `U` (projection of the propagated states onto the logical
+    subspace), and the maximum population in the top qubit and cavity level
+    during the propagation. If the top qubit (cavity) population exceeds
+    `limit_q` (`limit_c`), the propagation is stopped, and U is None.
+    """
+    if propagator is None:
+        propagator = ChebyPropagator()
+    psi = logical_states(nq, nc)
+    max_q = max_c = 0.0
+    for i in range(len(tgrid) - 1):
+        dt = tgrid[i+1] - tgrid[i]
+        if callable(H):
+            H_i = H(tgrid[i] + 0.5 * dt)
+        else:
+            H_i = H[i]
+        psi = propagator.step(psi, H_i, dt)
+        pop_q, pop_c = top_populations(psi, nq, nc)
+        max_q = max(max_q, pop_q)
+        max_c = max(max_c, pop_c)
+        if ((limit_q is not None and max_q > limit_q)
+        or  (limit_c is not None and max_c > limit_c)):
+            return None, max_q, max_c
+    U = np.dot(logical_states(nq, nc).T, psi)
+    return U, max_q, max_c
+
+
+def converged_gate(model, E, nq, nc, tol=1e-4, nq_step=1, nc_step=5,
+    nq_max=None, nc_max=None, propagator=None):
+    """
+    Return a tuple (U, nq, nc, converged) with the gate for the pulse amplitude
+    `E`, and the number of qubit and cavity levels for which the population in
+    the top levels stayed below `tol`, starting from the given `nq`, `nc`, and
+    growing them by `nq_step`, `nc_step`. If the basis cannot be grown
+    further (`nq_max`, `nc_max`), the gate for the largest basis is returned,
+    with `converged` False.
+    """
+    if propagator is None:
+        propagator = ChebyPropagator()
+    while True:
+        can_grow_q = (nq_max is None or nq < nq_max)
+        can_grow_c = (nc_max is None or nc < nc_max)
+        H, tgrid = model(E, nq, nc)
+        U, pop_q, pop_c = propagate_gate(
+            H, tgrid, nq, nc, limit_q=(tol if can_grow_q else None),
+            limit_c=(tol if can_grow_c else None), propagator=propagator)
+        grow_q = (pop_q > tol and can_grow_q)
+        grow_c = (pop_c > tol and can_grow_c)
+        if U is not None and not (grow_q or grow_c):
+            return U, nq, nc, (pop_q <= tol and pop_c <= tol)
+        if grow_q:
+            nq = nq + nq_step
+            if nq_max is not None:
+                nq = min(nq, nq_max)
+        if grow_c:
+            nc = nc + nc_step
+            if nc_max is not None:
+                nc = min(nc, nc_max)
+
+
+def gate_concurrence(U):
+    """Return the concurrence of the (possibly non-unitary) gate `U`"""
+    return weyl.concurrence(*weyl.c1c2c3(weyl.closest_unitary(U)))
+
+
+def pop_loss(U):
+    """Return the population loss from the logical subspace for the gate `U`,
+    averaged over the logical basis states"""
+    return 1.0 - np.sum(np.abs(U)**2) / 4.0
+
+
+def header_line():
+    """Return the header line of the output file"""
+    return "#%11s%15s%15s%8s%8s\n" % ('E0[MHz]', 'concurrence', 'pop_loss',
+                                     'n_q', 'n_c')
+
+
+def read_finished(outfile, E_vals):
+    """
+    Return a tuple (n_done, nq, nc) with the number of rows already present in
+    `outfile` (0 if the file does not exist), and the number of qubit and
+    cavity levels of the last row (None if there are no rows). An incomplete
+    last line (from an interrupted write) is removed. Raise a ValueError if
+    the values of E in the file do not match `E_vals`
+    """
+    if not os.path.isfile(outfile):
+        return 0, None, None
+    with open(outfile) as in_fh:
+        lines = in_fh.readlines()
+    if len(lines) > 0 and not lines[-1].endswith("\n"):
+        with open(outfile, 'w') as out_fh:
+            out_fh.writelines(lines[:-1])
+        lines = lines[:-1]
+    rows = [line.split() for line in lines
+            if line.strip() != '' and not line.startswith('#')]
+    n_done = len(rows)
+    if n_done > len(E_vals) or not np.allclose(
+            [float(row[0]) for row in rows], E_vals[:n_done]):
+        raise ValueError("Values of E in existing %s do not match the scan"
+                         % outfile)
+    if n_done == 0:
+        return 0, None, None
+    return n_done, int(rows[-1][3]), int(rows[-1][4])
+
+
+def scan(outfile, model, E_vals, nq_min=3, nc_min=5, tol=1e-4, nq_step=1,
+    nc_step=5, nq_max=None, nc_max=None):
+    """
+    Calculate the concurrence and population loss for each pulse amplitude in
+    `E_vals` (in increasing order), with adaptive truncation, and write the
+    result to `outfile`. The first point starts from `nq_min` qubit and
+    `nc_min` cavity levels, each further point from the basis of the
+    previous point. Rows already present in `outfile` are not re-calculated.
+    Return the list of amplitudes for which the truncation did not converge
+    (because `nq_max` or `nc_max` was reached).
+    """
+    E_vals = np.asarray(E_vals, dtype=np.float64)
+    n_done, nq, nc = read_finished(outfile, E_vals)
+    if nq is None:
+        nq, nc = nq_min, nc_min
+    new_file = (not os.path.isfile(outfile)
+                or os.path.getsize(outfile) == 0)
+    propagator = ChebyPropagator()
+    not_converged = []
+    with open(outfile, 'a') as out_fh:
+        if new_file:
+            out_fh.write(header_line())
+        for E in E_vals[n_done:]:
+            U, nq, nc, converged = converged_gate(
+                model, E, nq, nc, tol=tol, nq_step=nq_step, nc_step=nc_step,
+                nq_max=nq_max, nc_max=nc_max, propagator=propagator)
+            if not converged:
+                not_converged.append(E)
+            out_fh.write("%12.6f%15.6f%15.6E%8d%8d\n" % (
+                         E, gate_concurrence(U), pop_loss(U), nq, nc))
+            out_fh.flush()
+    return not_converged
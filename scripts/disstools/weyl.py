@@ -0,0 +1,277 @@
+"""
+Vectorized conversion between Weyl chamber coordinates and local invariants
+
+All routines accept scalars or numpy arrays of equal shape, and can be used as
+drop-in replacements for the corresponding scalar routines in `QDYN.weyl`:
+
+>>> g1, g2, g3 = g1g2g3_from_c1c2c3(0.5, 0.25, 0.0)
+
+Alternatively, a single array of shape (N, 3) (or, more generally, any array
+whose last axis has length 3) may be passed, in which case the result is also
+returned as a single array:
+
+>>> g = g1g2g3_from_c1c2c3(path) # path.shape == (N, 3) => g.shape == (N, 3)
+
+The Weyl chamber coordinates (c1, c2, c3) are in units of pi.
+
+The local invariants and Weyl chamber coordinates of two-qubit gates are
+calculated by `g1g2g3` and `c1c2c3`, for a single 4x4 matrix or for an array
+of gates of shape (..., 4, 4):
+
+>>> c1, c2, c3 = c1c2c3(gates) # gates.shape == (N, 4, 4) => c1.shape == (N,)
+
+Running this module as a script checks `c1c2c3` against the exact coordinates
+of some well-known gates (`check_known_gates`).
+"""
+import numpy as np
+
+# Matrix that maps the (sorted, shifted) phases of the eigenvalues of
+# m = U_B^T U_B to the Weyl chamber coordinates, cf. Childs et al.,
+# PRA 68, 052311 (2003)
+_M_CHILDS = np.array([[1, 1, 0], [1, 0, 1], [0, 1, 1]], dtype=np.float64)
+
+# Transformation from the computational basis to the magic (Bell) basis
+Q_MAGIC = np.array([[1,  0,  0,  1j],
+                    [0, 1j,  1,  0],
+                    [0, 1j, -1,  0],
+                    [1,  0,  0, -1j]], dtype=np.complex128) / np.sqrt(2.0)
+
+
+# Pauli matrices, for `KNOWN_GATES`
+_SIGMA_X = np.array([[0, 1], [1, 0]], dtype=np.complex128)
+_SIGMA_Y = np.array([[0, -1j], [1j, 0]], dtype=np.complex128)
+
+
+def _split(x1, x2, x3):
+    """Return a tuple (x1, x2, x3, stacked) of float arrays. If only `x1` is
+    given, it is split along its last axis and `stacked` is True"""
+    if x2 is None and x3 is None:
+        x = np.asarray(x1, dtype=np.float64)
+        if x.shape[-1] != 3:
+            raise ValueError("Last axis must have length 3")
+        return x[..., 0], x[..., 1], x[..., 2], True
+    return (np.asarray(x1, dtype=np.float64), np.asarray(x2, dtype=np.float64),
+            np.asarray(x3, dtype=np.float64), False)
+
+
+def _join(x1, x2, x3, stacked):
+    """Inverse of `_split`"""
+    if stacked:
+        return np.stack((x1, x2, x3), axis=-1)
+    if np.ndim(x1) == 0: # scalar input => scalar output
+        return x1[()], x2[()], x3[()]
+    return x1, x2, x3
+
+
+def g1g2g3_from_c1c2c3(c1, c2=None, c3=None):
+    """
+    Return the local invariants (g1, g2, g3) for the given Weyl chamber
+    coordinates
+    """
+    c1, c2, c3, stacked = _split(c1, c2, c3)
+    c1, c2, c3 = np.pi * c1, np.pi * c2, np.pi * c3
+    g1 = np.cos(c1)**2 * np.cos(c2)**2 * np.cos(c3)**2 \
+         - np.sin(c1)**2 * np.sin(c2)**2 * np.sin(c3)**2
+    g2 = 0.25 * np.sin(2*c1) * np.sin(2*c2) * np.sin(2*c3)
+    g3 = 4*g1 - np.cos(2*c1) * np.cos(2*c2) * np.cos(2*c3)
+    return _join(g1, g2, g3, stacked)
+
+
+def c1c2c3_from_g1g2g3(g1, g2=None, g3=None):
+    """
+    Return the Weyl chamber coordinates (c1, c2, c3) for the given local
+    invariants
+
+    The local invariants determine the characteristic polynomial of
+    m = U_B^T U_B (U_B being the gate in the Bell basis, normalized to a
+    determinant of one); its roots are found for all points at once from the
+    eigenvalues of the stacked companion matrices. The roots are then mapped
+    into the Weyl chamber as in Childs et al., PRA 68, 052311 (2003). Near
+    points where roots coincide (e.g. the identity), the result is only
+    accurate to about the square root of the precision of the invariants.
+    """
+    g1, g2, g3, stacked = _split(g1, g2, g3)
+    shape = g1.shape
+    G1 = (g1 + 1j * g2).ravel()
+    e1 = 4.0 * np.sqrt(G1)      # tr(m)
+    e2 = 2.0 * g3.ravel()       # sum of products of pairs of eigenvalues
+    e3 = np.conj(e1)            # sum of products of triples of eigenvalues
+    companion = np.zeros((len(G1), 4, 4), dtype=np.complex128)
+    companion[:, 1, 0] = companion[:, 2, 1] = companion[:, 3, 2] = 1.0
+    companion[:, 0, 3] = -1.0   # det(m) = 1
+    companion[:, 1, 3] = e3
+    companion[:, 2, 3] = -e2
+    companion[:, 3, 3] = e1
+    two_S = np.angle(np.linalg.eigvals(companion)) / np.pi
+    c1, c2, c3 = _c1c2c3_from_two_S(two_S)
+    return _join(c1.reshape(shape), c2.reshape(shape), c3.reshape(shape),
+                 stacked)
+
+
+def _c1c2c3_from_two_S(two_S):
+    """
+    Return arrays (c1, c2, c3) for the phases `two_S` (in units of pi, array
+    of shape (N, 4)) of the eigenvalues of m = U_B^T U_B for N gates (each
+    normalized to a determinant of one), with the branch cut and the
+    reduction to the Weyl chamber of Childs et al., PRA 68, 052311 (2003)
+    """
+    two_S = np.array(two_S, dtype=np.float64)
+    two_S[two_S <= -0.5] += 2.0
+    S = -np.sort(-two_S / 2.0, axis=1) # descending
+    n = np.rint(S.sum(axis=1)).astype(int)
+    S -= (np.arange(4)[np.newaxis, :] < n[:, np.newaxis])
+    # roll each row by -n
+    S = S[np.arange(len(S))[:, np.newaxis],
+          (np.arange(4)[np.newaxis, :] + n[:, np.newaxis]) % 4]
+    c1, c2, c3 = np.dot(S[:, :3], _M_CHILDS.T).T
+    mirror = (c3 < 0)
+    c1[mirror] = 1.0 - c1[mirror]
+    c3[mirror] = -c3[mirror]
+    return c1, c2, c3
+
+
+def g1g2g3(U):
+    """
+    Return the local invariants (g1, g2, g3) of the two-qubit gate `U` (4x4
+    matrix in the computational basis, not necessarily unitary), or of an
+    array of gates of shape (..., 4, 4)
+    """
+    U = np.asarray(U, dtype=np.complex128)
+    UB = np.matmul(np.matmul(Q_MAGIC.conj().T, U), Q_MAGIC) # Bell basis
+    m = np.matmul(np.swapaxes(UB, -1, -2), UB)
+    det_U = np.linalg.det(U)
+    tr_m = np.trace(m, axis1=-2, axis2=-1)
+    tr_m2 = np.trace(np.matmul(m, m), axis1=-2, axis2=-1)
+    G1 = tr_m**2 / (16.0 * det_U)
+    G3 = (tr_m**2 - tr_m2) / (4.0 * det_U)
+    return _join(G1.real, G1.imag, G3.real, False)
+
+
+def c1c2c3(U):
+    """
+    Return the Weyl chamber coordinates (c1, c2, c3) of the unitary two-qubit
+    gate `U`, or of an array of gates of shape (..., 4, 4). For a non-unitary
+    gate, pass `closest_unitary(U)`.
+
+    The coordinates are calculated directly from the eigenvalues of
+    m = U_B^T U_B (U_B being the gate in the Bell basis, normalized to a
+    determinant of one), as in `QDYN.weyl.c1c2c3`, not via the local
+    invariants, which would lose about half of the significant digits near
+    degenerate gates such as the identity.
+    """
+    U = np.asarray(U, dtype=np.complex128)
+    shape = U.shape[:-2]
+    U = U.reshape((-1, 4, 4))
+    UB = np.matmul(np.matmul(Q_MAGIC.conj().T, U), Q_MAGIC) # Bell basis
+    m = np.matmul(np.swapaxes(UB, -1, -2), UB)
+    ev = np.linalg.eigvals(m) / np.sqrt(np.linalg.det(U))[:, np.newaxis]
+    c1, c2, c3 = _c1c2c3_from_two_S(np.angle(ev) / np.pi)
+    return _join(c1.reshape(shape), c2.reshape(shape), c3.reshape(shape),
+                 False)
+
+
+def closest_unitary(U):
+    """
+    Return the unitary closest to the gate `U` (or to each gate in an array of
+    shape (..., N, N)), from the singular value decomposition U = V S W^+
+    """
+    V, __, Wh = np.linalg.svd(np.asarray(U, dtype=np.complex128))
+    return np.matmul(V, Wh)
+
+
+def concurrence(c1, c2=None, c3=None):
+    """
+    Return the maximum concurrence that the gates with the given Weyl chamber
+    coordinates can generate from a separable state (1 for perfect
+    entanglers)
+    """
+    c1, c2, c3, __ = _split(c1, c2, c3)
+    in_PE = point_in_PE(c1, c2, c3)
+    c1, c2, c3 = np.pi * c1, np.pi * c2, np.pi * c3
+    C = np.max(np.abs(np.sin([c1 + c2, c1 - c2, c1 + c3, c1 - c3,
+                              c2 + c3, c2 - c3])), axis=0)
+    return np.where(in_PE, 1.0, C)[()]
+
+
+def F_PE(g1, g2=None, g3=None):
+    """
+    Return the value of the perfect entanglers functional for the given local
+    invariants
+    """
+    g1, g2, g3, __ = _split(g1, g2, g3)
+    return g3 * np.sqrt(g1**2 + g2**2) - g1
+
+
+def F_PE_from_c1c2c3(c1, c2=None, c3=None):
+    """
+    Return the value of the perfect entanglers functional for the given Weyl
+    chamber coordinates
+    """
+    c1, c2, c3, __ = _split(c1, c2, c3)
+    return F_PE(*g1g2g3_from_c1c2c3(c1, c2, c3))
+
+
+def point_in_weyl_chamber(c1, c2=None, c3=None):
+    """
+    Return True for all points (c1, c2, c3) that are inside the Weyl chamber
+    """
+    c1, c2, c3, __ = _split(c1, c2, c3)
+    return (   ((c1 <  0.5) & (c2 <= c1)       & (c3 <= c2))
+             | ((c1 >= 0.5) & (c2 <= 1.0 - c1) & (c3 <= c2)) )
+
+
+def point_in_PE(c1, c2=None, c3=None):
+    """
+    Return True for all points (c1, c2, c3) that are inside the perfect
+    entanglers polyhedron (False for points outside the Weyl chamber)
+    """
+    c1, c2, c3, __ = _split(c1, c2, c3)
+    return (point_in_weyl_chamber(c1, c2, c3)
+            & ((c1 + c2) >= 0.5) & ((c1 - c2) <= 0.5) & ((c2 + c3) <= 0.5))
+
+
+# Well-known two-qubit gates and their exact Weyl chamber coordinates, for
+# `check_known_gates`
+KNOWN_GATES = {
+    'identity': (np.identity(4, dtype=np.complex128), (0.0, 0.0, 0.0)),
+    'CNOT': (np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1],
+                       [0, 0, 1, 0]], dtype=np.complex128), (0.5, 0.0, 0.0)),
+    'SWAP': (np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0],
+                       [0, 0, 0, 1]], dtype=np.complex128), (0.5, 0.5, 0.5)),
+    'sqrt_SWAP': (np.array([[1, 0, 0, 0], [0, 0.5+0.5j, 0.5-0.5j, 0],
+                            [0, 0.5-0.5j, 0.5+0.5j, 0], [0, 0, 0, 1]],
+                           dtype=np.complex128), (0.75, 0.25, 0.25)),
+    # B = exp(i (pi/4 XX + pi/8 YY))
+    'B': (np.dot(np.cos(np.pi/4) * np.identity(4)
+                 + 1j * np.sin(np.pi/4) * np.kron(_SIGMA_X, _SIGMA_X),
+                 np.cos(np.pi/8) * np.identity(4)
+                 + 1j * np.sin(np.pi/8) * np.kron(_SIGMA_Y, _SIGMA_Y)),
+          (0.5, 0.25, 0.0)),
+}
+
+
+def check_known_gates(atol=1.0e-12):
+    """
+    Raise an AssertionError if `c1c2c3` does not reproduce the exact Weyl
+    chamber coordinates of the gates in `KNOWN_GATES` (for a single gate and
+    for all gates at once) to within `atol`, or if the coordinates are
+    inconsistent with the local invariants `g1g2g3`
+    """
+    names = sorted(KNOWN_GATES.keys())
+    gates = np.array([KNOWN_GATES[name][0] for name in names])
+    batch = np.array(c1c2c3(gates)).T
+    for i, name in enumerate(names):
+        U, expected = KNOWN_GATES[name]
+        c = np.array(c1c2c3(U))
+        for result in (c, batch[i]):
+            assert np.max(np.abs(result - expected)) < atol, \
+                "c1c2c3(%s) = %s, expected %s" % (name, result, expected)
+        assert np.max(np.abs(np.array(g1g2g3_from_c1c2c3(*c))
+                             - np.array(g1g2g3(U)))) < atol, \
+            "Weyl chamber coordinates of %s do not match g1g2g3" % name
+    assert concurrence(*c1c2c3(KNOWN_GATES['identity'][0])) < atol
+
+
+if __name__ == "__main__":
+    check_known_gates()
+    print("OK")
@@ -0,0 +1,268 @@
+"""
+Scaffold for 3D plots of the Weyl chamber
+
+The faces of the Weyl chamber and of the perfect entanglers polyhedron, the
+edges, the labels of the special points (A1, A2, A3, O, L, M, N, P, Q, ...)
+and the styling of the 3D axes are the same in all Weyl chamber figures. A
+`WeylChamber` instance computes the geometry for a given style once, and can
+then be drawn onto any number of 3D axes:
+
+>>> scaffold = WeylChamber(PE_alpha=0.1)
+>>> for ax in axes:
+...     scaffold.draw(ax)
+...     ax.scatter(c1, c2, c3)
+
+If the data must appear in front of some lines and behind others, the
+scaffold can be drawn in two parts, with `draw_background` and
+`draw_foreground`.
+
+Large clouds of points (e.g. the Weyl chamber coordinates of randomly sampled
+gates) are best shown with `plot_cloud(..., density=True)`, which bins the
+points into a grid of voxels and draws one marker per occupied voxel, so that
+the time to render the figure and the size of the resulting PDF do not depend
+on the number of points.
+"""
+import numpy as np
+
+# Special points in the Weyl chamber, in units of pi. The keys are the TeX
+# labels of the points
+WEYL_POINTS = {
+    'A_1': (1.0, 0.0, 0.0),
+    'A_2': (0.5, 0.5, 0.0),
+    'A_3': (0.5, 0.5, 0.5),
+    'O':   (0.0, 0.0, 0.0),
+    'L':   (0.5, 0.0, 0.0),
+    'M':   (0.75, 0.25, 0.0),
+    'N':   (0.75, 0.25, 0.25),
+    'P':   (0.25, 0.25, 0.25),
+    'Q':   (0.25, 0.25, 0.0),
+    'B':   (0.5, 0.25, 0.0),
+}
+
+# Faces as tuples (hidden, vertices). Hidden faces (at the back, for the
+# default view) have dashed edges
+WEYL_FACES = [
+    (True,  ('A_2', 'O', 'A_3')),
+    (False, ('A_1', 'A_2', 'A_3')),
+    (False, ('A_1', 'O', 'A_3')),
+]
+PE_FACES = [
+    (True,  ('A_2', 'P', 'Q')),
+    (True,  ('L', 'P', 'Q')),
+    (True,  ('L', 'M', 'N')),
+    (False, ('M', 'A_2', 'N')),
+    (False, ('N', 'L', 'P')),
+]
+
+# Offsets of the point labels from the points, for the default view
+LABEL_OFFSETS = {
+    'A_1': (-0.1, 0.0, 0.0),
+    'A_2': (0, 0, 0),
+    'A_3': (0, 0, 0),
+    'O':   (0, -0.03, 0.01),
+    'L':   (-0.05, 0, 0.01),
+    'M':   (0.05, -0.01, 0),
+    'N':   (-0.055, 0, 0.008),
+    'P':   (-0.05, 0, 0.008),
+    'B':   (-0.05, 0, 0.008),
+    'Q':   (0, 0.01, 0.01),
+}
+
+
+class WeylChamber(object):
+    """
+    Weyl chamber (and perfect entanglers polyhedron) scaffold for 3D axes
+
+    Arguments:
+        weyl_faces (list): Faces of the Weyl chamber, cf. `WEYL_FACES`
+        PE_faces (list): Faces of the PE polyhedron, cf. `PE_FACES`
+        weyl_alpha (float): Opacity of the Weyl chamber faces
+        PE_alpha (float): Opacity of the PE polyhedron faces
+        lines (list): Additional edges, as tuples (point1, point2, linestyle,
+            background). Background lines are drawn by `draw_background`
+        labels (dict): Label => offset of the label from the point, for all
+            points that should be labeled (default: `LABEL_OFFSETS`)
+        label_colors (dict): Label => color, for labels that don't have the
+            `linecolor`
+        show_points (bool): Whether to mark all labeled points with a dot
+        pointsize (float): Size of the dots
+        linecolor (str): Color of all edges and labels
+        linewidth (float): Width of all edges
+        azim (float): Azimuth angle of the view, in degrees (zero looks onto
+            the c2-c3 plane)
+        elev (float): Elevation angle of the view, in degrees (90 looks onto
+            the c1-c2 plane)
+        compact (bool): If True, move the c3 axis to the left, and use small,
+            tightly placed tick labels (for multi-panel figures). Otherwise,
+            ticks point outward with a large padding
+    """
+
+    def __init__(self, weyl_faces=None, PE_faces=None, weyl_alpha=0.0,
+        PE_alpha=0.1, lines=(), labels=None, label_colors=None,
+        show_points=False, pointsize=5, linecolor='black', linewidth=0.5,
+        azim=-50.0, elev=20.0, compact=False):
+        if weyl_faces is None:
+            weyl_faces = WEYL_FACES
+        if PE_faces is None:
+            PE_faces = PE_FACES
+        if labels is None:
+            labels = LABEL_OFFSETS
+        if label_colors is None:
+            label_colors = {}
+        self.linecolor = linecolor
+        self.linewidth = linewidth
+        self.pointsize = pointsize
+        self.azim = azim
+        self.elev = elev
+        self.compact = compact
+        # tuples (hidden, facecolor, array of vertices)
+        self._faces = []
+        for (faces, color) in [(weyl_faces, (1, 1, 1, weyl_alpha)),
+                               (PE_faces, (0.5, 0.5, 0.5, PE_alpha))]:
+            for hidden, vertices in faces:
+                self._faces.append(
+                    (hidden, color,
+                     np.array([WEYL_POINTS[v] for v in vertices])))
+        # tuples (background, xs, ys, zs, linestyle)
+        self._lines = []
+        for (p1, p2, linestyle, background) in lines:
+            xs, ys, zs = np.array([WEYL_POINTS[p1], WEYL_POINTS[p2]]).T
+            self._lines.append((background, xs, ys, zs, linestyle))
+        # tuples (x, y, z, text, color); sorted for reproducible output
+        self._labels = []
+        for label in sorted(labels.keys()):
+            x, y, z = np.array(WEYL_POINTS[label]) + np.array(labels[label])
+            self._labels.append((x, y, z, "$%s$" % label,
+                                 label_colors.get(label, linecolor)))
+        self._points = None
+        if show_points:
+            self._points = np.array([WEYL_POINTS[label] for label
+                                     in sorted(labels.keys())]).T
+
+    def style_axes(self, ax, show_c3_label=True):
+        """Set the view, limits, labels, and pane styling of the 3D axes"""
+        ax.view_init(elev=self.elev, azim=self.azim)
+        ax.patch.set_facecolor('None')
+        ax.w_xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        ax.w_yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        ax.w_zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+        ax.grid(False)
+        ax.set_xlabel(r'$c_1/\pi$')
+        ax.set_ylabel(r'$c_2/\pi$')
+        if show_c3_label:
+            ax.set_zlabel(r'$c_3/\pi$')
+        ax.set_xlim(0,1)
+        ax.set_ylim(0,0.5)
+        ax.set_zlim(0,0.5)
+        if self.compact:
+            # move z-axis to the left
+            tmp_planes = ax.zaxis._PLANES
+            ax.zaxis._PLANES = (tmp_planes[2], tmp_planes[3],
+                                tmp_planes[0], tmp_planes[1],
+                                tmp_planes[4], tmp_planes[5])
+            ax.zaxis.set_rotate_label(False)
+            ax.zaxis.label.set_rotation(90)
+            ax.tick_params(axis='both', which='major', labelsize=7)
+            ax.xaxis._axinfo['ticklabel']['space_factor'] = 0.5
+            ax.yaxis._axinfo['ticklabel']['space_factor'] = 0.5
+            ax.xaxis._axinfo['label']['space_factor'] = 1.8
+            ax.yaxis._axinfo['label']['space_factor'] = 1.8
+            for t in ax.get_yticklabels():
+                t.set_va('center')
+                t.set_ha('left')
+            for t in ax.get_xticklabels():
+                t.set_va('center')
+                t.set_ha('right')
+            for t in ax.get_zticklabels():
+                t.set_va('center')
+                t.set_ha('center')
+        else:
+            ax.tick_params(direction='out', pad=20)
+
+    def _draw_lines(self, ax, background):
+        """Draw the background or foreground lines"""
+        for (is_background, xs, ys, zs, linestyle) in self._lines:
+            if is_background == background:
+                kwargs = {}
+                if background:
+                    kwargs['zorder'] = -1
+                ax.plot(xs, ys, zs, color=self.linecolor,
+                        linestyle=linestyle, lw=self.linewidth, **kwargs)
+
+    def draw_background(self, ax, show_c3_label=True):
+        """Style the axes, and draw the background lines"""
+        self.style_axes(ax, show_c3_label)
+        self._draw_lines(ax, background=True)
+
+    def draw_foreground(self, ax):
+        """Draw the faces, the foreground lines, and the labels"""
+        from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+        for hidden, facecolor, vertices in self._faces:
+            pol = Poly3DCollection([vertices])
+            pol.set_facecolor(facecolor)
+            pol.set_edgecolor(self.linecolor)
+            pol.set_linewidth(self.linewidth)
+            if hidden:
+                pol.set_linestyle('--')
+            ax.add_collection3d(pol)
+        self._draw_lines(ax, background=False)
+        if self._points is not None:
+            ax.scatter(*self._points, edgecolors='None', s=self.pointsize,
+                       color='black')
+        for (x, y, z, text, color) in self._labels:
+            ax.text(x, y, z, text, color=color, fontsize='small')
+
+    def draw(self, ax, show_c3_label=True):
+        """Draw the complete scaffold onto the 3D axes `ax`"""
+        self.draw_background(ax, show_c3_label)
+        self.draw_foreground(ax)
+
+
+def cloud_density(c1, c2, c3, n_bins=50):
+    """
+    Bin the points (c1, c2, c3) into a regular grid of voxels spanning the
+    bounding box of the Weyl chamber, with `n_bins` voxels along c1 and
+    `n_bins/2` voxels along c2 and c3 (i.e. cubic voxels). Return four arrays
+    c1, c2, c3, p with the centers of all occupied voxels and the fraction of
+    points inside each voxel.
+    """
+    bins = (n_bins, n_bins // 2, n_bins // 2)
+    counts, edges = np.histogramdd(np.column_stack((c1, c2, c3)), bins=bins,
+                                   range=[(0, 1), (0, 0.5), (0, 0.5)])
+    occupied = np.nonzero(counts)
+    centers = [(0.5 * (e[1:] + e[:-1]))[i] for (e, i)
+               in zip(edges, occupied)]
+    p = counts[occupied] / max(1.0, counts.sum())
+    return centers[0], centers[1], centers[2], p
+
+
+def plot_cloud(ax, c1, c2, c3, color, density=False, pointsize=1.5,
+    n_bins=50, voxelsize=6.0, rasterized=False):
+    """
+    Plot the points (c1, c2, c3) onto the 3D axes `ax`, and return the
+    resulting collection.
+
+    If `density` is False, every point is drawn as a marker of size
+    `pointsize`. Otherwise, the points are binned into voxels (see
+    `cloud_density`), and every occupied voxel is drawn as a square marker of
+    size `voxelsize`, whose opacity increases logarithmically with the number
+    of points inside the voxel. If `rasterized` is True, the markers are
+    written as a bitmap when saving to a vector format.
+    """
+    from matplotlib.colors import colorConverter
+    if not density:
+        return ax.scatter(c1, c2, c3, c=color, edgecolors='None',
+                          s=pointsize, rasterized=rasterized)
+    c1, c2, c3, p = cloud_density(c1, c2, c3, n_bins)
+    if len(p) == 0:
+        return ax.scatter([], [], [], c=color, edgecolors='None')
+    rgba = np.tile(colorConverter.to_rgba(color), (len(p), 1))
+    log_range = np.log(p.max() / p.min())
+    if log_range > 0:
+        rgba[:,3] = 0.15 + 0.85 * np.log(p / p.min()) / log_range
+    s = ax.scatter(c1, c2, c3, c=rgba, edgecolors='None', marker='s',
+                   s=voxelsize, rasterized=rasterized)
+    # remove the "transparency fog" that matplotlib adds as to indicate depth,
+    # which would override the opacities
+    s.set_edgecolors = s.set_facecolors = lambda *args:None
+    return s
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Scan the entanglement of a two-transmon gate over the pulse amplitude
+
+For each pulse amplitude E, the concurrence and the population loss of the
+gate are written to OUTFILE, in the format of the `entanglement_*.dat` files
+in `chapters/transmon/holonomic_entanglement`. The number of qubit and cavity
+levels is chosen automatically for each E: the basis is grown until the
+population in the top levels stays below the tolerance given with --tol (see
+disstools.truncation). The Hamiltonian is given by the function
+model(E, nq, nc) -> (H, tgrid) given with --model, as MODULE:FUNCTION (the
+current working directory is searched for MODULE).
+
+If OUTFILE already exists, the scan is resumed after the last value of E in
+the file, with the number of levels of the last row.
+"""
+import sys
+from optparse import OptionParser
+
+import numpy as np
+
+from disstools.truncation import scan
+from robustness_sweep import load_function
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog [options] --model MODULE:FUNCTION OUTFILE",
+    description = __doc__)
+    arg_parser.add_option(
+        '--model', action='store', dest='model', default=None,
+        help="Function model(E, nq, nc) that returns the tuple (H, tgrid), "
+        "as MODULE:FUNCTION")
+    arg_parser.add_option(
+        '--E-min', action='store', dest='E_min', type=float, default=0.0,
+        help="Smallest pulse amplitude [default: %default]")
+    arg_parser.add_option(
+        '--E-max', action='store', dest='E_max', type=float, default=500.0,
+        help="Largest pulse amplitude [default: %default]")
+    arg_parser.add_option(
+        '--E-step', action='store', dest='E_step', type=float, default=25.0,
+        help="Step of the pulse amplitude [default: %default]")
+    arg_parser.add_option(
+        '--tol', action='store', dest='tol', type=float, default=1.0e-4,
+        help="Maximum population in the top qubit and cavity levels "
+        "[default: %default]")
+    arg_parser.add_option(
+        '--nq-min', action='store', dest='nq_min', type=int, default=3,
+        help="Number of qubit levels for the first E [default: %default]")
+    arg_parser.add_option(
+        '--nc-min', action='store', dest='nc_min', type=int, default=5,
+        help="Number of cavity levels for the first E [default: %default]")
+    arg_parser.add_option(
+        '--nq-step', action='store', dest='nq_step', type=int, default=1,
+        help="Number of qubit levels added when the top qubit level is "
+        "populated [default: %default]")
+    arg_parser.add_option(
+        '--nc-step', action='store', dest='nc_step', type=int, default=5,
+        help="Number of cavity levels added when the top cavity level is "
+        "populated [default: %default]")
+    arg_parser.add_option(
+        '--nq-max', action='store', dest='nq_max', type=int, default=None,
+        help="Maximum number of qubit levels [default: unlimited]")
+    arg_parser.add_option(
+        '--nc-max', action='store', dest='nc_max', type=int, default=None,
+        help="Maximum number of cavity levels [default: unlimited]")
+    options, args = arg_parser.parse_args(argv)
+    if options.model is None:
+        arg_parser.error("The --model option is required")
+    if len(args) != 2:
+        arg_parser.error("OUTFILE is required")
+    if options.E_step <= 0.0 or options.E_max < options.E_min:
+        arg_parser.error("Invalid range of E")
+    try:
+        model = load_function(options.model)
+    except ValueError as exc_info:
+        arg_parser.error(str(exc_info))
+    E_vals = np.arange(options.E_min, options.E_max + 0.5 * options.E_step,
+                       options.E_step)
+    not_converged = scan(args[1], model, E_vals, nq_min=options.nq_min,
+                         nc_min=options.nc_min, tol=options.tol,
+                         nq_step=options.nq_step, nc_step=options.nc_step,
+                         nq_max=options.nq_max, nc_max=options.nc_max)
+    for E in not_converged:
+        print("WARNING: truncation not converged for E = %g" % E)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Run a command to generate a figure, unless the content of its dependencies has
+not changed since the figure was last generated
+
+    figcache.py --target=TARGET [DEPENDENCY ...] -- COMMAND [ARG ...]
+
+The dependencies are hashed (folders recursively). If the hash matches the one
+recorded when TARGET was last generated successfully, and TARGET exists, the
+command is skipped and TARGET is only touched, so that make considers it up to
+date. The hashes are recorded in the file `.figcache` in the current working
+directory. To avoid re-hashing unchanged files, the hash of each file is stored
+together with its modification time and size.
+"""
+import os
+import sys
+import json
+import hashlib
+import subprocess
+from optparse import OptionParser
+
+CACHE_FILE = '.figcache'
+
+# Folders that never contain input data (and whose content changes without
+# affecting the figure)
+SKIP_FOLDERS = ['.npycache', ]
+
+
+def iter_files(paths):
+    """Iterate over all files in the given list of files and folders"""
+    for path in sorted(set(paths)):
+        if os.path.isdir(path):
+            for folder, subfolders, files in os.walk(path):
+                subfolders[:] = sorted([f for f in subfolders
+                                        if f not in SKIP_FOLDERS])
+                for filename in sorted(files):
+                    yield os.path.join(folder, filename)
+        elif os.path.isfile(path):
+            yield path
+
+
+def file_hash(filename, memo):
+    """Return the sha1 hex digest of the content of the given file. The `memo`
+    dict maps file names to [mtime, size, digest], and is updated"""
+    st = os.stat(filename)
+    key = os.path.abspath(filename)
+    if key in memo and memo[key][:2] == [st.st_mtime, st.st_size]:
+        return memo[key][2]
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as in_fh:
+        for block in iter(lambda: in_fh.read(1 << 20), b''):
+            sha1.update(block)
+    memo[key] = [st.st_mtime, st.st_size, sha1.hexdigest()]
+    return memo[key][2]
+
+
+def fingerprint(paths, memo):
+    """Return a hash of the names and content of all files in the given list
+    of files and folders"""
+    sha1 = hashlib.sha1()
+    for filename in iter_files(paths):
+        sha1.update(os.path.normpath(filename).encode('utf-8'))
+        sha1.update(file_hash(filename, memo).encode('ascii'))
+    return sha1.hexdigest()
+
+
+def read_cache(cache_file):
+    """Return the cache dict stored in the given file"""
+    try:
+        with open(cache_file) as in_fh:
+            cache = json.load(in_fh)
+    except (IOError, ValueError):
+        cache = {}
+    cache.setdefault('targets', {})
+    cache.setdefault('files', {})
+    return cache
+
+
+def write_cache(cache_file, cache):
+    """Write the cache dict to the given file. The file is re-read first, so
+    that concurrent builds in the same folder do not overwrite each other's
+    entries (except for a small window of time)"""
+    current = read_cache(cache_file)
+    current['targets'].update(cache['targets'])
+    current['files'].update(cache['files'])
+    tmp_file = "%s.%d.tmp" % (cache_file, os.getpid())
+    with open(tmp_file, 'w') as out_fh:
+        json.dump(current, out_fh, indent=1, sort_keys=True)
+    os.rename(tmp_file, cache_file)
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(usage="%prog --target=TARGET [DEPENDENCY ...] "
+                                    "-- COMMAND [ARG ...]")
+    if '--' not in argv:
+        arg_parser.error("Must give a command after '--'")
+    i_sep = argv.index('--')
+    command = argv[i_sep+1:]
+    arg_parser.add_option(
+        '--target', action='store', dest='target', help="Generated file")
+    arg_parser.add_option(
+        '--cache', action='store', dest='cache', default=CACHE_FILE,
+        help="File in which to record hashes [default: %default]")
+    options, deps = arg_parser.parse_args(argv[1:i_sep])
+    if options.target is None or len(command) == 0:
+        arg_parser.error("Must give --target and a command")
+    cache = read_cache(options.cache)
+    target_hash = fingerprint(deps, cache['files'])
+    if (os.path.isfile(options.target)
+    and cache['targets'].get(options.target) == target_hash):
+        print("%s: dependencies unchanged, skipping" % options.target)
+        os.utime(options.target, None)
+        write_cache(options.cache, cache)
+        return 0
+    exit_code = subprocess.call(command)
+    if exit_code == 0:
+        cache['targets'][options.target] = target_hash
+    else:
+        cache['targets'][options.target] = None
+    write_cache(options.cache, cache)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+"""
+Render server for the matplotlib figure scripts in the chapter subfolders
+
+Starting a figure script takes several seconds before any drawing happens:
+numpy, matplotlib, mgplottools, and QDYN have to be imported, and the first
+usetex text requires LaTeX to set up its fonts. The render server does all of
+this once, and then waits for jobs on a local (Unix domain) socket. Each job
+is run in a forked copy of the server process, so that it starts with all
+modules already imported and the TeX font information already loaded, and
+cannot leave any state behind. Up to `--max-jobs` jobs (by default, one per
+CPU) run concurrently, so that `make -j` with FIGSERVER=1 renders figures in
+parallel.
+
+Start the server with
+
+    figserver.py serve
+
+and render a figure with
+
+    figserver.py render chapters/robust/robust_oct_pop.py
+
+By default, the `main` routine of the script is called, which is equivalent to
+running the script from the command line. If a data folder is given (option
+`--data-folder`), the script must follow the convention of having a
+`read_data` and a `create_figure` routine, and
+`create_figure(outfile, *read_data(data_folder))` is called instead.
+
+If no server is running, `figserver.py render` runs the script in a new
+Python process.
+"""
+import os
+import sys
+import json
+import errno
+import select
+import socket
+import subprocess
+import multiprocessing
+from optparse import OptionParser
+
+DEFAULT_SOCKET = os.path.join(os.path.dirname(os.path.dirname(
+                              os.path.abspath(__file__))), '.figserver.sock')
+
+# Modules that are imported when the server starts. Modules that are not
+# installed are skipped
+PRELOAD = ['numpy', 'scipy', 'matplotlib.pyplot', 'mpl_toolkits.mplot3d',
+           'mgplottools.mpl', 'QDYN', 'QDYN.pulse', 'QDYN.weyl',
+           'QDYNTransmonLib.popdyn', 'disstools.cache', 'disstools.spectra',
+           'disstools.weyl', 'disstools.weylchamber']
+
+EXIT_MARKER = '__FIGSERVER_EXIT__'
+
+
+def load_script(script):
+    """Import the given figure script as a module (without running main)"""
+    name = '__figscript__'
+    if sys.version_info[0] >= 3:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(name, script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        import imp
+        module = imp.load_source(name, script)
+    return module
+
+
+def warm_up():
+    """Import all PRELOAD modules and render a usetex figure"""
+    import matplotlib
+    matplotlib.use('PDF') # must be before import of pyplot
+    import importlib
+    for module in PRELOAD:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            print("Cannot preload module %s" % module)
+    import matplotlib.pyplot as plt
+    from io import BytesIO
+    rc_file = os.path.join(os.path.dirname(DEFAULT_SOCKET), 'matplotlibrc')
+    with matplotlib.rc_context(fname=rc_file):
+        matplotlib.rc('text', usetex=True)
+        fig = plt.figure()
+        fig.text(0.5, 0.5, r'$\alpha$ (\%) 0.1')
+        try:
+            fig.savefig(BytesIO(), format='pdf')
+        except Exception as exc_info:
+            print("Cannot warm up usetex: %s" % exc_info)
+        plt.close(fig)
+
+
+def run_job(job):
+    """Run the given job (in the current process). Return the exit code"""
+    import matplotlib
+    import matplotlib.pyplot as plt
+    script = os.path.abspath(job['script'])
+    os.chdir(os.path.dirname(script))
+    sys.argv = [script, ] + job.get('argv', [])
+    # scripts that are run from the command line pick up the matplotlibrc
+    # file in the chapter folder (copied there by figures.mk)
+    matplotlib.rcdefaults()
+    if os.path.isfile('matplotlibrc'):
+        matplotlib.rc_file('matplotlibrc')
+    plt.close('all')
+    module = load_script(script)
+    if job.get('data_folder') is None:
+        return module.main(sys.argv) or 0
+    else:
+        outfile = job.get('outfile')
+        if outfile is None:
+            outfile = os.path.splitext(script)[0] + '.pdf'
+        module.create_figure(outfile, *module.read_data(job['data_folder']))
+        return 0
+
+
+def serve(socket_file, max_jobs=None):
+    """Run the render server on the given socket file, with at most
+    `max_jobs` jobs running at the same time (default: number of CPUs)"""
+    if max_jobs is None:
+        max_jobs = multiprocessing.cpu_count()
+    warm_up()
+    if os.path.exists(socket_file):
+        os.unlink(socket_file)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_file)
+    server.listen(max(5, max_jobs))
+    print("Render server listening on %s" % socket_file)
+    sys.stdout.flush()
+    jobs = {} # pid => (connection, script) for all running jobs
+    try:
+        while True:
+            # wait for a job to finish only if no new job can be started
+            reap_jobs(jobs, block=(len(jobs) >= max_jobs))
+            if len(jobs) >= max_jobs:
+                continue
+            try:
+                readable = select.select([server], [], [], 0.2)[0]
+            except select.error as exc_info:
+                if exc_info.args[0] == errno.EINTR:
+                    continue
+                raise
+            if readable:
+                conn, __ = server.accept()
+                try:
+                    start_job(conn, server, jobs)
+                except (IOError, OSError, ValueError) as exc_info:
+                    print("Invalid job: %s" % exc_info)
+                    conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for conn, __ in jobs.values():
+            conn.close()
+        server.close()
+        os.unlink(socket_file)
+
+
+def reap_jobs(jobs, block=False):
+    """Send the exit code of every finished job in `jobs` back over its
+    connection, close the connection, and remove the job. If `block` is True,
+    wait for at least one job to finish"""
+    options = 0 if block else os.WNOHANG
+    while len(jobs) > 0:
+        try:
+            pid, status = os.waitpid(-1, options)
+        except OSError as exc_info:
+            if exc_info.errno == errno.EINTR:
+                continue
+            raise
+        if pid == 0:
+            break # no further finished jobs
+        if pid not in jobs:
+            continue
+        conn, script = jobs.pop(pid)
+        exit_code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1
+        try:
+            conn.sendall(("\n%s %d\n" % (EXIT_MARKER, exit_code))
+                         .encode('ascii'))
+        except socket.error:
+            pass # client went away
+        conn.close()
+        print("Job: %s -> exit code %d" % (script, exit_code))
+        sys.stdout.flush()
+        options = os.WNOHANG
+
+
+def start_job(conn, server, jobs):
+    """Read a job from the connection and run it in a forked process, which
+    is added to `jobs`. All output of the job is sent back over the
+    connection; the exit code is sent by `reap_jobs`"""
+    in_fh = conn.makefile('rb')
+    job = json.loads(in_fh.readline().decode('utf-8'))
+    in_fh.close()
+    print("Job: %s" % job['script'])
+    sys.stdout.flush()
+    pid = os.fork()
+    if pid == 0: # child
+        # close the sockets of the server and of all other jobs, so that the
+        # clients of other jobs see the end of their connection as soon as
+        # their job finishes
+        server.close()
+        for other_conn, __ in jobs.values():
+            other_conn.close()
+        os.dup2(conn.fileno(), 1)
+        os.dup2(conn.fileno(), 2)
+        exit_code = 1
+        try:
+            exit_code = run_job(job)
+        except SystemExit as exc_info:
+            exit_code = exc_info.code
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code if isinstance(exit_code, int) else 1)
+    else:
+        jobs[pid] = (conn, job['script'])
+
+
+def render(socket_file, job):
+    """Send a job to the render server and print its output. Return the exit
+    code of the job. If no server is running, run the job in a new Python
+    process instead"""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_file)
+    except socket.error:
+        client.close()
+        return render_fallback(job)
+    client.sendall((json.dumps(job) + "\n").encode('utf-8'))
+    output = b''
+    while True:
+        chunk = client.recv(4096)
+        if not chunk:
+            break
+        output += chunk
+    client.close()
+    output = output.decode('utf-8', 'replace')
+    output, __, status = output.rpartition(EXIT_MARKER)
+    if output.endswith("\n"):
+        output = output[:-1]
+    sys.stdout.write(output)
+    sys.stdout.flush()
+    try:
+        return int(status.strip())
+    except ValueError:
+        return 1 # server went away in the middle of the job
+
+
+def render_fallback(job):
+    """Run the job in a new Python process"""
+    script = os.path.abspath(job['script'])
+    if job.get('data_folder') is None:
+        return subprocess.call([sys.executable, script] + job.get('argv', []),
+                               cwd=os.path.dirname(script))
+    else:
+        cmd = [sys.executable, os.path.abspath(__file__), 'run',
+               '--data-folder', job['data_folder']]
+        if job.get('outfile') is not None:
+            cmd += ['--outfile', job['outfile']]
+        return subprocess.call(cmd + [script])
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog serve [options]\n"
+            "       %prog render [options] SCRIPT [ARGS...]",
+    description = __doc__.strip().split("\n")[0])
+    arg_parser.add_option(
+        '--socket', action='store', dest='socket', default=DEFAULT_SOCKET,
+        help="Socket file used for communication between server and client "
+        "[default: %default]")
+    arg_parser.add_option(
+        '--max-jobs', action='store', dest='max_jobs', type=int, default=None,
+        help="Maximum number of jobs that the server runs at the same time "
+        "[default: number of CPUs]")
+    arg_parser.add_option(
+        '--data-folder', action='store', dest='data_folder', default=None,
+        help="Call create_figure(outfile, *read_data(DATA_FOLDER)) instead of "
+        "the script's main routine. Relative to the script's folder.")
+    arg_parser.add_option(
+        '--outfile', action='store', dest='outfile', default=None,
+        help="Name of the output file when using --data-folder "
+        "[default: name of script with extension .pdf]")
+    arg_parser.disable_interspersed_args()
+    # options may be given before and after the command, but not after the
+    # name of the script (so that the script's own options are passed on)
+    options, args = arg_parser.parse_args(argv[1:])
+    if len(args) < 1:
+        arg_parser.error("Must give a command (serve, render)")
+    command = args[0]
+    options, args = arg_parser.parse_args(args[1:], values=options)
+    if command == 'serve':
+        serve(options.socket, options.max_jobs)
+        return 0
+    elif command in ['render', 'run']:
+        if len(args) < 1:
+            arg_parser.error("Must give the name of a figure script")
+        job = {'script': os.path.abspath(args[0]), 'argv': args[1:],
+               'data_folder': options.data_folder,
+               'outfile': options.outfile}
+        if command == 'run': # run in this process (used by render_fallback)
+            return run_job(job)
+        return render(options.socket, job)
+    else:
+        arg_parser.error("Unknown command %s" % command)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
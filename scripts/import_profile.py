@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Report the import time of figure scripts, per imported module
+
+Each SCRIPT is loaded (without running its main routine) in a new Python
+process, from the script's folder, with all imports timed. For each script,
+the total load time is printed, followed by the modules imported while loading
+it, in the order of their import and indented by nesting depth, with the
+cumulative time (including nested imports) and the time spent in the module
+itself. Modules that were already imported, and modules that take less than
+--min-time are not shown. If several scripts are given, a summary of the
+cumulative time of the modules imported directly by the scripts, summed over
+all scripts, is printed at the end.
+
+Modules that show up with a large cumulative time but are not needed in all
+code paths of a script should be imported inside the routine that uses them.
+"""
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from timeit import default_timer
+from optparse import OptionParser
+
+# Records [depth, module name, cumulative time, self time], in the order of
+# the imports (child process only)
+_RECORDS = []
+
+
+def _profile_imports():
+    """Replace the built-in __import__ by a version that records the time of
+    all imports of modules that are not imported yet"""
+    try:
+        import builtins
+    except ImportError: # Python 2
+        import __builtin__ as builtins
+    original_import = builtins.__import__
+    children_time = [0.0] # time in nested imports, for each level
+
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in sys.modules:
+            return original_import(name, globals, locals, fromlist, level)
+        label = '.' * max(level, 0) + name
+        if name == '' and fromlist:
+            label += "{%s}" % ", ".join(fromlist) # from . import a, b
+        record = [len(children_time), label, 0.0, 0.0]
+        n_modules = len(sys.modules)
+        i_record = len(_RECORDS)
+        _RECORDS.append(record)
+        children_time.append(0.0)
+        t_start = default_timer()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = default_timer() - t_start
+            nested = children_time.pop()
+            children_time[-1] += elapsed
+            record[2] = elapsed
+            record[3] = elapsed - nested
+            if len(sys.modules) == n_modules:
+                # nothing was imported (e.g. a relative import of an existing
+                # module); drop the record, and any nested records
+                del _RECORDS[i_record:]
+
+    builtins.__import__ = timed_import
+
+
+def profile_child(script, result_file):
+    """Load the script with timed imports, and write the records and the total
+    load time to `result_file` as JSON (in the child process)"""
+    script = os.path.abspath(script)
+    os.chdir(os.path.dirname(script))
+    sys.path.insert(0, os.path.dirname(script))
+    sys.argv = [script, ]
+    from figserver import load_script
+    _profile_imports()
+    t_start = default_timer()
+    load_script(script)
+    total = default_timer() - t_start
+    with open(result_file, 'w') as out_fh:
+        json.dump({'total': total, 'records': _RECORDS}, out_fh)
+
+
+def profile_script(script):
+    """Return a tuple (total load time, records) for the given script, loaded
+    in a new Python process"""
+    fd, result_file = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        cmd = [sys.executable, os.path.abspath(__file__), '--child',
+               result_file, script]
+        with open(os.devnull, 'w') as devnull:
+            returncode = subprocess.call(cmd, stdout=devnull)
+        if returncode != 0:
+            raise RuntimeError("Cannot load %s" % script)
+        with open(result_file) as in_fh:
+            result = json.load(in_fh)
+    finally:
+        os.unlink(result_file)
+    return result['total'], result['records']
+
+
+def print_report(script, total, records, max_depth, min_time):
+    """Print the import times for a single script"""
+    import_time = sum([cumulative for (depth, __, cumulative, __)
+                       in records if depth == 1])
+    print("%s: %.3f s (imports: %.3f s)" % (script, total, import_time))
+    print("    %9s %9s  %s" % ('cumul [s]', 'self [s]', 'module'))
+    for depth, name, cumulative, self_time in records:
+        if depth <= max_depth and cumulative >= min_time:
+            print("    %9.3f %9.3f  %s%s" % (cumulative, self_time,
+                                            '  ' * (depth - 1), name))
+    print("")
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog [options] SCRIPT [SCRIPT ...]",
+    description = __doc__)
+    arg_parser.add_option(
+        '--depth', action='store', dest='depth', type=int, default=2,
+        help="Maximum nesting depth of the imports that are shown (1: only "
+        "imports in the script itself) [default: %default]")
+    arg_parser.add_option(
+        '--min-time', action='store', dest='min_time', type=float,
+        default=0.005, help="Minimum cumulative import time of the modules "
+        "that are shown, in seconds [default: %default]")
+    arg_parser.add_option(
+        '--child', action='store', dest='child', default=None,
+        help="(internal) Load the script in this process, and write the "
+        "result to the given file")
+    options, args = arg_parser.parse_args(argv)
+    if len(args) < 2:
+        arg_parser.error("Must give at least one figure script")
+    if options.child is not None:
+        profile_child(args[1], options.child)
+        return 0
+    summary = {} # module => [summed cumulative time, number of scripts]
+    for script in args[1:]:
+        try:
+            total, records = profile_script(script)
+        except RuntimeError as exc_info:
+            print("%s\n" % exc_info)
+            continue
+        print_report(script, total, records, options.depth, options.min_time)
+        for depth, name, cumulative, __ in records:
+            if depth == 1:
+                entry = summary.setdefault(name, [0.0, 0])
+                entry[0] += cumulative
+                entry[1] += 1
+    if len(args) > 2:
+        print("Summary (modules imported directly by the scripts):")
+        print("    %9s %9s  %s" % ('cumul [s]', 'scripts', 'module'))
+        for name, (cumulative, count) in sorted(
+                summary.items(), key=lambda item: -item[1][0]):
+            if cumulative >= options.min_time:
+                print("    %9.3f %9d  %s" % (cumulative, count, name))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Pack the population dynamics in QDYN runfolders into columnar archives
+
+For each RUNFOLDER, all data files (`psi00_q1.dat`, `rho11_popdyn.dat`, ...)
+are collected into the file `popdyn.npz` inside the runfolder, which is read
+by `disstools.runfolder.Runfolder` instead of the data files. The data files
+are kept, unless --remove is given. As some figure scripts read the data files
+directly (e.g. with `QDYNTransmonLib.popdyn.PopPlot`), --remove refuses to
+remove the data files of any runfolder that is referenced by a script in any
+folder above it, e.g. `chapters/transmon/HOL00302` (used as 'HOL00302' in
+`chapters/transmon/hol_oct_120left_popdyn.py`) or
+`chapters/transmon/holonomic_entanglement/params2d40_T200` (used as
+'holonomic_entanglement/params2d40_T200' in
+`chapters/transmon/adiabatic_popdyn.py`).
+"""
+import os
+import re
+import sys
+from glob import glob
+from optparse import OptionParser
+
+import numpy as np
+
+from disstools.runfolder import pack_runfolder, data_files, Runfolder
+
+
+def referencing_scripts(runfolder):
+    """
+    Return a list of the scripts in any folder above the given runfolder that
+    contain a string ending in the name of the runfolder (e.g. 'HOL00302',
+    './t3r20101', or 'holonomic_entanglement/params2d40_T200'). This errs on
+    the side of finding too many scripts, which is safe for --remove.
+    """
+    runfolder = os.path.abspath(runfolder)
+    name = os.path.basename(runfolder)
+    rx_name = re.compile(r"""[/'"]%s/?['"]""" % re.escape(name))
+    scripts = []
+    folder = os.path.dirname(runfolder)
+    while True:
+        for script in sorted(glob(os.path.join(folder, '*.py'))):
+            with open(script) as in_fh:
+                if rx_name.search(in_fh.read()):
+                    scripts.append(script)
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            break
+        folder = parent
+    return scripts
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog [options] RUNFOLDER...",
+    description = __doc__.strip().split("\n")[0])
+    arg_parser.add_option(
+        '--remove', action='store_true', dest='remove', default=False,
+        help="Remove the data files after packing them (after checking that "
+        "the archive reproduces them). Refused for runfolders that are "
+        "referenced by a script in any folder above them, as figure scripts "
+        "that use PopPlot read the data files, not the archive")
+    options, args = arg_parser.parse_args(argv)
+    runfolders = args[1:]
+    if len(runfolders) == 0:
+        arg_parser.error("Must give at least one RUNFOLDER")
+    if options.remove:
+        for runfolder in runfolders:
+            scripts = referencing_scripts(runfolder)
+            if len(scripts) > 0:
+                arg_parser.error("Cannot remove the data files in %s, as "
+                                 "they are used by %s" % (runfolder,
+                                 ", ".join(scripts)))
+    for runfolder in runfolders:
+        names = data_files(runfolder)
+        try:
+            archive = pack_runfolder(runfolder)
+        except ValueError as exc_info:
+            arg_parser.error(str(exc_info))
+        rf = Runfolder(runfolder)
+        print("%s: %d data files, %d time points -> %s (%d bytes)" % (
+              runfolder, len(names), len(rf.tgrid), archive,
+              os.path.getsize(archive)))
+        if options.remove:
+            for name in names:
+                filename = os.path.join(runfolder, name + '.dat')
+                table = np.atleast_2d(np.genfromtxt(filename))
+                if not (np.all(table[:, 0] == rf.tgrid)
+                        and np.all(table[:, 1:] == rf[name])):
+                    arg_parser.error("%s does not match the archive; not "
+                                     "removed" % filename)
+                os.unlink(filename)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
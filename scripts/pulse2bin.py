@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Convert ASCII pulse files to binary pulse files (see disstools.pulsefile)
+
+Each PULSEFILE is written to a file with the same name and the extension
+`.bin` (e.g. `pulse1.dat` -> `pulse1.bin`), next to the original file. The
+binary file can be used anywhere an ASCII pulse file is accepted by
+`disstools.pulsefile.load_pulse` or `disstools.spectra`.
+"""
+import os
+import sys
+from optparse import OptionParser
+
+import numpy as np
+
+from disstools.pulsefile import read_ascii_pulse, write_binary_pulse, \
+                                read_binary_pulse
+
+
+def convert(pulse_file, bin_file, time_unit=None, ampl_unit=None):
+    """Convert the ASCII `pulse_file` to the binary `bin_file`, and return the
+    maximum deviation of the amplitude in the binary file from the original
+    amplitude"""
+    tgrid, amplitude, file_time_unit, file_ampl_unit \
+    = read_ascii_pulse(pulse_file)
+    time_unit = time_unit or file_time_unit
+    if time_unit is None:
+        raise ValueError("Cannot determine time unit of pulse file %s; use "
+                         "--time-unit" % pulse_file)
+    write_binary_pulse(bin_file, tgrid, amplitude, time_unit,
+                       ampl_unit or file_ampl_unit)
+    pulse = read_binary_pulse(bin_file)
+    return np.max(np.abs(pulse.amplitude - amplitude))
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog [options] PULSEFILE...",
+    description = __doc__.strip().split("\n")[0])
+    arg_parser.add_option(
+        '--time-unit', action='store', dest='time_unit', default=None,
+        help="Time unit of the pulses. Default: read from header")
+    arg_parser.add_option(
+        '--ampl-unit', action='store', dest='ampl_unit', default=None,
+        help="Amplitude unit of the pulses. Default: read from header")
+    arg_parser.add_option(
+        '-o', action='store', dest='outfile', default=None,
+        help="Name of the output file (only for a single PULSEFILE)")
+    options, args = arg_parser.parse_args(argv)
+    pulse_files = args[1:]
+    if len(pulse_files) == 0:
+        arg_parser.error("Must give at least one PULSEFILE")
+    if options.outfile is not None and len(pulse_files) > 1:
+        arg_parser.error("-o requires a single PULSEFILE")
+    for pulse_file in pulse_files:
+        bin_file = options.outfile
+        if bin_file is None:
+            bin_file = os.path.splitext(pulse_file)[0] + '.bin'
+        if os.path.abspath(bin_file) == os.path.abspath(pulse_file):
+            arg_parser.error("%s would overwrite itself" % pulse_file)
+        try:
+            error = convert(pulse_file, bin_file, options.time_unit,
+                            options.ampl_unit)
+        except ValueError as exc_info:
+            arg_parser.error("%s: %s" % (pulse_file, exc_info))
+        print("%s -> %s (%d bytes, max deviation %.2e)" % (pulse_file,
+              bin_file, os.path.getsize(bin_file), error))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
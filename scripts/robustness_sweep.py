@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Calculate the robustness of a set of pulses with respect to noise
+
+Each PULSE_SET is given as LABEL=GLOB, e.g.
+'jz=schemes_pulses/jz_pulse*.dat', and results in one column of average gate
+fidelities in OUTFILE. The average gate fidelity for a single noise sample is
+calculated by the function given with --model, as MODULE:FUNCTION (the current
+working directory is searched for MODULE). See disstools.robustness for the
+details.
+
+If OUTFILE already exists, the sweep is resumed after the last value of sigma
+in the file.
+"""
+import os
+import sys
+from multiprocessing import cpu_count
+from optparse import OptionParser
+from importlib import import_module
+
+import numpy as np
+
+from disstools.robustness import NOISE_TYPES, sweep
+
+
+def load_function(spec):
+    """Return the function for the given specification MODULE:FUNCTION"""
+    try:
+        module_name, function_name = spec.split(':')
+    except ValueError:
+        raise ValueError("Function must be given as MODULE:FUNCTION, not %s"
+                         % spec)
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    return getattr(import_module(module_name), function_name)
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog [options] --model MODULE:FUNCTION OUTFILE PULSE_SET "
+            "[PULSE_SET ...]",
+    description = __doc__)
+    arg_parser.add_option(
+        '--model', action='store', dest='model', default=None,
+        help="Function fidelity(pulses, detuning=0.0) that returns the "
+        "average gate fidelity for a single noise sample, as MODULE:FUNCTION")
+    arg_parser.add_option(
+        '--noise', action='store', dest='noise', default='ampl',
+        help="Type of noise, one of %s [default: %%default]"
+        % ", ".join(NOISE_TYPES))
+    arg_parser.add_option(
+        '--sigma-max', action='store', dest='sigma_max', type=float,
+        default=1.0, help="Maximum value of sigma, in ns for 'time', in "
+        "percent for 'ampl', in kHz for 'det' [default: %default]")
+    arg_parser.add_option(
+        '--n-sigma', action='store', dest='n_sigma', type=int, default=1001,
+        help="Number of values of sigma between 0 and SIGMA_MAX "
+        "[default: %default]")
+    arg_parser.add_option(
+        '--samples', action='store', dest='n_samples', type=int, default=100,
+        help="Number of noise samples for each value of sigma "
+        "[default: %default]")
+    arg_parser.add_option(
+        '--seed', action='store', dest='seed', type=int, default=0,
+        help="Seed for the random number generator [default: %default]")
+    arg_parser.add_option(
+        '-j', '--jobs', action='store', dest='jobs', type=int,
+        default=cpu_count(), help="Number of worker processes "
+        "[default: number of CPUs]")
+    options, args = arg_parser.parse_args(argv)
+    if options.model is None:
+        arg_parser.error("The --model option is required")
+    if len(args) < 3:
+        arg_parser.error("OUTFILE and at least one PULSE_SET are required")
+    outfile = args[1]
+    pulse_sets = []
+    for pulse_set in args[2:]:
+        try:
+            label, pattern = pulse_set.split('=', 1)
+        except ValueError:
+            arg_parser.error("PULSE_SET must be given as LABEL=GLOB, not %s"
+                             % pulse_set)
+        pulse_sets.append((label, pattern))
+    sigmas = np.linspace(0.0, options.sigma_max, options.n_sigma)
+    sweep(outfile, load_function(options.model), pulse_sets, options.noise,
+          sigmas, n_samples=options.n_samples, seed=options.seed,
+          processes=max(1, options.jobs))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+"""
+Live view of the convergence of running optimizations
+
+Shows "1-F_avg" over the iteration number for each F_AVG_LOG (files in the
+format of the `*_f_avg.dat` files in `chapters/3states/rydberg`), and the path
+through the Weyl chamber for each log given with --weyl (files in the format of
+`chapters/pe/weyl_paths/*.dat`, i.e. the local invariants log written during
+the optimization). The logs are polled every few seconds. Only lines that have
+been appended since the last poll are parsed (see disstools.tail), and the
+existing lines are updated in place, instead of re-building the figure. The
+logs of the running optimizations are only read, i.e. no parsed data is
+cached next to them.
+
+By default, the figure is shown in a window. With --png, the figure is instead
+written to the given file whenever one of the logs has changed.
+"""
+import os
+import sys
+import time
+from optparse import OptionParser
+
+from disstools.tail import TailReader
+
+# Vertices of the Weyl chamber, and its edges
+WEYL_VERTICES = {'O': (0, 0, 0), 'A1': (1, 0, 0), 'A2': (0.5, 0.5, 0),
+                 'A3': (0.5, 0.5, 0.5)}
+WEYL_EDGES = [('O', 'A1'), ('O', 'A2'), ('O', 'A3'), ('A1', 'A2'),
+              ('A1', 'A3'), ('A2', 'A3')]
+
+
+class ConvergenceDashboard(object):
+    """
+    Figure showing the convergence of a set of optimizations
+
+    Attributes:
+        fig (matplotlib.figure.Figure): The figure
+        f_avg_logs (list): list of tuples (TailReader, Line2D) for the
+            "1-F_avg" logs
+        weyl_logs (list): list of tuples (TailReader, Line3D) for the local
+            invariants logs (drawn as markers only)
+    """
+
+    def __init__(self, f_avg_files, weyl_files):
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D # registers '3d' projection
+        n_panels = int(len(f_avg_files) > 0) + int(len(weyl_files) > 0)
+        if n_panels == 0:
+            raise ValueError("No log files given")
+        self.fig = plt.figure(figsize=(6.0*n_panels, 5.0))
+        i_panel = 1
+        self._n_shown = {} # file name => number of rows shown in the plot
+        self.f_avg_logs = []
+        if len(f_avg_files) > 0:
+            ax = self.fig.add_subplot(1, n_panels, i_panel)
+            i_panel += 1
+            ax.set_yscale('log')
+            ax.set_xlabel('OCT iteration')
+            ax.set_ylabel('1-F_avg')
+            for filename in f_avg_files:
+                line, = ax.plot([], [], label=filename)
+                self.f_avg_logs.append(
+                    (TailReader(filename, usecols=(0, 1), cache=False),
+                     line))
+            ax.legend(loc='upper right', fontsize='small')
+            self.f_avg_ax = ax
+        self.weyl_logs = []
+        if len(weyl_files) > 0:
+            ax = self.fig.add_subplot(1, n_panels, i_panel, projection='3d')
+            for (a, b) in WEYL_EDGES:
+                ax.plot(*zip(WEYL_VERTICES[a], WEYL_VERTICES[b]),
+                        color='black', linewidth=0.5)
+            ax.set_xlim(0, 1)
+            ax.set_ylim(0, 0.5)
+            ax.set_zlim(0, 0.5)
+            ax.set_xlabel('c1/pi')
+            ax.set_ylabel('c2/pi')
+            ax.set_zlabel('c3/pi')
+            for filename in weyl_files:
+                line, = ax.plot([], [], [], linestyle='none', marker='o',
+                                markersize=2, label=filename)
+                self.weyl_logs.append(
+                    (TailReader(filename, usecols=(8, 9, 10), cache=False),
+                     line))
+            ax.legend(loc='upper left', fontsize='small')
+
+    def update(self):
+        """
+        Read the new lines from all logs, and update the corresponding plots.
+        Return True if any of the logs had new lines.
+        """
+        changed = False
+        for reader, line in self.f_avg_logs:
+            if self._has_new_rows(reader):
+                iteration, err = reader.data.T
+                line.set_data(iteration, err)
+                changed = True
+        if changed:
+            self.f_avg_ax.relim()
+            self.f_avg_ax.autoscale_view()
+        for reader, line in self.weyl_logs:
+            if self._has_new_rows(reader):
+                c1, c2, c3 = reader.data.T
+                line.set_data(c1, c2)
+                line.set_3d_properties(c3)
+                changed = True
+        return changed
+
+    def _has_new_rows(self, reader):
+        """Update the reader, and return True if it has rows that are not
+        shown yet (or fewer rows than shown, after a log was restarted)"""
+        reader.update()
+        if reader.n_rows != self._n_shown.get(reader.fname):
+            self._n_shown[reader.fname] = reader.n_rows
+            return True
+        return False
+
+
+def main(argv=None):
+    """Main routine"""
+    if argv is None:
+        argv = sys.argv
+    arg_parser = OptionParser(
+    usage = "%prog [options] [F_AVG_LOG ...]",
+    description = __doc__)
+    arg_parser.add_option(
+        '--weyl', action='append', dest='weyl_files', default=[],
+        metavar='LOG', help="Local invariants log, for the Weyl chamber "
+        "panel. May be given multiple times")
+    arg_parser.add_option(
+        '--png', action='store', dest='png', default=None,
+        help="Write the figure to the given PNG file, instead of showing it "
+        "in a window")
+    arg_parser.add_option(
+        '--interval', action='store', dest='interval', type=float,
+        default=5.0, help="Time between polls, in seconds [default: "
+        "%default]")
+    arg_parser.add_option(
+        '--once', action='store_true', dest='once', default=False,
+        help="Read the logs and write the figure only once (requires --png)")
+    options, args = arg_parser.parse_args(argv)
+    import matplotlib
+    if options.png is not None:
+        matplotlib.use('Agg')
+    elif options.once:
+        arg_parser.error("--once requires --png")
+    import matplotlib.pyplot as plt
+    try:
+        dashboard = ConvergenceDashboard(args[1:], options.weyl_files)
+    except ValueError as exc_info:
+        arg_parser.error(str(exc_info))
+    if options.png is None:
+        plt.ion()
+        plt.show()
+    try:
+        while True:
+            if dashboard.update():
+                if options.png is not None:
+                    # write to temporary file, so that an image viewer never
+                    # sees an incomplete file
+                    tmp_file = "%s.%d.tmp.png" % (options.png, os.getpid())
+                    dashboard.fig.savefig(tmp_file)
+                    os.rename(tmp_file, options.png)
+                else:
+                    dashboard.fig.canvas.draw_idle()
+            if options.once:
+                break
+            if options.png is None:
+                if not plt.fignum_exists(dashboard.fig.number):
+                    break # window was closed
+                plt.pause(options.interval)
+            else:
+                time.sleep(options.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())